@@ -6,14 +6,28 @@
 # In[11]:
 
 
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from IPython.display import display, Markdown, Image
-from pathlib import Path
 import matplotlib.pyplot as plt
 import seaborn as sns
 
+from importacion_diferida import diferido
+from modelo_datos import adjuntar, leer_tabla
+
+# plotly se importa recién en las celdas de gráficos interactivos
+px = diferido("plotly.express")
+plotly_subplots = diferido("plotly.subplots")
+
+# IPython y panel solo hacen falta dentro de Jupyter: como script no se
+# importan (IPython solo tarda ~0,35 s) y display() es un print
+EN_NOTEBOOK = "ipykernel" in sys.modules
+if EN_NOTEBOOK:
+    from IPython.display import display
+else:
+    display = print
+
 
 # --- PASO 1: CONFIGURACIÓN DE RUTAS Y NOMBRES ---
 archivos_info = {
@@ -23,15 +37,19 @@ archivos_info = {
     'detalle_ventas': 'limpios/df_detalle_ventas_limpio.csv'
 }
 
+# Período a analizar ('AAAA-MM' o None = todo): ventas y detalle
+# están particionadas por mes y solo se leen las particiones del rango
+PERIODO_DESDE = None
+PERIODO_HASTA = None
+
 dataframes = {}
 
 print("--- 1. CARGANDO DATASETS INDIVIDUALMENTE ---")
 
 for nombre, archivo in archivos_info.items():
     try:
-        # ✅ Leer como CSV desde la carpeta detectada
-        ruta = find_data_dir() / archivo
-        df_temp = pd.read_csv(ruta)
+        # ✅ Tablas normalizadas: modelo_datos decodifica los diccionarios
+        df_temp = leer_tabla(nombre, desde=PERIODO_DESDE, hasta=PERIODO_HASTA)
         dataframes[nombre] = df_temp
         print(f"✅ Cargado: {nombre} ({df_temp.shape[0]} filas, {df_temp.shape[1]} columnas)")
     except FileNotFoundError:
@@ -43,17 +61,7 @@ for nombre, archivo in archivos_info.items():
 # In[12]:
 
 
-# Función para detectar la carpeta 'datos'
-def find_data_dir(start: Path | None = None, names=('datos', 'data')) -> Path | None:
-    if start is None:
-        start = Path.cwd()
-    start = Path(start).resolve()
-    for parent in [start] + list(start.parents):
-        for n in names:
-            candidate = parent / n
-            if candidate.is_dir():
-                return candidate
-    return None
+# La carpeta 'datos' la resuelve el catálogo de datos (ver import arriba)
 
 
 # In[13]:
@@ -84,9 +92,10 @@ for nombre, df in dataframes.items():
         print("\n▶ Numéricas:")
         display(desc_num)
 
-    # No numéricas
-    desc_cat = df.select_dtypes(exclude=[np.number]).describe(include='all').T
-    if not desc_cat.empty:
+    # No numéricas (detalle_ventas normalizado puede no tener columnas de texto)
+    no_numericas = df.select_dtypes(exclude=[np.number])
+    if no_numericas.shape[1]:
+        desc_cat = no_numericas.describe(include='all').T
         print("\n▶ Categóricas / texto:")
         display(desc_cat)
 
@@ -178,60 +187,33 @@ for nombre, df in dataframes.items():
 # In[17]:
 
 
-def iqr_outliers(s):
-    """Devuelve máscara booleana de outliers y límites inferior/superior según el método IQR."""
-    q1 = s.quantile(0.25)
-    q3 = s.quantile(0.75)
-    iqr = q3 - q1
-    lim_inf = q1 - 1.5 * iqr
-    lim_sup = q3 + 1.5 * iqr
-    mask = (s < lim_inf) | (s > lim_sup)
-    return mask, lim_inf, lim_sup
+# Todas las columnas a la vez: un solo np.nanquantile y una máscara de bits por fila
+from outliers import columnas_sin_ids, detectar_outliers
 
 for nombre, df in dataframes.items():
     print(f"\n{'='*60}\n🚨 OUTLIERS (IQR) — {nombre.upper()}\n{'='*60}")
 
     # ✅ Seleccionamos solo columnas numéricas que no sean IDs
-    num_cols = [
-        c for c in df.select_dtypes(include=[np.number]).columns
-        if "id" not in c.lower()
-    ]
+    num_cols = columnas_sin_ids(df)
 
     if len(num_cols) == 0:
         print("No hay columnas numéricas válidas (sin IDs).")
         continue
 
-    resumen = []
-    outlier_indices_global = set()
+    resultado = detectar_outliers(df, num_cols)
 
-    for col in num_cols:
-        s = df[col].dropna()
-        if s.empty:
-            continue
-
-        mask, li, ls = iqr_outliers(s)
-        idx = s.index[mask]
-        resumen.append({
-            "columna": col,
-            "outliers": len(idx),
-            "lim_inf": li,
-            "lim_sup": ls
-        })
-        outlier_indices_global.update(idx)
-
-        # Boxplot visual
-        plt.figure()
-        sns.boxplot(x=df[col])
-        plt.title(f"Boxplot y outliers en {col} — {nombre}")
-        plt.show()
+    # Boxplot visual (una sola figura con todas las columnas)
+    plt.figure()
+    sns.boxplot(data=df[num_cols], orient="h")
+    plt.title(f"Boxplots y outliers — {nombre}")
+    plt.show()
 
-    if resumen:
-        print("\n▶ Resumen por columna:")
-        display(pd.DataFrame(resumen).sort_values("outliers", ascending=False))
+    print("\n▶ Resumen por columna:")
+    display(resultado.resumen())
 
-    if outlier_indices_global:
+    if len(resultado.indices):
         print("\n▶ Filas con al menos un outlier (primeras 20):")
-        display(df.loc[sorted(outlier_indices_global)].head(20))
+        display(df.loc[np.sort(resultado.indices)].head(20))
     else:
         print("✅ Sin outliers según criterio IQR.")
 
@@ -240,17 +222,22 @@ for nombre, df in dataframes.items():
 
 
 import pandas as pd
-import plotly.express as px
-import panel as pn
 
 # 1. Instalación (descomentar y ejecutar si es la primera vez)
 # !pip install plotly pandas panel
 
 # 2. Activar Panel para su uso en Jupyter
-pn.extension()
+if EN_NOTEBOOK:
+    import panel as pn
+    pn.extension()
 
 # Asumo que 'dataframes' está cargado con las claves 'ventas', 'clientes', y 'detalle_ventas'.
 
+# Los merges son 'left': avisamos si hay claves huérfanas (quedarían NaN en 'ciudad')
+from aurelion.integridad import verificar_integridad
+from integridad_referencial import imprimir_integridad
+imprimir_integridad(verificar_integridad(dataframes))
+
 # --- 3. FUSIÓN DE DATAFRAMES NECESARIA (CORREGIDO) ---
 try:
     # **CORRECCIÓN CLAVE:** La columna de fecha en 'ventas' se llama 'fecha', no 'fecha_venta'.
@@ -264,7 +251,7 @@ try:
     # 2. Unir el resultado con el detalle de ventas para obtener el importe, producto y cantidad
     df_merge_full = pd.merge(
         df_ventas_cliente,
-        dataframes['detalle_ventas'][['id_venta', 'importe', 'nombre_producto', 'cantidad']],
+        dataframes['detalle_ventas'][['id_venta', 'importe', 'id_producto', 'cantidad']],
         on='id_venta',
         how='left'
     )
@@ -276,13 +263,15 @@ except Exception as e:
 # --- 4. GENERACIÓN DE GRÁFICOS INTERACTIVOS (PLOTLY) ---
 
 # A. GRÁFICO: Top 10 Productos Más Vendidos (en Cantidad)
+# Se agrupa por id y el nombre se trae solo para las 10 filas del top
 top_productos = (
-    df_merge_full.groupby('nombre_producto')['cantidad']
+    df_merge_full.groupby('id_producto')['cantidad']
     .sum()
     .nlargest(10)
     .sort_values(ascending=True)
     .reset_index()
 )
+top_productos = adjuntar(top_productos, 'detalle_ventas', ['nombre_producto'])
 fig_productos = px.bar(
     top_productos, y='nombre_producto', x='cantidad', orientation='h',
     title='🥇 Top 10 Productos Más Vendidos (Cantidad)', color='cantidad',
@@ -326,17 +315,15 @@ print("✅ Gráficos Plotly generados exitosamente.")
 
 
 import pandas as pd
-import plotly.express as px
-from plotly.offline import plot
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
 import numpy as np
 
-# Carga de DataFrames (Asegúrate que los archivos estén en la misma carpeta)
+# Carga de DataFrames (solo las columnas necesarias de las tablas normalizadas)
 try:
-    clientes = pd.read_csv('df_clientes_limpio.csv')
-    ventas = pd.read_csv('df_ventas_limpio.csv')
-    detalle_ventas = pd.read_csv('df_detalle_ventas_limpio.csv')
+    clientes = leer_tabla('clientes', ['id_cliente', 'ciudad'])
+    ventas = leer_tabla('ventas', ['id_venta', 'id_cliente', 'fecha'],
+                        desde=PERIODO_DESDE, hasta=PERIODO_HASTA)
+    detalle_ventas = leer_tabla('detalle_ventas', ['id_venta', 'importe', 'id_producto', 'cantidad'],
+                                desde=PERIODO_DESDE, hasta=PERIODO_HASTA)
 except Exception as e:
     print(f"❌ Error al cargar archivos CSV: {e}")
     raise
@@ -352,7 +339,7 @@ try:
     )
     df_merge_full = pd.merge(
         df_ventas_cliente,
-        detalle_ventas[['id_venta', 'importe', 'nombre_producto', 'cantidad']],
+        detalle_ventas[['id_venta', 'importe', 'id_producto', 'cantidad']],
         on='id_venta',
         how='left'
     )
@@ -370,7 +357,8 @@ except Exception as e:
 # --- 2. GENERACIÓN DE GRÁFICOS INTERACTIVOS (PLOTLY) ---
 
 # A. Top 10 Productos Más Vendidos (en Cantidad)
-top_productos = df_merge_full.groupby('nombre_producto')['cantidad'].sum().nlargest(10).sort_values(ascending=True).reset_index()
+top_productos = df_merge_full.groupby('id_producto')['cantidad'].sum().nlargest(10).sort_values(ascending=True).reset_index()
+top_productos = adjuntar(top_productos, 'detalle_ventas', ['nombre_producto'])
 fig_productos = px.bar(
     top_productos, y='nombre_producto', x='cantidad', orientation='h',
     color='cantidad', color_continuous_scale=px.colors.sequential.Viridis
@@ -396,7 +384,7 @@ fig_ciudades = px.pie(
 venta_total_general = df_merge_full['importe'].sum()
 
 # 3.1. Crear la figura de subplots (diseño 2x2: un gráfico grande, dos pequeños)
-fig = make_subplots(
+fig = plotly_subplots.make_subplots(
     rows=2, cols=2,
     # El gráfico de productos ocupa 2 filas, el de torta usa el tipo 'domain'
     specs=[[{"rowspan": 2, "type": "xy"}, {"type": "domain"}],
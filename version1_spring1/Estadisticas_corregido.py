@@ -7,13 +7,28 @@ Versión adaptada para integrarse con programa_web.py:
 
 - No usa plt.show() (no abre ventanas).
 - Guarda todas las figuras en static/figuras con prefijo 'estadisticas_'.
+- Cada dataset se lee una sola vez, por chunks, con motor_estadisticas:
+  esa pasada acumula describe(), histogramas, correlaciones e IQR juntos.
+- Los cálculos están en aurelion.estadisticas; acá quedan los mensajes y
+  las figuras. Los resúmenes se pasan como argumento (sin estado global).
 """
 
+import sys
+
 import pandas as pd
-import numpy as np
 from pathlib import Path
 import matplotlib.pyplot as plt
-import seaborn as sns
+
+from aurelion.estadisticas import correlaciones as tabla_correlaciones
+from aurelion.estadisticas import distribuciones, resumir
+from aurelion.motor_estadisticas import ResumenDataset
+from catalogo_datos import obtener_catalogo
+from figuras import borrar_figuras, guardar_figura
+from importacion_diferida import diferido
+from modelo_datos import chunks_tabla, desnormalizar
+
+# seaborn (~1 s de importación) solo se usa en los mapas de calor
+sns = diferido("seaborn")
 
 pd.set_option("display.max_columns", 100)
 
@@ -22,98 +37,79 @@ BASE_DIR = Path(__file__).resolve().parent
 CARPETA_FIGURAS = BASE_DIR / "static" / "figuras"
 CARPETA_FIGURAS.mkdir(parents=True, exist_ok=True)
 
-# Limpio figuras viejas de estadísticas
-for f in CARPETA_FIGURAS.glob("estadisticas_*.png"):
-    try:
-        f.unlink()
-    except Exception:
-        pass
 
+def limpiar_figuras():
+    """Borra las figuras viejas de estadísticas."""
+    borrar_figuras("estadisticas_*.png")
 
-# ==========================================================
-# LOCALIZAR CARPETA DE DATOS
-# ==========================================================
-def find_data_dir(start: Path | None = None, names=("datos", "data")) -> Path | None:
-    """Busca una carpeta llamada 'datos' o 'data' en el árbol de directorios."""
-    if start is None:
-        start = Path.cwd()
-    start = Path(start).resolve()
-    for parent in [start] + list(start.parents):
-        for n in names:
-            candidate = parent / n
-            if candidate.is_dir():
-                return candidate
-    return None
-
-
-# Archivos esperados (relativos a la carpeta de datos)
+
+# Datasets esperados (nombres del catálogo de datos)
 ARCHIVOS_INFO = {
-    "clientes": "limpios/df_clientes_limpio.csv",
-    "productos": "limpios/df_productos_limpio.csv",
-    "ventas": "limpios/df_ventas_limpio.csv",
-    "detalle_ventas": "limpios/df_detalle_ventas_limpio.csv",
+    "clientes": "df_clientes_limpio",
+    "productos": "df_productos_limpio",
+    "ventas": "df_ventas_limpio",
+    "detalle_ventas": "df_detalle_ventas_limpio",
 }
 
-DATAFRAMES: dict[str, pd.DataFrame] = {}
-
 
 # ==========================================================
 # CARGA DE DATASETS
 # ==========================================================
-def cargar_datasets():
+def cargar_datasets(desde=None, hasta=None) -> dict[str, ResumenDataset]:
+    """desde / hasta ('AAAA-MM'): en ventas y detalle solo se leen esos meses."""
     print("\n--- 1️⃣ CARGANDO DATASETS INDIVIDUALMENTE ---")
-    data_dir = find_data_dir()
-    if data_dir is None:
+    if desde is not None or hasta is not None:
+        print(f"📅 Período: {desde or 'inicio'} a {hasta or 'hoy'}")
+    catalogo = obtener_catalogo()
+    if catalogo.data_dir is None:
         raise FileNotFoundError(
             "❌ No se encontró carpeta 'datos' o 'data' en el proyecto."
         )
 
+    resumenes = {}
     for nombre, archivo in ARCHIVOS_INFO.items():
-        ruta = data_dir / archivo
         try:
-            df_temp = pd.read_csv(ruta)
-            DATAFRAMES[nombre] = df_temp
+            # Tablas normalizadas: los diccionarios se decodifican por chunk y
+            # las columnas derivadas (nombre_producto, ...) vuelven para el reporte
+            chunks = chunks_tabla(nombre, desde=desde, hasta=hasta, derivadas=True)
+            resumen = resumir({nombre: chunks})[nombre]
+            resumenes[nombre] = resumen
             print(
-                f"✅ Cargado: {nombre} ({df_temp.shape[0]} filas, {df_temp.shape[1]} columnas)"
+                f"✅ Cargado: {nombre} ({resumen.shape[0]} filas, {resumen.shape[1]} columnas)"
             )
-        except FileNotFoundError:
-            print(f"❌ ERROR: Archivo '{archivo}' no encontrado en {ruta}.")
+        except FileNotFoundError as e:
+            print(f"❌ ERROR: Archivo '{archivo}' no encontrado: {e}")
         except Exception as e:
             print(f"❌ ERROR al procesar '{archivo}': {e}")
+    return resumenes
 
 
-# ==========================================================
-# UTILIDADES
-# ==========================================================
-def clasificar_distribucion(serie: pd.Series):
-    skew = serie.skew()
-    kurt = serie.kurtosis()
-    if np.isnan(skew):
-        return "sin variación / NaN", skew, kurt
-    if abs(skew) < 0.5:
-        tipo = "aprox. normal/simétrica"
-    elif skew > 0:
-        tipo = "sesgo a la derecha (cola derecha)"
-    else:
-        tipo = "sesgo a la izquierda (cola izquierda)"
-    return tipo, skew, kurt
+def cargar_desde_dataframes(dataframes: dict[str, pd.DataFrame]) -> dict[str, ResumenDataset]:
+    """Igual que cargar_datasets(), pero con DataFrames ya en memoria (almacén web)."""
+    print("\n--- 1️⃣ CARGANDO DATASETS DESDE MEMORIA ---")
+    resumenes = resumir(desnormalizar(dataframes))
+    for nombre, resumen in resumenes.items():
+        print(
+            f"✅ Cargado: {nombre} ({resumen.shape[0]} filas, {resumen.shape[1]} columnas)"
+        )
+    return resumenes
 
 
 # ==========================================================
 # 2) ESTADÍSTICAS BÁSICAS
 # ==========================================================
-def estadisticas_basicas():
+def estadisticas_basicas(resumenes: dict[str, ResumenDataset]):
     print("\n--- 2️⃣ ESTADÍSTICAS DESCRIPTIVAS BÁSICAS ---")
-    for nombre, df in DATAFRAMES.items():
+    for nombre, resumen in resumenes.items():
         print(
             f"\n{'='*60}\n📊 ESTADÍSTICAS BÁSICAS — {nombre.upper()}\n{'='*60}"
         )
-        desc_num = df.select_dtypes(include=[np.number]).describe().T
+        desc_num = resumen.describe_numericas()
         if not desc_num.empty:
             print("\n▶ Variables numéricas:")
             print(desc_num.to_string())
 
-        desc_cat = df.select_dtypes(exclude=[np.number]).describe(include="all").T
+        desc_cat = resumen.describe_categoricas()
         if not desc_cat.empty:
             print("\n▶ Variables categóricas / texto:")
             print(desc_cat.to_string())
@@ -122,24 +118,22 @@ def estadisticas_basicas():
 # ==========================================================
 # 3) DISTRIBUCIONES + HISTOGRAMAS (GUARDADOS)
 # ==========================================================
-def distribuciones_y_histogramas():
+def distribuciones_y_histogramas(resumenes: dict[str, ResumenDataset]):
     print("\n--- 3️⃣ DISTRIBUCIONES DE VARIABLES + HISTOGRAMAS ---")
-    for nombre, df in DATAFRAMES.items():
+    for nombre, resumen in resumenes.items():
         print(
             f"\n{'='*60}\n📈 DISTRIBUCIONES — {nombre.upper()}\n{'='*60}"
         )
-        num_cols = df.select_dtypes(include=[np.number]).columns
-        for col in num_cols:
-            s = df[col].dropna()
-            if s.empty:
-                continue
-            tipo, skew, kurt = clasificar_distribucion(s)
+        for fila in distribuciones(resumen).itertuples(index=False):
+            col = fila.columna
             print(
-                f"- {col}: {tipo} | skew={skew:.2f}, kurtosis={kurt:.2f}"
+                f"- {col}: {fila.tipo} | skew={fila.skew:.2f}, kurtosis={fila.kurtosis:.2f}"
             )
 
+            # Histograma a partir de los bins acumulados (sin releer los datos)
+            conteos, bordes = resumen.histograma(col)
             plt.figure()
-            sns.histplot(s, kde=True, bins=30)
+            plt.hist(bordes[:-1], bins=bordes, weights=conteos, edgecolor="white")
             plt.title(f"Distribución de {col} — {nombre}")
             plt.xlabel(col)
             plt.ylabel("Frecuencia")
@@ -147,25 +141,29 @@ def distribuciones_y_histogramas():
             nombre_fig = f"estadisticas_{nombre}_hist_{col}.png"
             ruta = CARPETA_FIGURAS / nombre_fig
             plt.tight_layout()
-            plt.savefig(ruta, bbox_inches="tight")
-            plt.close()
+            guardar_figura(ruta)
             print(f"   📷 Histograma guardado: {ruta}")
 
 
 # ==========================================================
 # 4) CORRELACIONES + HEATMAPS (GUARDADOS)
 # ==========================================================
-def correlaciones():
+def correlaciones(resumenes: dict[str, ResumenDataset]):
     print("\n--- 4️⃣ ANÁLISIS DE CORRELACIONES ---")
-    for nombre, df in DATAFRAMES.items():
-        num = df.select_dtypes(include=[np.number])
-        if num.shape[1] < 2:
+    for nombre, resumen in resumenes.items():
+        resultado = tabla_correlaciones(resumen)
+        if resultado is None:
             print(
                 f"⚠️ {nombre}: No hay suficientes columnas numéricas para correlación."
             )
             continue
 
-        corr = num.corr()
+        tipo, tabla = resultado
+        if tipo == "top":
+            correlaciones_top(nombre, resumen, tabla)
+            continue
+
+        corr = tabla
         print(f"\nMatriz de correlación — {nombre.upper()}:")
         print(corr.to_string())
 
@@ -182,11 +180,32 @@ def correlaciones():
         plt.tight_layout()
         nombre_fig = f"estadisticas_{nombre}_corr.png"
         ruta = CARPETA_FIGURAS / nombre_fig
-        plt.savefig(ruta, bbox_inches="tight")
-        plt.close()
+        guardar_figura(ruta)
         print(f"   📷 Heatmap guardado: {ruta}")
 
 
+def correlaciones_top(nombre: str, resumen: ResumenDataset, top: pd.DataFrame):
+    """Tablas anchas: solo los pares con mayor |r| y un gráfico de barras."""
+    print(
+        f"\nTop {len(top)} correlaciones (|r| más alto) — {nombre.upper()} "
+        f"({len(resumen.columnas_numericas)} columnas numéricas):"
+    )
+    print(top.to_string(index=False))
+    if top.empty:
+        return
+
+    etiquetas = top["var_1"] + " ~ " + top["var_2"]
+    plt.figure(figsize=(6, 0.4 * len(top) + 1))
+    plt.barh(etiquetas[::-1], top["r"][::-1], color="tab:blue")
+    plt.xlim(-1, 1)
+    plt.xlabel("r de Pearson")
+    plt.title(f"Top correlaciones — {nombre}")
+    plt.tight_layout()
+    ruta = CARPETA_FIGURAS / f"estadisticas_{nombre}_corr.png"
+    guardar_figura(ruta)
+    print(f"   📷 Gráfico de correlaciones guardado: {ruta}")
+
+
 # ==========================================================
 # 5) DASHBOARD (dejamos solo HTML como antes)
 # ==========================================================
@@ -205,14 +224,40 @@ def dashboard_simple():
 # ==========================================================
 # MAIN
 # ==========================================================
-def run_all():
-    cargar_datasets()
-    estadisticas_basicas()
-    distribuciones_y_histogramas()
-    correlaciones()
+def _reportes(resumenes: dict[str, ResumenDataset]):
+    estadisticas_basicas(resumenes)
+    distribuciones_y_histogramas(resumenes)
+    correlaciones(resumenes)
     dashboard_simple()
+
+
+def run_all(desde=None, hasta=None) -> bool:
+    """Devuelve False si no se pudo procesar algún dataset."""
+    limpiar_figuras()
+    resumenes = cargar_datasets(desde, hasta)
+    _reportes(resumenes)
+    faltantes = sorted(set(ARCHIVOS_INFO) - set(resumenes))
+    if faltantes:
+        print(f"\n⚠️ Sin estadísticas de: {', '.join(faltantes)}")
+        return False
+    print("\n🎉 Proceso de estadísticas completado correctamente.")
+    return True
+
+
+def run_desde_dataframes(dataframes: dict[str, pd.DataFrame]):
+    """Mismo proceso que run_all(), sin leer archivos (lo usa programa_web)."""
+    limpiar_figuras()
+    _reportes(cargar_desde_dataframes(dataframes))
     print("\n🎉 Proceso de estadísticas completado correctamente.")
 
 
 if __name__ == "__main__":
-    run_all()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estadísticas de la Tienda Aurelion")
+    parser.add_argument("--desde", help="Primer mes a analizar (AAAA-MM)")
+    parser.add_argument("--hasta", help="Último mes a analizar (AAAA-MM)")
+    args = parser.parse_args()
+    # Código de salida != 0: pipeline.py no marca la etapa como hecha
+    if not run_all(args.desde, args.hasta):
+        sys.exit(1)
@@ -1,139 +1,86 @@
-import pandas as pd
 import numpy as np
 from pathlib import Path
 import matplotlib.pyplot as plt
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.metrics import (
-    accuracy_score,
-    classification_report,
-    confusion_matrix,
-    ConfusionMatrixDisplay,
-)
-import os
+from sklearn.metrics import ConfusionMatrixDisplay
+
+from aurelion.features import preparar_datos
+from aurelion.modelos import entrenar
+from cache_features import MatrizFeatures, matriz_en_memoria, obtener_matriz
+from figuras import guardar_figura
+from frontera_decision import superficie_cacheada
+from intercambio import leer_tabla_o_csv
 
 # Carpeta donde se guardan las figuras para la web
 CARPETA_FIGURAS = Path(__file__).resolve().parent / "static" / "figuras"
 CARPETA_FIGURAS.mkdir(parents=True, exist_ok=True)
 
+RUTA_DF_MODELO = Path(__file__).resolve().parent / "df_modelo_ticket_alto_aumentado.csv"
+
 
 # =========================================
 # 1) CARGAR DATAFRAME AUMENTADO
 # =========================================
 def cargar_df_modelo():
-    ruta = Path(__file__).resolve().parent / "df_modelo_ticket_alto_aumentado.csv"
+    ruta = RUTA_DF_MODELO
     print(f"📂 Cargando dataframe desde: {ruta}")
-    df = pd.read_csv(ruta)
+    df = leer_tabla_o_csv(ruta)
     print("Shape del dataframe:", df.shape)
     return df
 
 
 # =========================================
-# 2) PREPARAR DATOS PARA ML
-# =========================================
-def preparar_datos(df):
-    cols_numericas = [
-        "num_items",
-        "num_lineas",
-        "num_unique_products",
-        "mes",
-        "dia_semana",
-        "antiguedad_cliente_dias",
-    ]
-    cols_categoricas = []
-    if "medio_pago" in df.columns:
-        cols_categoricas.append("medio_pago")
-    if "ciudad" in df.columns:
-        cols_categoricas.append("ciudad")
-
-    columnas_utiles = cols_numericas + cols_categoricas + ["ticket_alto"]
-    df_ml = df[columnas_utiles].dropna()
-
-    df_ml = pd.get_dummies(df_ml, columns=cols_categoricas, drop_first=True)
-    X = df_ml.drop("ticket_alto", axis=1)
-    y = df_ml["ticket_alto"]
-    return X, y
-
-
-# =========================================
-# 3) ENTRENAR Y GUARDAR FIGURAS
+# 2) ENTRENAR Y GUARDAR FIGURAS
+#    (preparar_datos y el entrenamiento están en aurelion)
 # =========================================
 def entrenar_y_guardar_figuras(X, y):
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.3, random_state=42, stratify=y
-    )
+    resultados = entrenar(X, y)
+    lr, arbol = resultados["logistica"], resultados["arbol"]
 
     cmap_azul = plt.get_cmap("Blues")
 
-    # -------- Regresión Logística --------
-    log_reg = LogisticRegression(max_iter=1000)
-    log_reg.fit(X_train, y_train)
-    y_pred_lr = log_reg.predict(X_test)
-    acc_lr = accuracy_score(y_test, y_pred_lr)
-    cm_lr = confusion_matrix(y_test, y_pred_lr)
-
-    ConfusionMatrixDisplay(cm_lr).plot(values_format="d", cmap=cmap_azul)
-    plt.title(f"Confusión - Logística (aumentado, Acc: {acc_lr:.3f})")
+    # --- Regresión Logística ---
+    ConfusionMatrixDisplay(lr.matriz_confusion).plot(values_format="d", cmap=cmap_azul)
+    plt.title(f"Confusión - Logística (aumentado, Acc: {lr.accuracy:.3f})")
     plt.tight_layout()
-    plt.savefig(CARPETA_FIGURAS / "modelo_aumentado_logistica.png", bbox_inches="tight")
-    plt.close()
-
-    # -------- Árbol de Decisión --------
-    tree = DecisionTreeClassifier(max_depth=4, random_state=42)
-    tree.fit(X_train, y_train)
-    y_pred_tree = tree.predict(X_test)
-    acc_tree = accuracy_score(y_test, y_pred_tree)
-    cm_tree = confusion_matrix(y_test, y_pred_tree)
-
-    ConfusionMatrixDisplay(cm_tree).plot(values_format="d", cmap=cmap_azul)
-    plt.title(f"Confusión - Árbol (aumentado, Acc: {acc_tree:.3f})")
+    guardar_figura(CARPETA_FIGURAS / "modelo_aumentado_logistica.png")
+
+    # --- Árbol de Decisión ---
+    ConfusionMatrixDisplay(arbol.matriz_confusion).plot(values_format="d", cmap=cmap_azul)
+    plt.title(f"Confusión - Árbol (aumentado, Acc: {arbol.accuracy:.3f})")
     plt.tight_layout()
-    plt.savefig(CARPETA_FIGURAS / "modelo_aumentado_arbol.png", bbox_inches="tight")
-    plt.close()
+    guardar_figura(CARPETA_FIGURAS / "modelo_aumentado_arbol.png")
 
     print("✅ Figuras de matrices de confusión guardadas en:", CARPETA_FIGURAS)
 
 
 # =========================================
-# 4) FRONTERA DE DECISIÓN (CON JITTER)
+# 3) FRONTERA DE DECISIÓN (CON JITTER)
 # =========================================
-def plot_decision_boundary_simple(df):
+def plot_decision_boundary_simple(matriz: MatrizFeatures):
     """
     Usa:
       - num_items (eje X)
       - num_unique_products (eje Y)
       - ticket_alto como target
 
-    Entrena una regresión logística simple y dibuja la frontera.
+    Usa la regresión logística simple ya persistida (se entrena solo la
+    primera vez) y la superficie cacheada de frontera_decision.
     Para visualizar mejor, se agrega un 'jitter' leve a los puntos (solo en el gráfico),
     así no quedan todos superpuestos cuando comparten la misma coordenada.
     """
     feature_x = "num_items"
     feature_y = "num_unique_products"
 
-    df_simple = df[[feature_x, feature_y, "ticket_alto"]].dropna().copy()
-    print("Filas usadas en frontera (aumentado):", df_simple.shape[0])
+    # Columnas tomadas de la matriz cacheada (memmap), sin releer el CSV
+    X_simple = matriz.X[:, [matriz.indice(feature_x), matriz.indice(feature_y)]]
+    y_simple = np.asarray(matriz.y)
+    print("Filas usadas en frontera (aumentado):", X_simple.shape[0])
 
-    X_simple = df_simple[[feature_x, feature_y]].values
-    y_simple = df_simple["ticket_alto"].values
-
-    # Modelo sobre los datos reales (sin jitter)
-    model = LogisticRegression()
-    model.fit(X_simple, y_simple)
-
-    # Malla para frontera
-    x_min, x_max = X_simple[:, 0].min() - 1, X_simple[:, 0].max() + 1
-    y_min, y_max = X_simple[:, 1].min() - 1, X_simple[:, 1].max() + 1
-
-    xx, yy = np.meshgrid(
-        np.linspace(x_min, x_max, 200),
-        np.linspace(y_min, y_max, 200),
-    )
-    Z = model.predict(np.c_[xx.ravel(), yy.ravel()]).reshape(xx.shape)
+    # Superficie precalculada sobre los datos reales (sin jitter), desde la caché
+    sup = superficie_cacheada(matriz, feature_x, feature_y)
 
     plt.figure()
-    plt.contourf(xx, yy, Z, alpha=0.3, cmap="Blues")
+    plt.contourf(sup.eje_x, sup.eje_y, sup.clases(), alpha=0.3, cmap="Blues")
 
     # 👉 Jitter SOLO para visualizar puntos (no afecta al modelo)
     rng = np.random.default_rng(42)
@@ -164,19 +111,30 @@ def plot_decision_boundary_simple(df):
     plt.title("Frontera de decisión (aumentado)")
     plt.legend()
     plt.tight_layout()
-    plt.savefig(CARPETA_FIGURAS / "modelo_aumentado_frontera.png", bbox_inches="tight")
-    plt.close()
+    guardar_figura(CARPETA_FIGURAS / "modelo_aumentado_frontera.png")
     print("✅ Figura de frontera de decisión guardada.")
 
 
+# =========================================
+# EN MEMORIA (almacén del servidor web)
+# =========================================
+def entrenar_desde_dataframe(df_aumentado):
+    """Mismo flujo que main(), con el dataframe aumentado ya armado en memoria."""
+    X, y = preparar_datos(df_aumentado)
+    matriz = matriz_en_memoria(X, y)
+    print("Shape de la matriz de features:", matriz.shape)
+    entrenar_y_guardar_figuras(matriz.X, matriz.y)
+    plot_decision_boundary_simple(matriz)
+
+
 # =========================================
 # MAIN
 # =========================================
 def main():
-    df = cargar_df_modelo()
-    X, y = preparar_datos(df)
-    entrenar_y_guardar_figuras(X, y)
-    plot_decision_boundary_simple(df)
+    matriz = obtener_matriz(RUTA_DF_MODELO, preparar_datos, cargar_df=cargar_df_modelo)
+    print("Shape de la matriz de features:", matriz.shape)
+    entrenar_y_guardar_figuras(matriz.X, matriz.y)
+    plot_decision_boundary_simple(matriz)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Almacén compartido de datasets para el servidor web.
+
+Carga clientes / productos / ventas / detalle UNA vez, en formato columnar
+compacto (enteros reducidos, textos repetidos como 'category'), y vigila los
+archivos: si el CSV cambia en disco se vuelve a cargar.
+
+Las analíticas que corren dentro del servidor piden vistas con vista() /
+vistas(). Son copias superficiales bajo Copy-on-Write de pandas: no duplican
+memoria, y si un trabajo modifica su vista, pandas copia solo esa columna,
+así que el original del almacén nunca se corrompe.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+from importacion_diferida import diferido
+
+# pandas y modelo_datos se cargan con el primer dataset, no al importar el servidor
+pd = diferido("pandas")
+modelo_datos = diferido("modelo_datos")
+
+DATASETS = {
+    "clientes": "df_clientes_limpio",
+    "productos": "df_productos_limpio",
+    "ventas": "df_ventas_limpio",
+    "detalle_ventas": "df_detalle_ventas_limpio",
+}
+
+# Un texto se guarda como 'category' si tiene menos de esta fracción de únicos
+MAX_FRACCION_UNICOS = 0.5
+INTERVALO_VERIFICACION = 2.0
+
+
+def _activar_copy_on_write():
+    # Copy-on-Write es el comportamiento por defecto desde pandas 3.0
+    if hasattr(pd.options.mode, "copy_on_write"):
+        pd.options.mode.copy_on_write = True
+
+
+def compactar(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Reduce enteros al dtype mínimo y textos repetidos a 'category'."""
+    columnas = {}
+    for col in df.columns:
+        s = df[col]
+        if pd.api.types.is_integer_dtype(s):
+            s = pd.to_numeric(s, downcast="integer")
+        elif (pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s)) and len(s):
+            if s.nunique(dropna=True) / len(s) < MAX_FRACCION_UNICOS:
+                s = s.astype("category")
+        columnas[col] = s
+    return pd.DataFrame(columnas, index=df.index)
+
+
+class _Entrada:
+    def __init__(self, nombre_catalogo: str):
+        self.nombre_catalogo = nombre_catalogo
+        self.ruta: Path | None = None
+        self.mtime_ns: int | None = None
+        self.df: pd.DataFrame | None = None
+
+
+# ==========================================================
+# ALMACÉN
+# ==========================================================
+class AlmacenDatasets:
+    """Datasets cargados una vez por proceso y recargados solo si cambian."""
+
+    def __init__(self, datasets: dict[str, str] | None = None,
+                 intervalo_verificacion: float = INTERVALO_VERIFICACION):
+        self._entradas = {n: _Entrada(c) for n, c in (datasets or DATASETS).items()}
+        self._lock = threading.RLock()
+        self._intervalo = intervalo_verificacion
+        self._ultima_verificacion = 0.0
+        self._vigilante: threading.Thread | None = None
+        self._detener = threading.Event()
+
+    def nombres(self) -> list[str]:
+        return list(self._entradas)
+
+    def _cargar(self, nombre: str):
+        _activar_copy_on_write()
+        entrada = self._entradas[nombre]
+        # Tablas particionadas: se vigila su marcador (se reescribe en cada exportación)
+        ruta = modelo_datos.archivo_vigilado(nombre)
+        mtime = ruta.stat().st_mtime_ns
+        df = compactar(modelo_datos.leer_tabla(nombre))
+        entrada.ruta, entrada.mtime_ns, entrada.df = ruta, mtime, df
+        print(f"📦 Almacén: '{nombre}' cargado ({df.shape[0]} filas, "
+              f"{df.memory_usage(deep=True).sum() / 1024:.1f} KB)")
+
+    def refrescar_si_cambio(self) -> list[str]:
+        """Recarga los datasets cuyo archivo cambió en disco. Devuelve sus nombres."""
+        cambiados = []
+        with self._lock:
+            for nombre, entrada in self._entradas.items():
+                if entrada.df is None:
+                    continue
+                try:
+                    mtime = entrada.ruta.stat().st_mtime_ns
+                except OSError:
+                    mtime = None
+                if mtime != entrada.mtime_ns:
+                    self._cargar(nombre)
+                    cambiados.append(nombre)
+            self._ultima_verificacion = time.monotonic()
+        return cambiados
+
+    def vista(self, nombre: str) -> "pd.DataFrame":
+        """Vista (copia superficial, Copy-on-Write) de un dataset."""
+        with self._lock:
+            if time.monotonic() - self._ultima_verificacion > self._intervalo:
+                self.refrescar_si_cambio()
+            entrada = self._entradas[nombre]
+            if entrada.df is None:
+                self._cargar(nombre)
+            return entrada.df.copy(deep=False)
+
+    def vistas(self) -> "dict[str, pd.DataFrame]":
+        return {n: self.vista(n) for n in self._entradas}
+
+    def firma(self, nombres=None) -> tuple:
+        """
+        Cambia cuando se recarga algún dataset: sirve de clave para cachear
+        resultados. Con `nombres`, solo cuentan esos datasets.
+        """
+        with self._lock:
+            if time.monotonic() - self._ultima_verificacion > self._intervalo:
+                self.refrescar_si_cambio()
+            return tuple((n, e.mtime_ns) for n, e in self._entradas.items()
+                         if nombres is None or n in nombres)
+
+    def instantanea(self, nombres=None) -> "tuple[dict[str, pd.DataFrame], tuple]":
+        """
+        Vistas de `nombres` (todos si None) y la firma que les corresponde,
+        tomadas juntas: ninguna recarga puede colarse entre unas y otra.
+        """
+        with self._lock:
+            nombres = list(self._entradas) if nombres is None else list(nombres)
+            vistas = {n: self.vista(n) for n in nombres}
+            return vistas, self.firma(nombres)
+
+    def memoria(self) -> dict[str, int]:
+        """Bytes en memoria por dataset cargado."""
+        with self._lock:
+            return {
+                n: int(e.df.memory_usage(deep=True).sum())
+                for n, e in self._entradas.items() if e.df is not None
+            }
+
+    # ------------------------------------------------------
+    # Vigilancia en segundo plano
+    # ------------------------------------------------------
+    def vigilar(self, intervalo: float = 5.0) -> threading.Thread:
+        """Hilo daemon que revisa los archivos cada `intervalo` segundos."""
+        if self._vigilante is not None and self._vigilante.is_alive():
+            return self._vigilante
+
+        def _bucle():
+            while not self._detener.wait(intervalo):
+                try:
+                    self.refrescar_si_cambio()
+                except Exception as e:
+                    print(f"❌ Almacén: error al refrescar datasets: {e}")
+
+        self._detener.clear()
+        self._vigilante = threading.Thread(target=_bucle, name="almacen-vigilante", daemon=True)
+        self._vigilante.start()
+        return self._vigilante
+
+    def detener(self):
+        self._detener.set()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+"Comprados juntos": pares y conjuntos de productos frecuentes en los tickets
+y reglas de asociación para venta cruzada (cálculos en aurelion.canasta).
+
+    python analisis_canasta.py [--soporte 2] [--confianza 0.1] [--desde AAAA-MM] [--hasta AAAA-MM]
+"""
+
+import pandas as pd
+
+from aurelion.canasta import (CONFIANZA_MIN, SOPORTE_MIN, comprados_juntos,
+                              itemsets_frecuentes, matriz_canastas, pares_frecuentes, reglas)
+from modelo_datos import leer_tabla
+
+TOP = 10
+
+
+def _nombres(df_productos: pd.DataFrame) -> dict:
+    return df_productos.set_index("id_producto")["nombre_producto"].astype(str).to_dict()
+
+
+def imprimir_resumen(df_detalle: pd.DataFrame, df_productos: pd.DataFrame,
+                     soporte_min: int = SOPORTE_MIN, confianza_min: float = CONFIANZA_MIN,
+                     top: int = TOP):
+    nombres = _nombres(df_productos)
+
+    def nombre(i):
+        return nombres.get(i, f"#{i}")
+
+    canastas = matriz_canastas(df_detalle)
+    print(f"🧺 {canastas.n_tickets} tickets, {len(canastas.ids_producto)} productos, "
+          f"{canastas.matriz.nnz} líneas (soporte mínimo: {soporte_min} tickets)")
+
+    # --- Pares (co-ocurrencias) ---
+    pares = pares_frecuentes(canastas, soporte_min)
+    print(f"\n🤝 Top {top} pares comprados juntos ({len(pares)} pares frecuentes):")
+    if pares.empty:
+        print("   (ningún par llega al soporte mínimo)")
+    else:
+        tabla = pares.head(top).assign(
+            producto_a=lambda d: d["producto_a"].map(nombre),
+            producto_b=lambda d: d["producto_b"].map(nombre),
+        )
+        print(tabla.to_string(index=False))
+
+    # --- Conjuntos y reglas (FP-growth) ---
+    itemsets = itemsets_frecuentes(canastas, soporte_min)
+    por_tamanio = pd.Series([len(c) for c in itemsets]).value_counts().sort_index()
+    print("\n📦 Conjuntos frecuentes por tamaño:",
+          ", ".join(f"{k}: {v}" for k, v in por_tamanio.items()) or "ninguno")
+
+    tabla_reglas = reglas(itemsets, canastas.n_tickets, confianza_min)
+    print(f"\n🔗 Top {top} reglas por lift ({len(tabla_reglas)} con confianza >= {confianza_min:.0%}):")
+    if tabla_reglas.empty:
+        print("   (ninguna regla)")
+    else:
+        tabla = tabla_reglas.head(top).assign(
+            antecedente=lambda d: d["antecedente"].map(lambda a: " + ".join(nombre(i) for i in a)),
+            consecuente=lambda d: d["consecuente"].map(nombre),
+        )
+        print(tabla.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    # --- Sugerencias para los productos más vendidos ---
+    soporte = pd.Series(canastas.soporte_productos(), index=canastas.ids_producto)
+    print("\n🛒 Sugerencias para los 5 productos en más tickets:")
+    for id_producto in soporte.sort_values(ascending=False).head(5).index:
+        juntos = comprados_juntos(pares, id_producto, top=3)
+        sugeridos = ", ".join(f"{nombre(i)} ({s})" for i, s in zip(juntos["id_producto"], juntos["soporte"]))
+        print(f"   - {nombre(id_producto)}: {sugeridos or 'sin pares frecuentes'}")
+
+
+def main(soporte_min=SOPORTE_MIN, confianza_min=CONFIANZA_MIN, desde=None, hasta=None):
+    print("--- 🧺 ANÁLISIS DE CANASTA ---")
+    df_detalle = leer_tabla("detalle_ventas", ["id_venta", "id_producto"], desde=desde, hasta=hasta)
+    df_productos = leer_tabla("productos", ["id_producto", "nombre_producto"])
+    imprimir_resumen(df_detalle, df_productos, soporte_min, confianza_min)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Análisis de canasta (comprados juntos)")
+    parser.add_argument("--soporte", type=int, default=SOPORTE_MIN, help="Tickets mínimos por conjunto")
+    parser.add_argument("--confianza", type=float, default=CONFIANZA_MIN, help="Confianza mínima de las reglas")
+    parser.add_argument("--desde", help="Primer mes a incluir (AAAA-MM)")
+    parser.add_argument("--hasta", help="Último mes a incluir (AAAA-MM)")
+    args = parser.parse_args()
+    main(args.soporte, args.confianza, args.desde, args.hasta)
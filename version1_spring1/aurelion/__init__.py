@@ -0,0 +1,21 @@
+"""
+Etapas del análisis de la Tienda Aurelion como funciones puras.
+
+- aurelion.limpieza: tablas de origen -> tablas limpias + filas rechazadas
+- aurelion.features: tablas limpias -> dataframe a nivel ticket, aumento, X / y
+- aurelion.estadisticas: tablas -> resúmenes (describe, distribuciones, correlaciones)
+- aurelion.modelos: X / y -> clasificadores entrenados con sus métricas
+- aurelion.flujo: compone las etapas en memoria, sin CSV intermedios
+
+Los motores que usan las etapas también viven acá, así el paquete no
+depende de los scripts: reglas_limpieza, integridad, motor_estadisticas,
+motor_correlaciones y sketches.
+
+Las funciones reciben y devuelven DataFrames / arrays: no escriben archivos,
+no imprimen y no dibujan (los motores aceptan también rutas a CSV, que leen
+por chunks). Eso queda en los scripts (limpieza-analisis_corregido.py,
+crear_dataframe.py, ModeloML.py, ...), que son envoltorios de E/S sobre este
+paquete.
+
+Los submódulos no se importan acá: `import aurelion` no carga pandas.
+"""
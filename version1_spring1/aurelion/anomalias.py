@@ -0,0 +1,143 @@
+"""
+Detección de tickets sospechosos a medida que llegan (un ticket por vez).
+
+Cada ticket se puntúa con lo visto hasta ese momento y después se suma a
+las estadísticas (primero puntuar, después aprender), con tres señales:
+
+- importe: z robusto del log del precio por unidad (importe / cantidad) de
+  cada línea contra la mediana / MAD de ese producto (sketches.SketchRobusto,
+  uno por producto). Marca importes que no cuadran con los productos y
+  cantidades del ticket.
+- repetido: mismo cliente, medio de pago y líneas idénticas que otro ticket
+  de los últimos `ventana_dias` días.
+- medio de pago: probabilidad (suavizada) del medio de pago en la ciudad
+  del cliente; se marca si es muy rara.
+
+Todo es O(líneas del ticket) con dicts: unos microsegundos por ticket.
+"""
+
+import math
+from collections import deque
+from typing import NamedTuple
+
+from aurelion.sketches import SketchRobusto
+
+Z_UMBRAL = 3.5  # z robusto a partir del cual un importe es atípico
+MIN_OBSERVACIONES = 5  # historia mínima de un producto / ciudad para opinar
+PROB_MEDIO_MIN = 0.05
+VENTANA_REPETIDOS_DIAS = 1
+SUAVIZADO_MEDIO = 1.0
+
+
+class Ticket(NamedTuple):
+    id_venta: int
+    dia: int  # días desde 1970-01-01
+    id_cliente: int
+    ciudad: str | None
+    medio_pago: str | None
+    lineas: tuple  # ((id_producto, cantidad, importe), ...)
+
+
+class Resultado(NamedTuple):
+    id_venta: int
+    z_importe: float  # el mayor |z| de sus líneas (NaN si ningún producto tiene historia)
+    prob_medio: float  # NaN si la ciudad no tiene historia
+    repetido_de: int | None  # id_venta del ticket idéntico anterior
+    motivos: tuple
+
+    @property
+    def sospechoso(self) -> bool:
+        return bool(self.motivos)
+
+
+class DetectorAnomalias:
+    """Estadísticas robustas por producto y por ciudad, actualizadas ticket a ticket."""
+
+    def __init__(self, z_umbral: float = Z_UMBRAL, prob_medio_min: float = PROB_MEDIO_MIN,
+                 ventana_dias: int = VENTANA_REPETIDOS_DIAS, min_observaciones: int = MIN_OBSERVACIONES):
+        self.z_umbral = z_umbral
+        self.prob_medio_min = prob_medio_min
+        self.ventana_dias = ventana_dias
+        self.min_observaciones = min_observaciones
+        self.procesados = 0
+        self._precios: dict = {}  # id_producto -> SketchRobusto de log(importe / cantidad)
+        self._medios: dict = {}  # ciudad -> {medio_pago: tickets}
+        self._medios_conocidos: set = set()
+        self._recientes: dict = {}  # firma del ticket -> (dia, id_venta)
+        self._cola: deque = deque()  # (dia, firma) en orden de llegada
+
+    def __repr__(self):
+        return (f"DetectorAnomalias({self.procesados} tickets, {len(self._precios)} productos, "
+                f"{len(self._medios)} ciudades)")
+
+    @staticmethod
+    def _log_precio(cantidad, importe) -> float:
+        return math.log(importe / cantidad) if cantidad > 0 and importe > 0 else math.nan
+
+    @staticmethod
+    def _firma(ticket: Ticket) -> tuple:
+        return ticket.id_cliente, ticket.medio_pago, tuple(sorted(ticket.lineas))
+
+    # ------------------------------------------------------
+    # PUNTUAR
+    # ------------------------------------------------------
+    def puntuar(self, ticket: Ticket) -> Resultado:
+        motivos = []
+
+        z_max = math.nan
+        for id_producto, cantidad, importe in ticket.lineas:
+            sketch = self._precios.get(id_producto)
+            if sketch is None or sketch.vistos < self.min_observaciones:
+                continue
+            z = sketch.z_robusto(self._log_precio(cantidad, importe))
+            if z == z and not abs(z) <= abs(z_max):  # z no NaN; reemplaza el NaN inicial
+                z_max = z
+        if abs(z_max) >= self.z_umbral:
+            motivos.append(f"importe atípico (z={z_max:+.1f})")
+
+        repetido_de = None
+        previo = self._recientes.get(self._firma(ticket))
+        if previo is not None and ticket.dia - previo[0] <= self.ventana_dias:
+            repetido_de = previo[1]
+            motivos.append(f"repite la venta {repetido_de}")
+
+        prob = math.nan
+        conteos = self._medios.get(ticket.ciudad)
+        if conteos is not None:
+            total = sum(conteos.values())
+            if total >= self.min_observaciones:
+                k = len(self._medios_conocidos) + (ticket.medio_pago not in self._medios_conocidos)
+                prob = (conteos.get(ticket.medio_pago, 0) + SUAVIZADO_MEDIO) / (total + SUAVIZADO_MEDIO * k)
+                if prob < self.prob_medio_min:
+                    motivos.append(f"medio de pago raro en {ticket.ciudad} ({prob:.0%})")
+
+        return Resultado(ticket.id_venta, z_max, prob, repetido_de, tuple(motivos))
+
+    # ------------------------------------------------------
+    # APRENDER
+    # ------------------------------------------------------
+    def observar(self, ticket: Ticket):
+        for id_producto, cantidad, importe in ticket.lineas:
+            sketch = self._precios.get(id_producto)
+            if sketch is None:
+                sketch = self._precios[id_producto] = SketchRobusto()
+            sketch.agregar(self._log_precio(cantidad, importe))
+
+        conteos = self._medios.setdefault(ticket.ciudad, {})
+        conteos[ticket.medio_pago] = conteos.get(ticket.medio_pago, 0) + 1
+        self._medios_conocidos.add(ticket.medio_pago)
+
+        # Solo se recuerdan los tickets dentro de la ventana de repetidos
+        firma = self._firma(ticket)
+        self._recientes[firma] = (ticket.dia, ticket.id_venta)
+        self._cola.append((ticket.dia, firma))
+        while self._cola and self._cola[0][0] < ticket.dia - self.ventana_dias:
+            dia, vieja = self._cola.popleft()
+            if self._recientes.get(vieja, (None,))[0] == dia:
+                del self._recientes[vieja]
+        self.procesados += 1
+
+    def procesar(self, ticket: Ticket) -> Resultado:
+        resultado = self.puntuar(ticket)
+        self.observar(ticket)
+        return resultado
@@ -0,0 +1,79 @@
+"""
+Joins "as-of": a cada fila de la izquierda se le pega la última fila de la
+derecha con la misma clave y un tiempo anterior (o igual) al suyo, como
+pd.merge_asof con `by`, pero sin exigir que las entradas vengan ordenadas y
+devolviendo las filas en el orden original.
+
+Clave y tiempo se codifican en un solo entero (código de la clave, rango del
+tiempo); la derecha se ordena una vez y cada fila de la izquierda es una
+búsqueda binaria: O(n log n) en total, sin bucles por cliente.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _tiempos(valores) -> tuple[np.ndarray, np.ndarray]:
+    """Fechas o números -> (int64 comparables, máscara de faltantes)."""
+    serie = pd.Series(valores)
+    if pd.api.types.is_datetime64_any_dtype(serie) or serie.dtype == object:
+        serie = pd.to_datetime(serie, errors="coerce")
+        faltantes = serie.isna().to_numpy()
+        return serie.to_numpy(dtype="datetime64[ns]").view(np.int64), faltantes
+    faltantes = serie.isna().to_numpy()
+    return serie.fillna(0).to_numpy(dtype=np.float64), faltantes
+
+
+def indices_asof(claves_izq, tiempos_izq, claves_der, tiempos_der,
+                 estricto: bool = False) -> np.ndarray:
+    """
+    Para cada fila de la izquierda, la posición de la fila vigente de la
+    derecha (misma clave, tiempo <= el suyo; < con `estricto`) o -1.
+    """
+    n_izq = len(claves_izq)
+    codigos, _ = pd.factorize(np.concatenate([np.asarray(claves_izq), np.asarray(claves_der)]))
+    k_izq, k_der = codigos[:n_izq], codigos[n_izq:]
+    t_izq, nulo_izq = _tiempos(tiempos_izq)
+    t_der, nulo_der = _tiempos(tiempos_der)
+
+    # Tiempos -> rango denso común, para que (clave, tiempo) entre en un int64
+    _, rangos = np.unique(np.concatenate([t_izq, t_der]), return_inverse=True)
+    r_izq, r_der = rangos[:n_izq], rangos[n_izq:]
+    base = int(rangos.max(initial=0)) + 1
+    combinado_izq = k_izq.astype(np.int64) * base + r_izq
+    combinado_der = k_der.astype(np.int64) * base + r_der
+
+    # Filas de la derecha utilizables, ordenadas por (clave, tiempo)
+    utiles = np.flatnonzero((k_der >= 0) & ~nulo_der)
+    utiles = utiles[np.argsort(combinado_der[utiles], kind="stable")]
+    ordenado = combinado_der[utiles]
+
+    lado = "left" if estricto else "right"
+    pos = np.searchsorted(ordenado, combinado_izq, side=lado) - 1
+    validos = (pos >= 0) & (k_izq >= 0) & ~nulo_izq
+    pos_segura = np.where(validos, pos, 0)
+    if len(utiles):
+        validos &= k_der[utiles[pos_segura]] == k_izq
+    else:
+        validos[:] = False
+    return np.where(validos, utiles[pos_segura] if len(utiles) else 0, -1)
+
+
+def tomar(serie: pd.Series, indices: np.ndarray):
+    """serie[indices] posicional; -1 deja faltante (el dtype se mantiene si no hay)."""
+    return serie.array.take(indices, allow_fill=bool((indices < 0).any()))
+
+
+def unir_asof(izq: pd.DataFrame, der: pd.DataFrame, por: str, en_izq: str,
+              en_der: str | None = None, columnas: list[str] | None = None,
+              estricto: bool = False) -> pd.DataFrame:
+    """
+    Agrega a `izq` las `columnas` de `der` (por defecto, todas menos `por`)
+    de la fila vigente en `izq[en_izq]`: misma `por` y `der[en_der]` <= tiempo.
+    """
+    en_der = en_der or en_izq
+    if columnas is None:
+        columnas = [c for c in der.columns if c != por]
+    indices = indices_asof(izq[por].to_numpy(), izq[en_izq], der[por].to_numpy(), der[en_der],
+                           estricto=estricto)
+    return izq.assign(**{c: tomar(der[c], indices) for c in columnas})
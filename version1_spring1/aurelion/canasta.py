@@ -0,0 +1,196 @@
+"""
+Análisis de canasta: qué productos se compran juntos.
+
+- matriz_canastas(): detalle -> matriz dispersa CSR tickets x productos
+  (1 si el ticket tiene el producto). Ocupa ~ una posición por línea de
+  detalle, sin importar cuántos productos haya.
+- pares_frecuentes(): co-ocurrencias de a pares con un solo producto
+  matricial disperso (Xᵀ·X), después de descartar los productos que no
+  llegan al soporte mínimo.
+- itemsets_frecuentes(): FP-growth para conjuntos de cualquier tamaño. Las
+  canastas idénticas se agrupan antes (se cuentan una vez, con su peso).
+- reglas(): A -> b con soporte, confianza y lift.
+"""
+
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+SOPORTE_MIN = 2  # tickets en los que tiene que aparecer un conjunto
+CONFIANZA_MIN = 0.1
+MAX_TAMANIO = 4
+
+
+# ==========================================================
+# MATRIZ DE CANASTAS
+# ==========================================================
+class Canastas:
+    """Matriz CSR (tickets x productos) y los ids de cada fila y columna."""
+
+    def __init__(self, matriz: sparse.csr_matrix, ids_venta: np.ndarray, ids_producto: np.ndarray):
+        self.matriz = matriz
+        self.ids_venta = ids_venta
+        self.ids_producto = ids_producto
+
+    @property
+    def n_tickets(self) -> int:
+        return self.matriz.shape[0]
+
+    def soporte_productos(self) -> np.ndarray:
+        """Tickets en los que aparece cada producto (columna)."""
+        return np.asarray(self.matriz.sum(axis=0)).ravel()
+
+    def __repr__(self):
+        return f"Canastas({self.n_tickets} tickets, {len(self.ids_producto)} productos, {self.matriz.nnz} líneas)"
+
+
+def matriz_canastas(df_detalle: pd.DataFrame) -> Canastas:
+    """(id_venta, id_producto) -> Canastas. Un producto repetido en el ticket cuenta una vez."""
+    filas, ids_venta = pd.factorize(df_detalle["id_venta"], sort=True)
+    columnas, ids_producto = pd.factorize(df_detalle["id_producto"], sort=True)
+    validos = (filas >= 0) & (columnas >= 0)
+    matriz = sparse.csr_matrix(
+        (np.ones(validos.sum(), dtype=np.int32), (filas[validos], columnas[validos])),
+        shape=(len(ids_venta), len(ids_producto)),
+    )
+    matriz.sum_duplicates()
+    matriz.data[:] = 1
+    return Canastas(matriz, np.asarray(ids_venta), np.asarray(ids_producto))
+
+
+# ==========================================================
+# PARES (VECTORIZADO)
+# ==========================================================
+def pares_frecuentes(canastas: Canastas, soporte_min: int = SOPORTE_MIN) -> pd.DataFrame:
+    """
+    Pares de productos que aparecen juntos en >= soporte_min tickets:
+    producto_a, producto_b (a < b), soporte (tickets) y el soporte de cada uno.
+    """
+    soporte = canastas.soporte_productos()
+    # Un par no puede ser más frecuente que sus productos: se filtran antes
+    utiles = np.flatnonzero(soporte >= soporte_min)
+    X = canastas.matriz[:, utiles]
+    conteos = sparse.triu(X.T @ X, k=1).tocoo()
+    frecuentes = conteos.data >= soporte_min
+    a, b = utiles[conteos.row[frecuentes]], utiles[conteos.col[frecuentes]]
+    pares = pd.DataFrame({
+        "producto_a": canastas.ids_producto[a],
+        "producto_b": canastas.ids_producto[b],
+        "soporte": conteos.data[frecuentes].astype(np.int64),
+        "soporte_a": soporte[a],
+        "soporte_b": soporte[b],
+    })
+    return pares.sort_values(["soporte", "producto_a", "producto_b"],
+                             ascending=[False, True, True], ignore_index=True)
+
+
+# ==========================================================
+# FP-GROWTH
+# ==========================================================
+class _Nodo:
+    __slots__ = ("item", "padre", "cuenta", "hijos")
+
+    def __init__(self, item, padre):
+        self.item = item
+        self.padre = padre
+        self.cuenta = 0
+        self.hijos = {}
+
+
+def _fp_growth(transacciones, soporte_min, sufijo, salida, max_tamanio):
+    """transacciones: [(items, peso)]. Agrega a `salida` {itemset: soporte}."""
+    conteo = Counter()
+    for items, peso in transacciones:
+        for item in items:
+            conteo[item] += peso
+    frecuentes = {i: c for i, c in conteo.items() if c >= soporte_min}
+    if not frecuentes:
+        return
+    orden = sorted(frecuentes, key=lambda i: (-frecuentes[i], i))
+    rango = {item: r for r, item in enumerate(orden)}
+
+    # Árbol FP: los caminos comparten prefijos (items más frecuentes primero)
+    raiz = _Nodo(None, None)
+    cabeceras = defaultdict(list)
+    for items, peso in transacciones:
+        nodo = raiz
+        for item in sorted((i for i in items if i in rango), key=rango.__getitem__):
+            hijo = nodo.hijos.get(item)
+            if hijo is None:
+                hijo = nodo.hijos[item] = _Nodo(item, nodo)
+                cabeceras[item].append(hijo)
+            hijo.cuenta += peso
+            nodo = hijo
+
+    # Del menos frecuente al más frecuente: base condicional de cada item
+    for item in reversed(orden):
+        conjunto = sufijo + (item,)
+        salida[tuple(sorted(conjunto))] = frecuentes[item]
+        if len(conjunto) >= max_tamanio:
+            continue
+        base = []
+        for nodo in cabeceras[item]:
+            camino, padre = [], nodo.padre
+            while padre.item is not None:
+                camino.append(padre.item)
+                padre = padre.padre
+            if camino:
+                base.append((camino, nodo.cuenta))
+        _fp_growth(base, soporte_min, conjunto, salida, max_tamanio)
+
+
+def itemsets_frecuentes(canastas: Canastas, soporte_min: int = SOPORTE_MIN,
+                        max_tamanio: int = MAX_TAMANIO) -> dict[tuple, int]:
+    """{(id_producto, ...): tickets} para todos los conjuntos con soporte >= soporte_min."""
+    X = canastas.matriz
+    # Canastas idénticas una sola vez, con su cantidad como peso
+    pesos = Counter(
+        tuple(X.indices[X.indptr[i]:X.indptr[i + 1]]) for i in range(X.shape[0])
+    )
+    salida: dict[tuple, int] = {}
+    _fp_growth(list(pesos.items()), soporte_min, (), salida, max_tamanio)
+    ids = canastas.ids_producto
+    return {tuple(ids[list(c)].tolist()): s for c, s in salida.items()}
+
+
+# ==========================================================
+# REGLAS
+# ==========================================================
+def reglas(itemsets: dict[tuple, int], n_tickets: int,
+           confianza_min: float = CONFIANZA_MIN) -> pd.DataFrame:
+    """
+    Reglas antecedente -> consecuente (un producto) de cada itemset de 2+
+    productos: soporte (fracción de tickets), confianza y lift.
+    """
+    filas = []
+    for conjunto, soporte in itemsets.items():
+        if len(conjunto) < 2:
+            continue
+        for consecuente in conjunto:
+            antecedente = tuple(i for i in conjunto if i != consecuente)
+            confianza = soporte / itemsets[antecedente]
+            if confianza < confianza_min:
+                continue
+            filas.append({
+                "antecedente": antecedente,
+                "consecuente": consecuente,
+                "soporte": soporte / n_tickets,
+                "confianza": confianza,
+                "lift": confianza / (itemsets[(consecuente,)] / n_tickets),
+                "tickets": soporte,
+            })
+    columnas = ["antecedente", "consecuente", "soporte", "confianza", "lift", "tickets"]
+    tabla = pd.DataFrame(filas, columns=columnas)
+    return tabla.sort_values(["lift", "confianza", "tickets"], ascending=False, ignore_index=True)
+
+
+def comprados_juntos(pares: pd.DataFrame, id_producto, top: int = 5) -> pd.DataFrame:
+    """Productos que más aparecen con `id_producto` (para sugerir en la venta)."""
+    con_a = pares[pares["producto_a"] == id_producto].rename(
+        columns={"producto_b": "id_producto", "soporte_b": "soporte_producto"})
+    con_b = pares[pares["producto_b"] == id_producto].rename(
+        columns={"producto_a": "id_producto", "soporte_a": "soporte_producto"})
+    juntos = pd.concat([con_a, con_b], ignore_index=True)[["id_producto", "soporte", "soporte_producto"]]
+    return juntos.sort_values(["soporte", "id_producto"], ascending=[False, True]).head(top)
@@ -0,0 +1,269 @@
+"""
+Features de cliente (RFM): recencia, frecuencia, monto y gasto en ventanas
+móviles, por id_cliente.
+
+Se agregan las compras de cada mes por cliente y se guardan solo sus sumas
+acumuladas, en matrices [mes, cliente] con una columna por cliente que
+compró alguna vez (ids factorizados: la memoria no depende del id más alto).
+Las features de un ticket son una lectura de la fila "meses anteriores a su
+fecha" en la columna de su cliente: O(1) por ticket, sin merge. Solo se usan meses anteriores al del ticket, así el
+ticket no se ve a sí mismo (ni a compras posteriores) en sus features.
+
+Para armar el set de entrenamiento, rfm_al_momento() calcula las mismas
+columnas al día exacto de cada ticket (join as-of sobre la historia de
+compras del cliente): también cuenta las compras anteriores del mismo mes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from aurelion.asof import indices_asof
+
+VENTANAS_MESES = (3, 6)
+SIN_COMPRAS_PREVIAS = -1  # recencia de un cliente sin compras anteriores
+_SIN_FECHA = np.iinfo(np.int32).min
+
+COLUMNAS_CLIENTE = [
+    "rfm_recencia_dias",
+    "rfm_frecuencia",
+    "rfm_monto",
+    "rfm_ticket_promedio",
+    *(f"rfm_compras_{v}m" for v in VENTANAS_MESES),
+    *(f"rfm_gasto_{v}m" for v in VENTANAS_MESES),
+]
+# Las que son conteos (enteros)
+COLUMNAS_CLIENTE_ENTERAS = [
+    "rfm_recencia_dias",
+    "rfm_frecuencia",
+    *(f"rfm_compras_{v}m" for v in VENTANAS_MESES),
+]
+
+
+def _dias(fechas) -> np.ndarray:
+    """Fechas -> días desde 1970-01-01 (int32); faltantes -> _SIN_FECHA."""
+    fechas = pd.to_datetime(pd.Series(fechas), errors="coerce")
+    dias = fechas.to_numpy(dtype="datetime64[D]").astype(np.int64)
+    dias[fechas.isna().to_numpy()] = _SIN_FECHA
+    return dias.astype(np.int32)
+
+
+def _mes_entero(mes) -> np.ndarray:
+    """'AAAA-MM' o fechas -> año * 12 + mes (para ordenar y buscar)."""
+    periodos = pd.PeriodIndex(pd.to_datetime(pd.Series(mes), errors="coerce"), freq="M")
+    return np.where(periodos.isna(), -1, periodos.year * 12 + periodos.month - 1)
+
+
+# ==========================================================
+# AGREGADO DE UN MES
+# ==========================================================
+def agregar_mes(df_ventas: pd.DataFrame, df_ticket: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ventas (id_venta, id_cliente, fecha) + tickets (id_venta, ticket_total,
+    num_items) de un mes -> una fila por cliente: compras, gasto, unidades y
+    día de la última compra.
+    """
+    df = df_ventas[["id_venta", "id_cliente", "fecha"]].merge(
+        df_ticket[["id_venta", "ticket_total", "num_items"]], on="id_venta", how="left"
+    )
+    df = df.assign(dia=_dias(df["fecha"]))
+    return (
+        df.dropna(subset=["id_cliente"])
+        .groupby("id_cliente")
+        .agg(
+            compras=("id_venta", "size"),
+            gasto=("ticket_total", "sum"),
+            unidades=("num_items", "sum"),
+            ultima=("dia", "max"),
+        )
+        .reset_index()
+    )
+
+
+# ==========================================================
+# ALMACÉN DENSO (mes x cliente)
+# ==========================================================
+class FeaturesClientes:
+    """
+    Acumulados mensuales por cliente en matrices [mes, cliente]: la fila k
+    resume los meses 0..k-1 y la columna j es el cliente ids[j].
+    """
+
+    def __init__(self, meses: list[str], ids: np.ndarray, compras: np.ndarray,
+                 gasto: np.ndarray, ultima: np.ndarray):
+        """`compras`, `gasto`, `ultima`: [mes, cliente] del mes solo (se acumulan en el lugar)."""
+        self.meses = list(meses)
+        self._meses_int = _mes_entero(self.meses)
+        self.ids = np.asarray(ids, dtype=np.int64)
+
+        n_ids = len(self.ids)
+        self._acum_compras = np.zeros((len(self.meses) + 1, n_ids), dtype=np.int64)
+        np.cumsum(compras, axis=0, out=self._acum_compras[1:])
+        self._acum_gasto = np.zeros((len(self.meses) + 1, n_ids), dtype=np.float64)
+        np.cumsum(gasto, axis=0, out=self._acum_gasto[1:])
+        self._acum_ultima = np.full((len(self.meses) + 1, n_ids), _SIN_FECHA, dtype=np.int32)
+        np.maximum.accumulate(ultima, axis=0, out=self._acum_ultima[1:])
+
+    @property
+    def n_ids(self) -> int:
+        return len(self.ids)
+
+    def __repr__(self):
+        return f"FeaturesClientes({len(self.meses)} meses, {self.n_ids} clientes)"
+
+    @classmethod
+    def desde_meses(cls, agregados: dict[str, pd.DataFrame]) -> "FeaturesClientes":
+        """{'AAAA-MM': agregar_mes(...)} -> matrices densas, meses en orden."""
+        meses = sorted(agregados)
+        ids = np.unique(np.concatenate(
+            [agregados[m]["id_cliente"].to_numpy(dtype=np.int64) for m in meses] or [np.empty(0, np.int64)]
+        ))
+        forma = (len(meses), len(ids))
+        compras = np.zeros(forma, dtype=np.int64)
+        gasto = np.zeros(forma, dtype=np.float64)
+        ultima = np.full(forma, _SIN_FECHA, dtype=np.int32)
+        for i, mes in enumerate(meses):
+            a = agregados[mes]
+            col = np.searchsorted(ids, a["id_cliente"].to_numpy(dtype=np.int64))
+            compras[i, col] = a["compras"].to_numpy()
+            gasto[i, col] = a["gasto"].to_numpy()
+            ultima[i, col] = a["ultima"].to_numpy()
+        return cls(meses, ids, compras, gasto, ultima)
+
+    @classmethod
+    def desde_tablas(cls, df_ventas: pd.DataFrame, df_ticket: pd.DataFrame) -> "FeaturesClientes":
+        """Todo en memoria: ventas + tickets completos, separados por mes."""
+        meses = pd.to_datetime(df_ventas["fecha"], errors="coerce").dt.to_period("M")
+        agregados = {
+            str(mes): agregar_mes(parte, df_ticket)
+            for mes, parte in df_ventas.groupby(meses)
+        }
+        return cls.desde_meses(agregados)
+
+    # ------------------------------------------------------
+    # LECTURAS O(1)
+    # ------------------------------------------------------
+    def _columnas(self, ids) -> tuple[np.ndarray, np.ndarray]:
+        """Columna de cada id y si es un cliente conocido (faltantes y desconocidos: no)."""
+        ids = np.asarray(ids, dtype=np.float64)
+        if not self.n_ids:
+            return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+        col = np.minimum(np.searchsorted(self.ids, ids), self.n_ids - 1)
+        return col, self.ids[col] == ids
+
+    def _leer(self, k: np.ndarray, col: np.ndarray, validos: np.ndarray) -> dict[str, np.ndarray]:
+        """Features con los meses 0..k-1, para cada par (k, columna)."""
+        def acum(matriz, filas):
+            return np.where(validos, matriz[filas, col], 0)
+
+        frecuencia = acum(self._acum_compras, k)
+        monto = acum(self._acum_gasto, k)
+        datos = {
+            "rfm_frecuencia": frecuencia,
+            "rfm_monto": monto,
+            "rfm_ticket_promedio": np.divide(
+                monto, frecuencia, out=np.zeros(len(col)), where=frecuencia > 0
+            ),
+            "_ultima": np.where(validos, self._acum_ultima[k, col], _SIN_FECHA),
+        }
+        for v in VENTANAS_MESES:
+            inicio = np.maximum(k - v, 0)
+            datos[f"rfm_compras_{v}m"] = frecuencia - acum(self._acum_compras, inicio)
+            datos[f"rfm_gasto_{v}m"] = monto - acum(self._acum_gasto, inicio)
+        return datos
+
+    def unir(self, df: pd.DataFrame, columna_cliente: str = "id_cliente",
+             columna_fecha: str = "fecha") -> pd.DataFrame:
+        """
+        Agrega COLUMNAS_CLIENTE a cada fila de `df` con la historia del
+        cliente hasta el mes anterior a su fecha (recencia contada desde la fecha).
+        """
+        # Cantidad de meses del almacén anteriores al mes de cada ticket
+        k = np.searchsorted(self._meses_int, _mes_entero(df[columna_fecha]), side="left")
+        datos = self._leer(k, *self._columnas(df[columna_cliente]))
+
+        dias = _dias(df[columna_fecha]).astype(np.int64)
+        ultima = datos.pop("_ultima").astype(np.int64)
+        con_previa = (ultima != _SIN_FECHA) & (dias != _SIN_FECHA)
+        datos["rfm_recencia_dias"] = np.where(con_previa, dias - ultima, SIN_COMPRAS_PREVIAS)
+
+        nuevas = {c: datos[c] for c in COLUMNAS_CLIENTE}
+        salida = df.assign(**nuevas)
+        salida[COLUMNAS_CLIENTE_ENTERAS] = salida[COLUMNAS_CLIENTE_ENTERAS].astype(np.int64)
+        return salida
+
+    def al_cierre(self) -> pd.DataFrame:
+        """
+        Una fila por cliente con compras, con toda la historia del almacén.
+        La recencia se cuenta desde la última compra registrada (fecha de corte).
+        """
+        k = np.full(self.n_ids, len(self.meses))
+        datos = self._leer(k, np.arange(self.n_ids), np.ones(self.n_ids, dtype=bool))
+        ultima = datos.pop("_ultima").astype(np.int64)
+        corte = ultima.max() if len(ultima) else _SIN_FECHA
+        datos["rfm_recencia_dias"] = np.where(ultima != _SIN_FECHA, corte - ultima, SIN_COMPRAS_PREVIAS)
+
+        df = pd.DataFrame({"id_cliente": self.ids, **{c: datos[c] for c in COLUMNAS_CLIENTE}})
+        df[COLUMNAS_CLIENTE_ENTERAS] = df[COLUMNAS_CLIENTE_ENTERAS].astype(np.int64)
+        return df[df["rfm_frecuencia"] > 0].reset_index(drop=True)
+
+
+# ==========================================================
+# AL MOMENTO EXACTO DE CADA TICKET (AS-OF)
+# ==========================================================
+def historial_compras(df_ventas: pd.DataFrame, df_ticket: pd.DataFrame) -> pd.DataFrame:
+    """Una fila por compra, ordenada por (id_cliente, fecha), con acumulados por cliente."""
+    historial = (
+        df_ventas[["id_venta", "id_cliente", "fecha"]]
+        .merge(df_ticket[["id_venta", "ticket_total"]], on="id_venta", how="left")
+        .assign(fecha=lambda d: pd.to_datetime(d["fecha"], errors="coerce"))
+        .dropna(subset=["id_cliente", "fecha"])
+        .sort_values(["id_cliente", "fecha", "id_venta"], ignore_index=True)
+    )
+    por_cliente = historial.groupby("id_cliente", sort=False)
+    historial["compras_acum"] = por_cliente.cumcount() + 1
+    historial["gasto_acum"] = por_cliente["ticket_total"].cumsum().fillna(0)
+    return historial
+
+
+def rfm_al_momento(df: pd.DataFrame, df_ventas: pd.DataFrame, df_ticket: pd.DataFrame,
+                   columna_cliente: str = "id_cliente",
+                   columna_fecha: str = "fecha") -> pd.DataFrame:
+    """
+    Agrega COLUMNAS_CLIENTE a cada fila de `df` con las compras del cliente de
+    fechas anteriores a la suya (las del mismo día no cuentan: sin fuga).
+    Las ventanas de v meses cubren [fecha - v meses, fecha).
+    """
+    historial = historial_compras(df_ventas, df_ticket)
+    h_cliente = historial["id_cliente"].to_numpy()
+    compras_acum = historial["compras_acum"].to_numpy()
+    gasto_acum = historial["gasto_acum"].to_numpy()
+
+    clientes = df[columna_cliente].to_numpy()
+    fechas = pd.to_datetime(df[columna_fecha], errors="coerce")
+
+    def al(tiempos):
+        """Acumulados del cliente antes de `tiempos` (0 si no había compras)."""
+        j = indices_asof(clientes, tiempos, h_cliente, historial["fecha"], estricto=True)
+        hay = j >= 0
+        j = np.where(hay, j, 0)
+        return j, hay, np.where(hay, compras_acum[j], 0), np.where(hay, gasto_acum[j], 0.0)
+
+    j, hay, frecuencia, monto = al(fechas)
+    ultima = historial["fecha"].to_numpy()[j]
+    recencia = (fechas.to_numpy() - ultima) / np.timedelta64(1, "D")
+    datos = {
+        "rfm_recencia_dias": np.where(hay, recencia, SIN_COMPRAS_PREVIAS),
+        "rfm_frecuencia": frecuencia,
+        "rfm_monto": monto,
+        "rfm_ticket_promedio": np.divide(
+            monto, frecuencia, out=np.zeros(len(df)), where=frecuencia > 0
+        ),
+    }
+    for v in VENTANAS_MESES:
+        _, _, compras_antes, gasto_antes = al(fechas - pd.DateOffset(months=v))
+        datos[f"rfm_compras_{v}m"] = frecuencia - compras_antes
+        datos[f"rfm_gasto_{v}m"] = monto - gasto_antes
+
+    salida = df.assign(**{c: datos[c] for c in COLUMNAS_CLIENTE})
+    salida[COLUMNAS_CLIENTE_ENTERAS] = salida[COLUMNAS_CLIENTE_ENTERAS].astype(np.int64)
+    return salida
@@ -0,0 +1,64 @@
+"""Estadísticas: tablas (o chunks) -> resúmenes de motor_estadisticas."""
+
+import numpy as np
+import pandas as pd
+
+from aurelion.motor_estadisticas import ResumenDataset, resumir_chunks
+
+# Con más columnas numéricas que esto no se arma la matriz completa,
+# solo los pares con mayor |r|
+MAX_COLUMNAS_MATRIZ = 15
+TOP_CORRELACIONES = 10
+
+
+def resumir(fuentes: dict) -> dict[str, ResumenDataset]:
+    """
+    `fuentes` mapea tabla -> DataFrame o iterable de chunks (p.ej.
+    modelo_datos.chunks_tabla). Cada tabla se recorre una sola vez.
+    """
+    return {
+        nombre: resumir_chunks([fuente] if isinstance(fuente, pd.DataFrame) else fuente,
+                               nombre=nombre)
+        for nombre, fuente in fuentes.items()
+    }
+
+
+def clasificar_distribucion(skew: float, kurt: float):
+    if np.isnan(skew):
+        return "sin variación / NaN", skew, kurt
+    if abs(skew) < 0.5:
+        tipo = "aprox. normal/simétrica"
+    elif skew > 0:
+        tipo = "sesgo a la derecha (cola derecha)"
+    else:
+        tipo = "sesgo a la izquierda (cola izquierda)"
+    return tipo, skew, kurt
+
+
+def distribuciones(resumen: ResumenDataset) -> pd.DataFrame:
+    """Tipo de distribución, skew y kurtosis por columna numérica con datos."""
+    momentos = resumen.asimetria_curtosis()
+    filas = []
+    for col in resumen.columnas_numericas:
+        conteos, _ = resumen.histograma(col)
+        if conteos.sum() == 0:
+            continue
+        tipo, skew, kurt = clasificar_distribucion(
+            momentos.loc[col, "skew"], momentos.loc[col, "kurtosis"]
+        )
+        filas.append({"columna": col, "tipo": tipo, "skew": skew, "kurtosis": kurt})
+    return pd.DataFrame(filas, columns=["columna", "tipo", "skew", "kurtosis"])
+
+
+def correlaciones(resumen: ResumenDataset, max_columnas: int = MAX_COLUMNAS_MATRIZ,
+                  top: int = TOP_CORRELACIONES) -> tuple[str, pd.DataFrame] | None:
+    """
+    ("matriz", matriz de Pearson) o, en tablas anchas, ("top", pares con
+    mayor |r|). None si hay menos de dos columnas numéricas.
+    """
+    n = len(resumen.columnas_numericas)
+    if n < 2:
+        return None
+    if n > max_columnas:
+        return "top", resumen.top_correlaciones(top)
+    return "matriz", resumen.correlacion()
@@ -0,0 +1,135 @@
+"""Features: tablas limpias -> dataframe a nivel ticket -> X / y para los modelos."""
+
+import numpy as np
+import pandas as pd
+
+from aurelion.asof import unir_asof
+from aurelion.clientes import COLUMNAS_CLIENTE
+
+PERCENTIL_TICKET_ALTO = 0.75
+N_EXTRA = 1000
+ESCALA_RUIDO = 0.05  # ruido gaussiano: 5% del desvío de cada columna
+SEMILLA = 42
+
+# Todas son enteras: conteos, mes, día de la semana y días de antigüedad
+COLUMNAS_NUMERICAS = [
+    "num_items",
+    "num_lineas",
+    "num_unique_products",
+    "mes",
+    "dia_semana",
+    "antiguedad_cliente_dias",
+]
+OBJETIVO = "ticket_alto"
+
+
+# ==========================================================
+# TICKETS
+# ==========================================================
+def agregar_tickets(df_detalle: pd.DataFrame) -> pd.DataFrame:
+    """Agrega el detalle por id_venta (ticket)."""
+    df_detalle = df_detalle.assign(
+        importe=pd.to_numeric(df_detalle["importe"], errors="coerce").fillna(0),
+        cantidad=pd.to_numeric(df_detalle["cantidad"], errors="coerce").fillna(0),
+    )
+    return (
+        df_detalle
+        .groupby("id_venta")
+        .agg(
+            ticket_total=("importe", "sum"),            # suma del importe del ticket
+            num_items=("cantidad", "sum"),             # total de unidades compradas
+            num_lineas=("id_producto", "size"),        # cantidad de líneas del ticket
+            num_unique_products=("id_producto", "nunique")  # productos distintos
+        )
+        .reset_index()
+    )
+
+
+def umbral_ticket_alto(ticket_total: pd.Series, percentil: float = PERCENTIL_TICKET_ALTO) -> float:
+    return float(ticket_total.quantile(percentil))
+
+
+def dataframe_modelo(df_clientes: pd.DataFrame, df_ventas: pd.DataFrame,
+                     df_ticket: pd.DataFrame,
+                     percentil: float = PERCENTIL_TICKET_ALTO) -> pd.DataFrame:
+    """
+    Tickets + datos de la venta y del cliente + features de tiempo + objetivo.
+    Con fecha_alta, cada ticket toma la versión del cliente vigente a su fecha
+    (join as-of): un ticket anterior al alta queda sin datos de cliente.
+    """
+    columnas_ventas = ["id_venta", "id_cliente", "fecha"]
+    if "medio_pago" in df_ventas.columns:
+        columnas_ventas.append("medio_pago")
+    df_modelo = df_ticket.merge(df_ventas[columnas_ventas], on="id_venta", how="left")
+
+    df_modelo["fecha"] = pd.to_datetime(df_modelo["fecha"], errors="coerce")
+    if "fecha_alta" in df_clientes.columns:
+        df_clientes = df_clientes[["id_cliente", "ciudad", "fecha_alta"]].assign(
+            fecha_alta=lambda d: pd.to_datetime(d["fecha_alta"], errors="coerce")
+        )
+        df_modelo = unir_asof(df_modelo, df_clientes, por="id_cliente",
+                              en_izq="fecha", en_der="fecha_alta")
+    else:
+        df_modelo = df_modelo.merge(df_clientes[["id_cliente", "ciudad"]], on="id_cliente", how="left")
+
+    if "fecha_alta" in df_modelo.columns:
+        df_modelo["antiguedad_cliente_dias"] = (
+            df_modelo["fecha"] - df_modelo["fecha_alta"]
+        ).dt.days
+    else:
+        df_modelo["antiguedad_cliente_dias"] = pd.NA
+
+    df_modelo["mes"] = df_modelo["fecha"].dt.month
+    df_modelo["dia_semana"] = df_modelo["fecha"].dt.weekday  # 0=lunes, 6=domingo
+
+    umbral = umbral_ticket_alto(df_modelo["ticket_total"], percentil)
+    df_modelo[OBJETIVO] = (df_modelo["ticket_total"] >= umbral).astype(int)
+    return df_modelo
+
+
+# ==========================================================
+# AUMENTO (BOOTSTRAP + RUIDO)
+# ==========================================================
+def columnas_con_ruido(df: pd.DataFrame) -> list[str]:
+    """Numéricas, sin ids, sin la columna objetivo ni la historia del cliente."""
+    # "number" y no int64/float64: en memoria mes y dia_semana son int32.
+    # Las features RFM quedan como están: la fila extra es otro ticket de un cliente real.
+    columnas = df.select_dtypes(include="number").columns.tolist()
+    excluidas = {"id_venta", "id_cliente", OBJETIVO, *COLUMNAS_CLIENTE}
+    return [c for c in columnas if c not in excluidas]
+
+
+def aumentar(df: pd.DataFrame, n_extra: int = N_EXTRA, escala_ruido: float = ESCALA_RUIDO,
+             semilla: int = SEMILLA) -> pd.DataFrame:
+    """
+    Agrega `n_extra` filas muestreadas con reemplazo, con ruido gaussiano en
+    las columnas numéricas. Misma semilla -> mismo resultado.
+    """
+    extra = df.sample(n_extra, replace=True, random_state=semilla).reset_index(drop=True)
+    columnas = columnas_con_ruido(extra)
+
+    rng = np.random.default_rng(semilla)
+    ruido = rng.normal(loc=0.0, scale=escala_ruido, size=extra[columnas].shape)
+    extra[columnas] = extra[columnas] + ruido * df[columnas].std().values
+
+    # Las features siguen siendo enteros >= 0
+    for col in COLUMNAS_NUMERICAS:
+        if col in extra.columns:
+            extra[col] = extra[col].round().clip(lower=0).astype(int)
+
+    return pd.concat([df, extra], ignore_index=True)
+
+
+# ==========================================================
+# MATRIZ PARA LOS MODELOS
+# ==========================================================
+def preparar_datos(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """dropna + one-hot de medio_pago / ciudad. Devuelve (X, y)."""
+    cols_cliente = [c for c in COLUMNAS_CLIENTE if c in df.columns]
+    cols_categoricas = [c for c in ("medio_pago", "ciudad") if c in df.columns]
+    columnas_utiles = COLUMNAS_NUMERICAS + cols_cliente + cols_categoricas + [OBJETIVO]
+    df_ml = df[columnas_utiles].dropna()
+    df_ml = pd.get_dummies(df_ml, columns=cols_categoricas, drop_first=True)
+    X = df_ml.drop(OBJETIVO, axis=1)
+    y = df_ml[OBJETIVO]
+    return X, y
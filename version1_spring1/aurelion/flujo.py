@@ -0,0 +1,43 @@
+"""
+Composición de las etapas en memoria: origen -> limpieza -> df_modelo ->
+aumento -> modelos, sin escribir ni releer CSV intermedios. El script que
+lee las tablas de origen y muestra los resultados es flujo_en_memoria.py.
+"""
+
+import pandas as pd
+
+from aurelion import clientes, features, limpieza, modelos
+
+
+def df_modelo_desde_tablas(tablas: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """clientes + ventas + detalle_ventas (limpias) -> dataframe a nivel ticket + RFM."""
+    tickets = features.agregar_tickets(tablas["detalle_ventas"])
+    df_modelo = features.dataframe_modelo(tablas["clientes"], tablas["ventas"], tickets)
+    return clientes.rfm_al_momento(df_modelo, tablas["ventas"], tickets)
+
+
+def entrenar_df(df_modelo: pd.DataFrame) -> dict[str, modelos.ResultadoModelo]:
+    X, y = features.preparar_datos(df_modelo)
+    return modelos.entrenar(X, y)
+
+
+def ejecutar(origen: dict[str, pd.DataFrame], aumentar: bool = True) -> dict:
+    """
+    Corre todas las etapas sobre las tablas de origen. Devuelve los
+    resultados intermedios (limpieza, tablas, df_modelo, df_aumentado) y los
+    modelos entrenados por dataset ("original" / "aumentado").
+    """
+    resultados_limpieza = limpieza.limpiar(origen)
+    tablas = limpieza.tablas_limpias(resultados_limpieza)
+    df_modelo = df_modelo_desde_tablas(tablas)
+    salida = {
+        "limpieza": resultados_limpieza,
+        "tablas": tablas,
+        "df_modelo": df_modelo,
+        "modelos": {"original": entrenar_df(df_modelo)},
+    }
+    if aumentar:
+        df_aumentado = features.aumentar(df_modelo)
+        salida["df_aumentado"] = df_aumentado
+        salida["modelos"]["aumentado"] = entrenar_df(df_aumentado)
+    return salida
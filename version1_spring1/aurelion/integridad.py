@@ -0,0 +1,228 @@
+"""
+Verificación de integridad referencial entre tablas.
+
+Para cada tabla padre se arma UNA vez un índice de claves: un mapa de
+presencia si son enteros densos (ids 1..N), un arreglo NumPy ordenado y sin
+repetidos si son numéricas dispersas (búsqueda con searchsorted) o un índice
+hash de pandas si son texto (isin). Las claves
+foráneas de las tablas hijas se validan contra ese índice por chunks y
+leyendo solo las columnas de clave, así el costo es una pasada lineal sobre
+la tabla hija.
+
+El reporte indica, por relación, cuántas filas son huérfanas (su clave no
+existe en la tabla padre), cuántas tienen la clave vacía y cuáles son los
+valores huérfanos más frecuentes.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TAMANIO_CHUNK = 1_000_000
+# Valores huérfanos distintos que se guardan para el reporte (el conteo total es exacto)
+MAX_HUERFANAS_DISTINTAS = 1000
+EJEMPLOS_REPORTE = 5
+# Claves enteras con rango <= FACTOR_DENSIDAD * cantidad usan un mapa de presencia
+FACTOR_DENSIDAD = 8
+
+
+# ==========================================================
+# ÍNDICE DE CLAVES
+# ==========================================================
+class IndiceClaves:
+    """Conjunto de claves de una tabla, listo para consultas vectorizadas."""
+
+    def __init__(self, valores):
+        arr = np.asarray(valores)
+        self.ordenadas = None
+        self._hash = None
+        self._mapa = None
+        if arr.dtype.kind not in "iuf":
+            self._hash = pd.Index(pd.unique(pd.Series(arr).dropna()))
+            return
+        arr = arr[~np.isnan(arr)] if arr.dtype.kind == "f" else arr
+        self._minimo = 0
+        enteras = len(arr) > 0 and (arr.dtype.kind in "iu" or bool(np.all(arr % 1 == 0)))
+        if enteras:
+            # Claves enteras densas (ids 1..N): mapa de presencia armado directo
+            # desde los valores (sin ordenar), búsqueda O(1)
+            self._minimo = int(arr.min())
+            rango = int(arr.max()) - self._minimo + 1
+            if rango <= max(FACTOR_DENSIDAD * len(arr), 1 << 16):
+                self._mapa = np.zeros(rango, dtype=bool)
+                self._mapa[arr.astype(np.int64) - self._minimo] = True
+                return
+        self.ordenadas = np.unique(arr)
+
+    @classmethod
+    def desde_csv(cls, rutas, columna: str,
+                  tamanio_chunk: int = TAMANIO_CHUNK) -> "IndiceClaves":
+        """
+        Índice de una columna de un CSV (o de una lista de CSV, p.ej. las
+        particiones de una tabla), leyendo solo esa columna por chunks.
+        """
+        rutas = rutas if isinstance(rutas, (list, tuple)) else [rutas]
+        unicos = [
+            pd.unique(chunk[columna].dropna())
+            for ruta in rutas
+            for chunk in pd.read_csv(ruta, usecols=[columna], chunksize=tamanio_chunk)
+        ]
+        return cls(np.concatenate(unicos) if unicos else np.array([], dtype=np.int64))
+
+    def __len__(self):
+        if self._mapa is not None:
+            return int(self._mapa.sum())
+        return len(self.ordenadas) if self.ordenadas is not None else len(self._hash)
+
+    def contiene(self, valores) -> np.ndarray:
+        """True por cada valor presente en el índice (los nulos dan False)."""
+        if self._hash is not None:
+            return np.asarray(pd.Index(valores).isin(self._hash))
+        arr = np.asarray(valores)
+        if arr.dtype.kind not in "iuf":
+            arr = pd.to_numeric(pd.Series(arr), errors="coerce").to_numpy(dtype=float)
+        if self._mapa is not None:
+            return self._contiene_mapa(arr)
+        if len(self.ordenadas) == 0:
+            return np.zeros(len(arr), dtype=bool)
+        # searchsorted con las consultas ordenadas recorre el índice en orden
+        # (mucho más amigable con la caché que consultas al azar)
+        orden = np.argsort(arr, kind="stable")
+        consultas = arr[orden]
+        pos = np.searchsorted(self.ordenadas, consultas)
+        np.minimum(pos, len(self.ordenadas) - 1, out=pos)
+        resultado = np.empty(len(arr), dtype=bool)
+        resultado[orden] = self.ordenadas[pos] == consultas
+        return resultado
+
+    def _contiene_mapa(self, arr: np.ndarray) -> np.ndarray:
+        desplazado = arr - self._minimo
+        if arr.dtype.kind == "f":
+            validos = (desplazado >= 0) & (desplazado < len(self._mapa)) & (desplazado % 1 == 0)
+        else:
+            validos = (desplazado >= 0) & (desplazado < len(self._mapa))
+        resultado = np.zeros(len(arr), dtype=bool)
+        resultado[validos] = self._mapa[desplazado[validos].astype(np.int64)]
+        return resultado
+
+
+# ==========================================================
+# RELACIONES
+# ==========================================================
+class Relacion:
+    """hija.columna -> padre.columna_padre"""
+
+    def __init__(self, hija: str, columna: str, padre: str, columna_padre: str):
+        self.hija = hija
+        self.columna = columna
+        self.padre = padre
+        self.columna_padre = columna_padre
+
+    def __str__(self):
+        return f"{self.hija}.{self.columna} -> {self.padre}.{self.columna_padre}"
+
+
+RELACIONES = [
+    Relacion("ventas", "id_cliente", "clientes", "id_cliente"),
+    Relacion("detalle_ventas", "id_venta", "ventas", "id_venta"),
+    Relacion("detalle_ventas", "id_producto", "productos", "id_producto"),
+]
+
+
+class ResultadoRelacion:
+    def __init__(self, relacion: Relacion):
+        self.relacion = relacion
+        self.filas = 0
+        self.huerfanas = 0
+        self.nulos = 0
+        self.valores_huerfanos: dict = {}
+
+    def _acumular(self, valores: np.ndarray, presentes: np.ndarray, nulos: np.ndarray):
+        self.filas += len(valores)
+        self.nulos += int(nulos.sum())
+        huerfanas = ~presentes & ~nulos
+        n = int(huerfanas.sum())
+        if not n:
+            return
+        self.huerfanas += n
+        unicos, conteos = np.unique(valores[huerfanas], return_counts=True)
+        for v, c in zip(unicos.tolist(), conteos.tolist()):
+            if v in self.valores_huerfanos or len(self.valores_huerfanos) < MAX_HUERFANAS_DISTINTAS:
+                self.valores_huerfanos[v] = self.valores_huerfanos.get(v, 0) + c
+
+    @property
+    def ok(self) -> bool:
+        return self.huerfanas == 0 and self.nulos == 0
+
+    def ejemplos(self, n: int = EJEMPLOS_REPORTE) -> list:
+        return sorted(self.valores_huerfanos, key=self.valores_huerfanos.get, reverse=True)[:n]
+
+
+# ==========================================================
+# VERIFICACIÓN
+# ==========================================================
+def _chunks(fuente, columnas: list[str], tamanio_chunk: int):
+    if isinstance(fuente, pd.DataFrame):
+        datos = fuente[columnas]
+        for inicio in range(0, len(datos), tamanio_chunk):
+            yield datos.iloc[inicio:inicio + tamanio_chunk]
+    elif isinstance(fuente, (list, tuple)):
+        for ruta in fuente:
+            yield from _chunks(ruta, columnas, tamanio_chunk)
+    else:
+        yield from pd.read_csv(Path(fuente), usecols=columnas, chunksize=tamanio_chunk)
+
+
+def _indice(fuente, columna: str, tamanio_chunk: int) -> IndiceClaves:
+    if isinstance(fuente, pd.DataFrame):
+        return IndiceClaves(fuente[columna].to_numpy())
+    return IndiceClaves.desde_csv(fuente, columna, tamanio_chunk)
+
+
+def verificar_integridad(fuentes: dict, relaciones: list[Relacion] | None = None,
+                         tamanio_chunk: int = TAMANIO_CHUNK) -> list[ResultadoRelacion]:
+    """
+    `fuentes` mapea tabla -> DataFrame, ruta a CSV o lista de rutas (particiones). Se omiten las relaciones
+    cuyas tablas no están en `fuentes`. Cada tabla hija se recorre una sola
+    vez aunque tenga varias claves foráneas.
+    """
+    relaciones = [
+        r for r in (relaciones or RELACIONES) if r.hija in fuentes and r.padre in fuentes
+    ]
+    indices = {}
+    for r in relaciones:
+        clave = (r.padre, r.columna_padre)
+        if clave not in indices:
+            indices[clave] = _indice(fuentes[r.padre], r.columna_padre, tamanio_chunk)
+
+    resultados = [ResultadoRelacion(r) for r in relaciones]
+    por_hija: dict[str, list[ResultadoRelacion]] = {}
+    for res in resultados:
+        por_hija.setdefault(res.relacion.hija, []).append(res)
+
+    for hija, lista in por_hija.items():
+        columnas = list(dict.fromkeys(res.relacion.columna for res in lista))
+        for chunk in _chunks(fuentes[hija], columnas, tamanio_chunk):
+            for res in lista:
+                r = res.relacion
+                s = chunk[r.columna]
+                nulos = s.isna().to_numpy()
+                valores = s.to_numpy()
+                presentes = indices[(r.padre, r.columna_padre)].contiene(valores)
+                res._acumular(valores, presentes, nulos)
+    return resultados
+
+
+def reporte_integridad(resultados: list[ResultadoRelacion]) -> pd.DataFrame:
+    return pd.DataFrame([
+        {
+            "relacion": str(res.relacion),
+            "filas": res.filas,
+            "huerfanas": res.huerfanas,
+            "nulos": res.nulos,
+            "pct_huerfanas": 100 * res.huerfanas / res.filas if res.filas else 0.0,
+            "ejemplos": res.ejemplos(),
+        }
+        for res in resultados
+    ])
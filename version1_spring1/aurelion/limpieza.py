@@ -0,0 +1,33 @@
+"""Limpieza: tablas de origen -> tablas limpias (reglas de reglas_limpieza)."""
+
+import pandas as pd
+
+from aurelion.reglas_limpieza import TAMANIO_CHUNK, ResultadoLimpieza, limpiar_tablas
+
+# Nombre de la tabla -> archivo de origen en la carpeta de datos
+ARCHIVOS_ORIGEN = {
+    "clientes": "clientes.xlsx",
+    "productos": "productos.xlsx",
+    "ventas": "ventas.xlsx",
+    "detalle_ventas": "detalle_ventas.xlsx",
+}
+
+
+def perfil(df: pd.DataFrame) -> dict:
+    """Filas, columnas, filas duplicadas y valores únicos de cada columna id."""
+    return {
+        "filas": len(df),
+        "columnas": df.shape[1],
+        "duplicados": int(df.duplicated().sum()),
+        "unicos_id": {c: int(df[c].nunique()) for c in df.columns if "id" in c.lower()},
+    }
+
+
+def limpiar(dataframes: dict[str, pd.DataFrame],
+            tamanio_chunk: int = TAMANIO_CHUNK) -> dict[str, ResultadoLimpieza]:
+    """Aplica las reglas a cada tabla (las padres primero, por las referencias)."""
+    return limpiar_tablas(dataframes, tamanio_chunk)
+
+
+def tablas_limpias(resultados: dict[str, ResultadoLimpieza]) -> dict[str, pd.DataFrame]:
+    return {nombre: res.limpio for nombre, res in resultados.items()}
@@ -0,0 +1,52 @@
+"""Modelos: X / y -> clasificadores de ticket alto entrenados y evaluados."""
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, confusion_matrix
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+TAMANIO_TEST = 0.3
+SEMILLA = 42
+
+
+class ResultadoModelo:
+    """Modelo entrenado con su accuracy y matriz de confusión sobre el test."""
+
+    def __init__(self, nombre: str, modelo, accuracy: float, matriz_confusion: np.ndarray):
+        self.nombre = nombre
+        self.modelo = modelo
+        self.accuracy = accuracy
+        self.matriz_confusion = matriz_confusion
+
+    def __repr__(self):
+        return f"ResultadoModelo({self.nombre}, accuracy={self.accuracy:.3f})"
+
+
+def clasificadores(semilla: int = SEMILLA) -> dict:
+    return {
+        # Escalado: las features RFM (montos) van en otra escala que los conteos
+        "logistica": make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000)),
+        "arbol": DecisionTreeClassifier(max_depth=4, random_state=semilla),
+    }
+
+
+def dividir(X, y, tamanio_test: float = TAMANIO_TEST, semilla: int = SEMILLA):
+    """train / test estratificado: (X_train, X_test, y_train, y_test)."""
+    return train_test_split(X, y, test_size=tamanio_test, random_state=semilla, stratify=y)
+
+
+def entrenar(X, y, tamanio_test: float = TAMANIO_TEST,
+             semilla: int = SEMILLA) -> dict[str, ResultadoModelo]:
+    """Entrena cada clasificador sobre el mismo split y lo evalúa en el test."""
+    X_train, X_test, y_train, y_test = dividir(X, y, tamanio_test, semilla)
+    resultados = {}
+    for nombre, modelo in clasificadores(semilla).items():
+        modelo.fit(X_train, y_train)
+        y_pred = modelo.predict(X_test)
+        resultados[nombre] = ResultadoModelo(
+            nombre, modelo, accuracy_score(y_test, y_pred), confusion_matrix(y_test, y_pred)
+        )
+    return resultados
@@ -0,0 +1,238 @@
+"""
+Motor de correlaciones para tablas anchas y datos por chunks.
+
+- AcumuladorCovarianza suma productos cruzados chunk a chunk con BLAS
+  (X.T @ X) en float32 o float64, sin guardar las filas.
+- Pearson por pares completos (igual que DataFrame.corr()) o, si no hace
+  falta, sobre filas completas con menos memoria (por_pares=False).
+- Spearman: una primera pasada arma un sketch de cuantiles por columna y la
+  segunda convierte cada valor en su rango (searchsorted) antes de acumular.
+- top_pares() devuelve solo los k pares con mayor |r|, recorriendo la matriz
+  por bloques de filas.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aurelion.sketches import MAX_MUESTRAS_SKETCH, SketchCuantiles
+
+TAMANIO_CHUNK = 50_000
+TAMANIO_BLOQUE_TOP = 512
+
+
+# ==========================================================
+# ACUMULADOR DE COVARIANZA
+# ==========================================================
+class AcumuladorCovarianza:
+    """Sumas cruzadas para covarianza/correlación acumuladas por chunks."""
+
+    def __init__(self, columnas: list[str], dtype=np.float64, por_pares: bool = True):
+        self.columnas = list(columnas)
+        self.dtype = np.dtype(dtype)
+        self.por_pares = por_pares
+        k = len(self.columnas)
+        self.desplazamiento: np.ndarray | None = None
+        if por_pares:
+            # [i, j] = sumas de x_i sobre las filas donde i y j tienen dato
+            self.n = np.zeros((k, k), dtype=self.dtype)
+            self.suma = np.zeros((k, k), dtype=self.dtype)
+            self.cuad = np.zeros((k, k), dtype=self.dtype)
+        else:
+            self.n = np.zeros((), dtype=self.dtype)
+            self.suma = np.zeros(k, dtype=self.dtype)
+        self.prod = np.zeros((k, k), dtype=self.dtype)
+
+    def agregar(self, bloque: np.ndarray):
+        bloque = np.asarray(bloque, dtype=self.dtype)
+        if bloque.shape[0] == 0:
+            return
+        if self.desplazamiento is None:
+            # Centrar en la media del primer chunk mejora la precisión numérica
+            with np.errstate(all="ignore"):
+                medias = np.nanmean(bloque, axis=0)
+            self.desplazamiento = np.nan_to_num(medias).astype(self.dtype)
+
+        presentes = ~np.isnan(bloque)
+        if not self.por_pares:
+            completas = presentes.all(axis=1)
+            centrado = bloque[completas] - self.desplazamiento
+            self.n += centrado.shape[0]
+            self.suma += centrado.sum(axis=0)
+            self.prod += centrado.T @ centrado
+            return
+
+        centrado = np.where(presentes, bloque - self.desplazamiento, 0).astype(self.dtype, copy=False)
+        mascara = presentes.astype(self.dtype)
+        self.n += mascara.T @ mascara
+        self.suma += centrado.T @ mascara
+        self.cuad += (centrado * centrado).T @ mascara
+        self.prod += centrado.T @ centrado
+
+    @property
+    def conteos(self) -> np.ndarray:
+        """Cantidad de valores no nulos por columna."""
+        if self.por_pares:
+            return np.diag(self.n).astype(np.float64)
+        return np.full(len(self.columnas), float(self.n))
+
+    def _bloque(self, filas: slice):
+        """Covarianza y varianzas (n - 1) para un bloque de filas de la matriz."""
+        n = self.n[filas].astype(np.float64) if self.por_pares else float(self.n)
+        prod = self.prod[filas].astype(np.float64)
+        if self.por_pares:
+            suma_i = self.suma[filas].astype(np.float64)
+            suma_j = self.suma[:, filas].T.astype(np.float64)
+            cuad_i = self.cuad[filas].astype(np.float64)
+            cuad_j = self.cuad[:, filas].T.astype(np.float64)
+        else:
+            suma = self.suma.astype(np.float64)
+            suma_i = suma[filas][:, None]
+            suma_j = suma[None, :]
+            diag = np.diag(self.prod).astype(np.float64)
+            cuad_i = diag[filas][:, None]
+            cuad_j = diag[None, :]
+        with np.errstate(all="ignore"):
+            cov = prod - suma_i * suma_j / n
+            var_i = cuad_i - suma_i ** 2 / n
+            var_j = cuad_j - suma_j ** 2 / n
+        return n, cov, var_i, var_j
+
+    def correlacion_bloque(self, filas: slice) -> np.ndarray:
+        n, cov, var_i, var_j = self._bloque(filas)
+        with np.errstate(all="ignore"):
+            corr = cov / np.sqrt(var_i * var_j)
+        corr = np.clip(np.where(np.asarray(n) > 1, corr, np.nan), -1.0, 1.0)
+        inicio = filas.start or 0
+        diag = np.arange(corr.shape[0])
+        conteos = self.conteos[filas]
+        corr[diag, inicio + diag] = np.where(conteos > 1, 1.0, np.nan)
+        return corr
+
+    def covarianza(self) -> pd.DataFrame:
+        n, cov, _, _ = self._bloque(slice(0, len(self.columnas)))
+        with np.errstate(all="ignore"):
+            cov = np.where(np.asarray(n) > 1, cov / (np.asarray(n) - 1), np.nan)
+        return pd.DataFrame(cov, index=self.columnas, columns=self.columnas)
+
+    def correlacion(self) -> pd.DataFrame:
+        """Matriz completa (solo conviene cuando hay pocas columnas)."""
+        corr = self.correlacion_bloque(slice(0, len(self.columnas)))
+        return pd.DataFrame(corr, index=self.columnas, columns=self.columnas)
+
+    def top_pares(self, k: int = 10, tamanio_bloque: int = TAMANIO_BLOQUE_TOP) -> pd.DataFrame:
+        """Los k pares (i < j) con mayor |r|, sin armar la matriz N x N entera."""
+        total = len(self.columnas)
+        mejores_i = np.empty(0, dtype=np.int64)
+        mejores_j = np.empty(0, dtype=np.int64)
+        mejores_r = np.empty(0)
+        for inicio in range(0, total, tamanio_bloque):
+            fin = min(inicio + tamanio_bloque, total)
+            corr = self.correlacion_bloque(slice(inicio, fin))
+            ii, jj = np.nonzero(np.triu(np.ones_like(corr, dtype=bool), k=inicio + 1))
+            r = corr[ii, jj]
+            validos = ~np.isnan(r)
+            ii, jj, r = ii[validos] + inicio, jj[validos], r[validos]
+            if r.size > k:
+                sel = np.argpartition(-np.abs(r), k - 1)[:k]
+                ii, jj, r = ii[sel], jj[sel], r[sel]
+            mejores_i = np.concatenate([mejores_i, ii])
+            mejores_j = np.concatenate([mejores_j, jj])
+            mejores_r = np.concatenate([mejores_r, r])
+            if mejores_r.size > k:
+                sel = np.argpartition(-np.abs(mejores_r), k - 1)[:k]
+                mejores_i, mejores_j, mejores_r = mejores_i[sel], mejores_j[sel], mejores_r[sel]
+
+        orden = np.argsort(-np.abs(mejores_r), kind="stable")
+        cols = np.asarray(self.columnas, dtype=object)
+        return pd.DataFrame(
+            {
+                "var_1": cols[mejores_i[orden]],
+                "var_2": cols[mejores_j[orden]],
+                "r": mejores_r[orden],
+                "abs(r)": np.abs(mejores_r[orden]),
+            }
+        )
+
+
+# ==========================================================
+# RANGOS PARA SPEARMAN
+# ==========================================================
+def _rangos(bloque: np.ndarray, ordenados: list[np.ndarray]) -> np.ndarray:
+    """Rango promedio (con empates) de cada valor dentro de su sketch."""
+    rangos = np.full(bloque.shape, np.nan)
+    for j, ref in enumerate(ordenados):
+        col = bloque[:, j]
+        presentes = ~np.isnan(col)
+        izq = np.searchsorted(ref, col[presentes], side="left")
+        der = np.searchsorted(ref, col[presentes], side="right")
+        rangos[presentes, j] = (izq + der + 1) / 2.0
+    return rangos
+
+
+# ==========================================================
+# CORRELACIÓN SOBRE CHUNKS
+# ==========================================================
+def _a_matriz(chunk: pd.DataFrame, columnas: list[str]) -> np.ndarray:
+    return (
+        chunk[columnas]
+        .apply(pd.to_numeric, errors="coerce")
+        .to_numpy(dtype=np.float64, na_value=np.nan)
+    )
+
+
+def correlacion_chunks(fabrica_chunks, columnas: list[str] | None = None,
+                       metodo: str = "pearson", dtype=np.float64,
+                       por_pares: bool = True,
+                       capacidad_sketch: int = MAX_MUESTRAS_SKETCH) -> AcumuladorCovarianza:
+    """
+    Acumula la correlación sobre chunks de DataFrame.
+
+    `fabrica_chunks` es una función sin argumentos que devuelve un iterable
+    nuevo de chunks: Spearman recorre los datos dos veces.
+    Nota: en Spearman los rangos se calculan por columna (no por par), así que
+    con NaN el resultado puede diferir levemente del de pandas.
+    """
+    if metodo not in ("pearson", "spearman"):
+        raise ValueError(f"Método de correlación no soportado: {metodo}")
+
+    ordenados = None
+    if metodo == "spearman":
+        sketches = None
+        for chunk in fabrica_chunks():
+            if columnas is None:
+                columnas = list(chunk.select_dtypes(include=[np.number]).columns)
+            if sketches is None:
+                sketches = [SketchCuantiles(capacidad_sketch) for _ in columnas]
+            matriz = _a_matriz(chunk, columnas)
+            for j, sk in enumerate(sketches):
+                sk.agregar(matriz[:, j])
+        ordenados = [np.sort(sk.valores()) for sk in (sketches or [])]
+
+    acumulador = None
+    for chunk in fabrica_chunks():
+        if columnas is None:
+            columnas = list(chunk.select_dtypes(include=[np.number]).columns)
+        if acumulador is None:
+            acumulador = AcumuladorCovarianza(columnas, dtype=dtype, por_pares=por_pares)
+        matriz = _a_matriz(chunk, columnas)
+        if ordenados is not None:
+            matriz = _rangos(matriz, ordenados)
+        acumulador.agregar(matriz)
+
+    if acumulador is None:
+        acumulador = AcumuladorCovarianza(columnas or [], dtype=dtype, por_pares=por_pares)
+    return acumulador
+
+
+def correlacion_csv(ruta: str | Path, columnas: list[str] | None = None,
+                    metodo: str = "pearson", dtype=np.float64, por_pares: bool = True,
+                    tamanio_chunk: int = TAMANIO_CHUNK, **kwargs) -> AcumuladorCovarianza:
+    """correlacion_chunks() leyendo un CSV por chunks."""
+    ruta = Path(ruta)
+
+    def fabrica():
+        return pd.read_csv(ruta, chunksize=tamanio_chunk, usecols=columnas, **kwargs)
+
+    return correlacion_chunks(fabrica, columnas, metodo=metodo, dtype=dtype, por_pares=por_pares)
@@ -0,0 +1,254 @@
+"""
+Motor de estadísticas descriptivas en una sola pasada.
+
+Lee cada dataset UNA vez, por chunks, y acumula a la vez:
+
+- count / media / varianza / min / max (y momentos 3 y 4 para skew y kurtosis),
+- histogramas con bins adaptativos,
+- matrices de covarianza por pares (para la correlación de Pearson),
+- sketches de cuantiles (percentiles 25/50/75 y límites IQR),
+- frecuencias de las columnas categóricas.
+
+Con el resumen resultante se pueden imprimir los mismos reportes que antes
+(describe(), distribuciones, correlaciones) sin volver a leer el archivo.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aurelion.motor_correlaciones import AcumuladorCovarianza
+from aurelion.sketches import (
+    BINS_HISTOGRAMA,
+    MAX_MUESTRAS_SKETCH,
+    HistogramaAdaptativo,
+    SketchCuantiles,
+)
+
+TAMANIO_CHUNK = 50_000
+
+
+# ==========================================================
+# ACUMULADORES
+# ==========================================================
+class AcumuladorNumerico:
+    """Acumula momentos, covarianzas por pares, histogramas y sketches."""
+
+    def __init__(self, columnas: list[str], bins: int = BINS_HISTOGRAMA,
+                 capacidad_sketch: int = MAX_MUESTRAS_SKETCH):
+        self.columnas = list(columnas)
+        k = len(self.columnas)
+        self.desplazamiento: np.ndarray | None = None
+        # Potencias 1..4 de (x - desplazamiento), por columna
+        self.potencias = np.zeros((4, k))
+        self.minimos = np.full(k, np.inf)
+        self.maximos = np.full(k, -np.inf)
+        # Covarianzas por pares (solo filas donde ambas columnas tienen dato)
+        self.covarianza = AcumuladorCovarianza(self.columnas)
+        self.histogramas = [HistogramaAdaptativo(bins) for _ in self.columnas]
+        self.sketches = [SketchCuantiles(capacidad_sketch) for _ in self.columnas]
+
+    def agregar(self, bloque: np.ndarray):
+        if bloque.shape[0] == 0:
+            return
+        if self.desplazamiento is None:
+            with np.errstate(all="ignore"):
+                medias = np.nanmean(bloque, axis=0) if bloque.size else 0.0
+            self.desplazamiento = np.nan_to_num(medias)
+
+        presentes = ~np.isnan(bloque)
+        centrado = np.where(presentes, bloque - self.desplazamiento, 0.0)
+        cuadrados = centrado * centrado
+
+        self.potencias[0] += centrado.sum(axis=0)
+        self.potencias[1] += cuadrados.sum(axis=0)
+        self.potencias[2] += (cuadrados * centrado).sum(axis=0)
+        self.potencias[3] += (cuadrados * cuadrados).sum(axis=0)
+
+        self.covarianza.agregar(bloque)
+
+        with np.errstate(all="ignore"):
+            self.minimos = np.fmin(self.minimos, np.nanmin(
+                np.where(presentes, bloque, np.inf), axis=0))
+            self.maximos = np.fmax(self.maximos, np.nanmax(
+                np.where(presentes, bloque, -np.inf), axis=0))
+
+        for j in range(len(self.columnas)):
+            col = bloque[:, j]
+            self.histogramas[j].agregar(col)
+            self.sketches[j].agregar(col)
+
+    @property
+    def conteos(self) -> np.ndarray:
+        return self.covarianza.conteos
+
+
+class AcumuladorCategorico:
+    """Acumula frecuencias (en orden de aparición) de columnas no numéricas."""
+
+    def __init__(self, columnas: list[str]):
+        self.columnas = list(columnas)
+        self.frecuencias = {c: pd.Series(dtype="int64") for c in self.columnas}
+
+    def agregar(self, chunk: pd.DataFrame):
+        for c in self.columnas:
+            vc = chunk[c].value_counts(sort=False, dropna=True)
+            acumulado = self.frecuencias[c]
+            nuevos = vc.index[~vc.index.isin(acumulado.index)]
+            acumulado = acumulado.reindex(acumulado.index.append(nuevos), fill_value=0)
+            acumulado.loc[vc.index] += vc.to_numpy()
+            self.frecuencias[c] = acumulado
+
+
+# ==========================================================
+# RESUMEN DE UN DATASET
+# ==========================================================
+class ResumenDataset:
+    """Resultado de la pasada única sobre un dataset."""
+
+    def __init__(self, nombre: str, columnas: list[str], filas: int,
+                 numerico: AcumuladorNumerico, categorico: AcumuladorCategorico):
+        self.nombre = nombre
+        self.columnas = columnas
+        self.filas = filas
+        self.numerico = numerico
+        self.categorico = categorico
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.filas, len(self.columnas)
+
+    @property
+    def columnas_numericas(self) -> list[str]:
+        return self.numerico.columnas
+
+    @property
+    def columnas_categoricas(self) -> list[str]:
+        return self.categorico.columnas
+
+    def _momentos_centrales(self):
+        n = self.numerico.conteos
+        with np.errstate(all="ignore"):
+            a1, a2, a3, a4 = self.numerico.potencias / n
+            m2 = a2 - a1 ** 2
+            m3 = a3 - 3 * a1 * a2 + 2 * a1 ** 3
+            m4 = a4 - 4 * a1 * a3 + 6 * a1 ** 2 * a2 - 3 * a1 ** 4
+        return n, a1, np.maximum(m2, 0.0), m3, m4
+
+    def describe_numericas(self) -> pd.DataFrame:
+        """Equivalente a df.select_dtypes(include=np.number).describe().T"""
+        cols = self.columnas_numericas
+        if not cols:
+            return pd.DataFrame()
+        n, a1, m2, _, _ = self._momentos_centrales()
+        with np.errstate(all="ignore"):
+            media = a1 + (self.numerico.desplazamiento if self.numerico.desplazamiento is not None else 0.0)
+            std = np.sqrt(m2 * n / (n - 1))
+        std = np.where(n > 1, std, np.nan)
+        cuant = np.array([s.cuantiles([0.25, 0.5, 0.75]) for s in self.numerico.sketches])
+        minimos = np.where(n > 0, self.numerico.minimos, np.nan)
+        maximos = np.where(n > 0, self.numerico.maximos, np.nan)
+        return pd.DataFrame(
+            {
+                "count": n,
+                "mean": np.where(n > 0, media, np.nan),
+                "std": std,
+                "min": minimos,
+                "25%": cuant[:, 0],
+                "50%": cuant[:, 1],
+                "75%": cuant[:, 2],
+                "max": maximos,
+            },
+            index=cols,
+        )
+
+    def describe_categoricas(self) -> pd.DataFrame:
+        """Equivalente a df.select_dtypes(exclude=np.number).describe(include='all').T"""
+        filas = {}
+        for c in self.columnas_categoricas:
+            vc = self.categorico.frecuencias[c]
+            if vc.empty:
+                filas[c] = [0, 0, np.nan, np.nan]
+            else:
+                top = vc.idxmax()
+                filas[c] = [int(vc.sum()), int(vc.size), top, int(vc[top])]
+        if not filas:
+            return pd.DataFrame()
+        return pd.DataFrame.from_dict(
+            filas, orient="index", columns=["count", "unique", "top", "freq"]
+        ).astype(object)
+
+    def asimetria_curtosis(self) -> pd.DataFrame:
+        """Skew y kurtosis con las mismas correcciones de sesgo que pandas."""
+        n, _, m2, m3, m4 = self._momentos_centrales()
+        with np.errstate(all="ignore"):
+            g1 = m3 / m2 ** 1.5
+            skew = np.sqrt(n * (n - 1)) / (n - 2) * g1
+            g2 = m4 / m2 ** 2 - 3
+            kurt = (n - 1) / ((n - 2) * (n - 3)) * ((n + 1) * g2 + 6)
+        constante = m2 <= 1e-14 * np.maximum(self.numerico.potencias[1] / np.maximum(n, 1), 1.0)
+        skew = np.where(constante, 0.0, skew)
+        kurt = np.where(constante, 0.0, kurt)
+        skew = np.where(n < 3, np.nan, skew)
+        kurt = np.where(n < 4, np.nan, kurt)
+        return pd.DataFrame({"skew": skew, "kurtosis": kurt}, index=self.columnas_numericas)
+
+    def correlacion(self) -> pd.DataFrame:
+        """Pearson por pares completos, igual que DataFrame.corr()."""
+        return self.numerico.covarianza.correlacion()
+
+    def top_correlaciones(self, k: int = 10) -> pd.DataFrame:
+        """Los k pares de columnas con mayor |r|."""
+        return self.numerico.covarianza.top_pares(k)
+
+    def histograma(self, columna: str) -> tuple[np.ndarray, np.ndarray]:
+        """Devuelve (conteos, bordes) del histograma acumulado."""
+        h = self.numerico.histogramas[self.columnas_numericas.index(columna)]
+        return h.conteos, h.bordes()
+
+    def sketch(self, columna: str) -> SketchCuantiles:
+        return self.numerico.sketches[self.columnas_numericas.index(columna)]
+
+    def limites_iqr(self, columna: str, factor: float = 1.5) -> tuple[float, float]:
+        return self.sketch(columna).limites_iqr(factor)
+
+
+# ==========================================================
+# PASADA ÚNICA
+# ==========================================================
+def resumir_chunks(chunks, nombre: str = "", bins: int = BINS_HISTOGRAMA,
+                   capacidad_sketch: int = MAX_MUESTRAS_SKETCH) -> ResumenDataset:
+    """Recorre un iterable de DataFrames (chunks) una sola vez."""
+    columnas = None
+    numerico = categorico = None
+    filas = 0
+    for chunk in chunks:
+        if columnas is None:
+            columnas = list(chunk.columns)
+            num_cols = list(chunk.select_dtypes(include=[np.number]).columns)
+            cat_cols = [c for c in columnas if c not in num_cols]
+            numerico = AcumuladorNumerico(num_cols, bins, capacidad_sketch)
+            categorico = AcumuladorCategorico(cat_cols)
+        filas += len(chunk)
+        bloque = (
+            chunk[numerico.columnas]
+            .apply(pd.to_numeric, errors="coerce")
+            .to_numpy(dtype=np.float64, na_value=np.nan)
+        )
+        numerico.agregar(bloque)
+        categorico.agregar(chunk)
+
+    if columnas is None:
+        columnas = []
+        numerico = AcumuladorNumerico([], bins, capacidad_sketch)
+        categorico = AcumuladorCategorico([])
+    return ResumenDataset(nombre, columnas, filas, numerico, categorico)
+
+
+def resumir_csv(ruta: str | Path, nombre: str | None = None,
+                tamanio_chunk: int = TAMANIO_CHUNK, **kwargs) -> ResumenDataset:
+    """Lee un CSV por chunks y devuelve su ResumenDataset."""
+    ruta = Path(ruta)
+    chunks = pd.read_csv(ruta, chunksize=tamanio_chunk, **kwargs)
+    return resumir_chunks(chunks, nombre=nombre or ruta.stem)
@@ -0,0 +1,225 @@
+"""
+Pronóstico de ventas diarias por serie (producto, ciudad o total).
+
+Todas las series van juntas en una matriz [serie, día] y cada modelo se
+ajusta para todas a la vez con operaciones vectorizadas: el costo crece con
+los días, no con un bucle de Python por serie.
+
+- naive_estacional(): repite la última semana.
+- suavizado_exponencial(): nivel + estacionalidad semanal aditiva (ETS A,N,A);
+  alfa y gamma se eligen por serie de una grilla, por error a un paso.
+- gbm_rezagos(): un solo HistGradientBoosting global sobre rezagos y día de la
+  semana (series escaladas por su media), pronóstico recursivo.
+
+backtest() evalúa con origen móvil: para cada origen entrena con los días
+anteriores, pronostica `h` días y mide el error contra lo real, en paralelo
+por (modelo, origen).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+PERIODO = 7  # estacionalidad semanal
+HORIZONTE = 7
+REZAGOS = (1, 2, 3, 7, 14)
+GRILLA_ALFA = (0.1, 0.3, 0.6)
+GRILLA_GAMMA = (0.05, 0.2, 0.4)
+MAX_FILAS_GBM = 500_000
+SEMILLA = 42
+
+
+# ==========================================================
+# SERIES
+# ==========================================================
+class Series:
+    """Matriz [serie, día] con los ids de cada fila y las fechas de cada columna."""
+
+    def __init__(self, valores: np.ndarray, claves: np.ndarray, fechas: pd.DatetimeIndex):
+        self.valores = valores
+        self.claves = claves
+        self.fechas = fechas
+
+    @property
+    def forma(self) -> tuple[int, int]:
+        return self.valores.shape
+
+    def __repr__(self):
+        return (f"Series({len(self.claves)} series, {len(self.fechas)} días, "
+                f"{self.fechas[0].date() if len(self.fechas) else '-'} a "
+                f"{self.fechas[-1].date() if len(self.fechas) else '-'})")
+
+
+def series_diarias(lineas: pd.DataFrame, clave: str | None, valor: str = "importe",
+                   columna_fecha: str = "fecha") -> Series:
+    """
+    Suma diaria de `valor` por `clave` (None = una sola serie total). Los
+    días sin ventas quedan en 0, desde el primer hasta el último día.
+    """
+    fechas = pd.to_datetime(lineas[columna_fecha], errors="coerce").dt.normalize()
+    df = lineas.assign(_fecha=fechas, _clave="total" if clave is None else lineas[clave])
+    df = df.dropna(subset=["_fecha", "_clave"])
+    if df.empty:
+        return Series(np.zeros((0, 0)), np.array([]), pd.DatetimeIndex([]))
+    dias = pd.date_range(df["_fecha"].min(), df["_fecha"].max(), freq="D")
+    filas, claves = pd.factorize(df["_clave"], sort=True)
+    columnas = ((df["_fecha"] - dias[0]).dt.days).to_numpy()
+    valores = np.zeros((len(claves), len(dias)))
+    np.add.at(valores, (filas, columnas), pd.to_numeric(df[valor], errors="coerce").fillna(0).to_numpy())
+    return Series(valores, np.asarray(claves), dias)
+
+
+# ==========================================================
+# MODELOS (todas las series a la vez)
+# ==========================================================
+def naive_estacional(Y: np.ndarray, h: int, periodo: int = PERIODO) -> np.ndarray:
+    """Cada día del horizonte = mismo día de la última semana observada."""
+    if Y.shape[1] < periodo:
+        return np.repeat(Y[:, -1:], h, axis=1)
+    ultima = Y[:, -periodo:]
+    return np.tile(ultima, (1, -(-h // periodo)))[:, :h]
+
+
+def _ets_ana(Y: np.ndarray, alfa: float, gamma: float, periodo: int):
+    """ETS(A,N,A) para todas las series: (nivel, estacionales, error a un paso)."""
+    nivel = Y[:, :periodo].mean(axis=1)
+    estacional = Y[:, :periodo] - nivel[:, None]
+    error = np.zeros(Y.shape[0])
+    for t in range(periodo, Y.shape[1]):
+        j = t % periodo
+        e = Y[:, t] - (nivel + estacional[:, j])
+        error += np.abs(e)
+        nivel = nivel + alfa * e
+        estacional[:, j] = estacional[:, j] + gamma * (1 - alfa) * e
+    return nivel, estacional, error
+
+
+def suavizado_exponencial(Y: np.ndarray, h: int, periodo: int = PERIODO,
+                          grilla_alfa=GRILLA_ALFA, grilla_gamma=GRILLA_GAMMA) -> np.ndarray:
+    """Holt-Winters aditivo sin tendencia; (alfa, gamma) por serie, el de menor error."""
+    T = Y.shape[1]
+    if T < 2 * periodo:
+        return naive_estacional(Y, h, periodo)
+    mejor_error = np.full(Y.shape[0], np.inf)
+    pronostico = np.zeros((Y.shape[0], h))
+    pasos = (T + np.arange(h)) % periodo
+    for alfa in grilla_alfa:
+        for gamma in grilla_gamma:
+            nivel, estacional, error = _ets_ana(Y, alfa, gamma, periodo)
+            mejora = error < mejor_error
+            mejor_error[mejora] = error[mejora]
+            pronostico[mejora] = nivel[mejora, None] + estacional[mejora][:, pasos]
+    return np.maximum(pronostico, 0)
+
+
+def _features_rezagos(Z: np.ndarray, t: np.ndarray, dia_semana0: int, rezagos) -> np.ndarray:
+    """Filas (serie, t): rezagos de Z, media de la última semana y día de la semana."""
+    columnas = [Z[:, t - r] for r in rezagos]
+    semana = np.stack([Z[:, t - r] for r in range(1, PERIODO + 1)]).mean(axis=0)
+    dia = np.broadcast_to((dia_semana0 + t) % PERIODO, semana.shape)
+    return np.stack([*columnas, semana, dia], axis=-1)
+
+
+def gbm_rezagos(Y: np.ndarray, h: int, rezagos=REZAGOS, dia_semana0: int = 0,
+                max_filas: int = MAX_FILAS_GBM, semilla: int = SEMILLA) -> np.ndarray:
+    """
+    Un modelo global para todas las series (escaladas por su media), sobre
+    rezagos y día de la semana. `dia_semana0`: día de la semana de Y[:, 0].
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor
+
+    max_rezago = max(max(rezagos), PERIODO)
+    T = Y.shape[1]
+    if T <= max_rezago + 1:
+        return naive_estacional(Y, h)
+
+    escala = Y.mean(axis=1)
+    escala[escala == 0] = 1.0
+    Z = Y / escala[:, None]
+
+    tiempos = np.arange(max_rezago, T)
+    X = _features_rezagos(Z, tiempos, dia_semana0, rezagos).reshape(-1, len(rezagos) + 2)
+    y = Z[:, tiempos].ravel()
+    if len(y) > max_filas:
+        elegidas = np.random.default_rng(semilla).choice(len(y), max_filas, replace=False)
+        X, y = X[elegidas], y[elegidas]
+    modelo = HistGradientBoostingRegressor(max_iter=200, learning_rate=0.05, random_state=semilla)
+    modelo.fit(X, y)
+
+    # Recursivo: cada día pronosticado pasa a ser rezago del siguiente
+    extendida = np.concatenate([Z, np.zeros((Z.shape[0], h))], axis=1)
+    for paso in range(h):
+        t = np.array([T + paso])
+        fila = _features_rezagos(extendida, t, dia_semana0, rezagos).reshape(-1, len(rezagos) + 2)
+        extendida[:, T + paso] = modelo.predict(fila)
+    return np.maximum(extendida[:, T:] * escala[:, None], 0)
+
+
+MODELOS = {
+    "naive_estacional": naive_estacional,
+    "suavizado_exponencial": suavizado_exponencial,
+    "gbm_rezagos": gbm_rezagos,
+}
+
+
+# ==========================================================
+# BACKTEST CON ORIGEN MÓVIL
+# ==========================================================
+def _errores(real: np.ndarray, pronostico: np.ndarray) -> dict:
+    e = pronostico - real
+    total = np.abs(real).sum()
+    return {
+        "mae": float(np.abs(e).mean()),
+        "rmse": float(np.sqrt((e ** 2).mean())),
+        "wape": float(np.abs(e).sum() / total) if total else np.nan,
+        "sesgo": float(e.sum() / total) if total else np.nan,
+    }
+
+
+def backtest(series: Series, modelos: dict | None = None, h: int = HORIZONTE,
+             n_origenes: int = 4, max_workers: int | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Origen móvil: los últimos `n_origenes` bloques de `h` días se pronostican
+    con todo lo anterior. Devuelve (detalle por modelo y origen, resumen por modelo).
+    """
+    modelos = modelos or MODELOS
+    Y, T = series.valores, series.forma[1]
+    origenes = [T - h * k for k in range(n_origenes, 0, -1) if T - h * k >= 2 * PERIODO]
+    dia0 = int(series.fechas[0].weekday()) if T else 0
+
+    def correr(nombre, origen):
+        funcion = modelos[nombre]
+        inicio = time.perf_counter()
+        if funcion is gbm_rezagos:
+            pronostico = funcion(Y[:, :origen], h, dia_semana0=dia0)
+        else:
+            pronostico = funcion(Y[:, :origen], h)
+        segundos = time.perf_counter() - inicio
+        return {"modelo": nombre, "origen": series.fechas[origen].date(), "segundos": segundos,
+                **_errores(Y[:, origen:origen + h], pronostico)}
+
+    tareas = [(m, o) for m in modelos for o in origenes]
+    with ThreadPoolExecutor(max_workers=max_workers) as ejecutor:
+        detalle = pd.DataFrame(list(ejecutor.map(lambda t: correr(*t), tareas)))
+    if detalle.empty:
+        return detalle, detalle
+
+    resumen = detalle.groupby("modelo", sort=False).agg(
+        mae=("mae", "mean"), rmse=("rmse", "mean"), wape=("wape", "mean"),
+        sesgo=("sesgo", "mean"), segundos=("segundos", "sum"), origenes=("origen", "size"),
+    )
+    resumen["ms_por_serie"] = resumen["segundos"] * 1000 / max(len(series.claves), 1) / resumen["origenes"]
+    return detalle, resumen.sort_values("wape").reset_index()
+
+
+def pronosticar(series: Series, modelo: str = "suavizado_exponencial", h: int = HORIZONTE) -> pd.DataFrame:
+    """Próximos `h` días de cada serie: filas = fechas, columnas = claves."""
+    Y = series.valores
+    if modelo == "gbm_rezagos":
+        valores = gbm_rezagos(Y, h, dia_semana0=int(series.fechas[0].weekday()))
+    else:
+        valores = MODELOS[modelo](Y, h)
+    fechas = pd.date_range(series.fechas[-1] + pd.Timedelta(days=1), periods=h, freq="D")
+    return pd.DataFrame(valores.T, index=fechas, columns=series.claves)
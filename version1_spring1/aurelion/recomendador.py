@@ -0,0 +1,195 @@
+"""
+Recomendador de productos item-item sobre la matriz dispersa clientes x
+productos (cuántos tickets de cada cliente incluyen cada producto).
+
+- Similitud coseno entre productos, calculada por bloques de filas (la
+  matriz producto x producto completa nunca está en memoria), y de cada
+  producto se guardan solo sus k vecinos: arrays [producto, k].
+- Recomendar a un cliente = sumar las similitudes de los vecinos de lo que
+  ya compró, descartar lo comprado y quedarse con los mejores. Solo se
+  tocan sus productos x k vecinos: no depende del tamaño del catálogo.
+- actualizar() agrega compras nuevas y recalcula solo los vecinos de los
+  productos cuya similitud pudo cambiar (los que comparten algún cliente
+  con los productos comprados).
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+K_VECINOS = 20
+TAMANIO_BLOQUE = 2048
+
+
+# ==========================================================
+# MATRIZ CLIENTES x PRODUCTOS
+# ==========================================================
+def interacciones(df_ventas: pd.DataFrame, df_detalle: pd.DataFrame) -> pd.DataFrame:
+    """(id_cliente, id_producto, tickets): en cuántos tickets compró cada producto."""
+    df = df_detalle[["id_venta", "id_producto"]].drop_duplicates().merge(
+        df_ventas[["id_venta", "id_cliente"]], on="id_venta", how="inner"
+    )
+    return (
+        df.dropna(subset=["id_cliente", "id_producto"])
+        .groupby(["id_cliente", "id_producto"]).size()
+        .rename("tickets").reset_index()
+    )
+
+
+def _normalizar_columnas(X: sparse.csr_matrix) -> sparse.csc_matrix:
+    """Columnas de norma 1 (coseno = producto interno)."""
+    normas = np.sqrt(np.asarray(X.multiply(X).sum(axis=0)).ravel())
+    normas[normas == 0] = 1.0
+    return (X @ sparse.diags(1.0 / normas)).tocsc()
+
+
+def _top_k_filas(S: sparse.csr_matrix, filas: np.ndarray, k: int):
+    """k mayores valores de cada fila de S (sin la diagonal) -> (indices, valores)."""
+    vecinos = np.full((S.shape[0], k), -1, dtype=np.int32)
+    sims = np.zeros((S.shape[0], k), dtype=np.float32)
+    for i in range(S.shape[0]):
+        inicio, fin = S.indptr[i], S.indptr[i + 1]
+        cols, vals = S.indices[inicio:fin], S.data[inicio:fin]
+        propios = cols != filas[i]
+        cols, vals = cols[propios], vals[propios]
+        if len(cols) > k:
+            mejores = np.argpartition(-vals, k - 1)[:k]
+            cols, vals = cols[mejores], vals[mejores]
+        orden = np.lexsort((cols, -vals))
+        vecinos[i, :len(cols)] = cols[orden]
+        sims[i, :len(cols)] = vals[orden]
+    return vecinos, sims
+
+
+def vecinos_productos(X: sparse.csr_matrix, k: int = K_VECINOS, productos=None,
+                      tamanio_bloque: int = TAMANIO_BLOQUE):
+    """
+    Top-k productos más similares (coseno) para `productos` (todos si None).
+    Devuelve (vecinos [n, k] int32 con -1 de relleno, similitudes [n, k] float32).
+    """
+    Xn = _normalizar_columnas(X)
+    productos = np.arange(X.shape[1]) if productos is None else np.asarray(productos)
+    vecinos = np.full((len(productos), k), -1, dtype=np.int32)
+    sims = np.zeros((len(productos), k), dtype=np.float32)
+    XnT = Xn.T.tocsr()
+    for inicio in range(0, len(productos), tamanio_bloque):
+        bloque = productos[inicio:inicio + tamanio_bloque]
+        S = (XnT[bloque] @ Xn).tocsr()
+        vecinos[inicio:inicio + len(bloque)], sims[inicio:inicio + len(bloque)] = \
+            _top_k_filas(S, bloque, k)
+    return vecinos, sims
+
+
+# ==========================================================
+# ÍNDICE EN MEMORIA
+# ==========================================================
+class IndiceRecomendaciones:
+    """Historial por cliente (CSR) + k vecinos por producto + popularidad."""
+
+    def __init__(self, tabla: pd.DataFrame, k: int = K_VECINOS):
+        self.k = k
+        self._armar(tabla)
+
+    def _armar(self, tabla: pd.DataFrame):
+        self.tabla = tabla.reset_index(drop=True)
+        filas, ids_cliente = pd.factorize(self.tabla["id_cliente"], sort=True)
+        columnas, ids_producto = pd.factorize(self.tabla["id_producto"], sort=True)
+        self.ids_cliente = np.asarray(ids_cliente)
+        self.ids_producto = np.asarray(ids_producto)
+        self._fila_cliente = {c: i for i, c in enumerate(self.ids_cliente.tolist())}
+        self.matriz = sparse.csr_matrix(
+            (self.tabla["tickets"].to_numpy(dtype=np.float64), (filas, columnas)),
+            shape=(len(ids_cliente), len(ids_producto)),
+        )
+        self.vecinos, self.sims = vecinos_productos(self.matriz, self.k)
+        self._popularidad()
+
+    def _popularidad(self):
+        clientes_por_producto = np.diff(self.matriz.tocsc().indptr)
+        self.populares = np.lexsort((np.arange(len(clientes_por_producto)), -clientes_por_producto))
+
+    def __repr__(self):
+        return (f"IndiceRecomendaciones({len(self.ids_cliente)} clientes, "
+                f"{len(self.ids_producto)} productos, k={self.k})")
+
+    # ------------------------------------------------------
+    # CONSULTA
+    # ------------------------------------------------------
+    def comprados(self, id_cliente) -> np.ndarray:
+        fila = self._fila_cliente.get(id_cliente)
+        if fila is None:
+            return np.empty(0, dtype=np.int32)
+        return self.matriz.indices[self.matriz.indptr[fila]:self.matriz.indptr[fila + 1]]
+
+    def recomendar(self, id_cliente, n: int = 5) -> tuple[list[tuple], str]:
+        """
+        [(id_producto, puntaje)] y el origen: "historial" (vecinos de lo que
+        compró) o "populares" (cliente sin historial o sin vecinos nuevos).
+        """
+        if n < 1:
+            raise ValueError(f"n debe ser al menos 1 (se pidió {n})")
+        propios = self.comprados(id_cliente)
+        resultado, origen = [], "historial"
+        if len(propios):
+            fila = self._fila_cliente[id_cliente]
+            pesos = self.matriz.data[self.matriz.indptr[fila]:self.matriz.indptr[fila + 1]]
+            candidatos = self.vecinos[propios].ravel()
+            puntajes = (self.sims[propios] * pesos[:, None]).ravel()
+            validos = (candidatos >= 0) & ~np.isin(candidatos, propios)
+            unicos, inversa = np.unique(candidatos[validos], return_inverse=True)
+            total = np.bincount(inversa, weights=puntajes[validos], minlength=len(unicos))
+            orden = np.lexsort((unicos, -total))[:n]
+            resultado = [(self.ids_producto[j].item(), float(total[j])) for j in orden]
+
+        if len(resultado) < n:
+            # Se completa con los más populares que no tenga
+            origen = "historial" if resultado else "populares"
+            ya = set(propios.tolist()) | {self._columna(p) for p, _ in resultado}
+            for j in self.populares:
+                if len(resultado) >= n:
+                    break
+                if j not in ya:
+                    resultado.append((self.ids_producto[j].item(), 0.0))
+        return resultado, origen
+
+    def _columna(self, id_producto) -> int:
+        return int(np.searchsorted(self.ids_producto, id_producto))
+
+    # ------------------------------------------------------
+    # ACTUALIZACIÓN INCREMENTAL
+    # ------------------------------------------------------
+    def actualizar(self, nuevas: pd.DataFrame) -> int:
+        """
+        Suma interacciones nuevas (id_cliente, id_producto, tickets). Si
+        aparecen clientes o productos nuevos se rearma todo; si no, se
+        recalculan solo los vecinos afectados. Devuelve cuántos productos
+        se recalcularon.
+        """
+        if nuevas.empty:
+            return 0
+        conocidos = (nuevas["id_cliente"].isin(self._fila_cliente)
+                     & nuevas["id_producto"].isin(self.ids_producto))
+        if not conocidos.all():
+            self._armar(pd.concat([self.tabla, nuevas], ignore_index=True)
+                        .groupby(["id_cliente", "id_producto"], as_index=False)["tickets"].sum())
+            return len(self.ids_producto)
+
+        filas = np.array([self._fila_cliente[c] for c in nuevas["id_cliente"].tolist()])
+        columnas = np.searchsorted(self.ids_producto, nuevas["id_producto"].to_numpy())
+        delta = sparse.csr_matrix((nuevas["tickets"].to_numpy(dtype=np.float64), (filas, columnas)),
+                                  shape=self.matriz.shape)
+        self.matriz = (self.matriz + delta).tocsr()
+        self.matriz.sort_indices()
+        self.tabla = pd.concat([self.tabla, nuevas], ignore_index=True) \
+            .groupby(["id_cliente", "id_producto"], as_index=False)["tickets"].sum()
+
+        # Cambian las columnas tocadas; su similitud cambia con todo producto
+        # que comparta algún cliente con ellas (antes o después de la compra)
+        tocados = np.unique(columnas)
+        clientes_tocados = np.unique(self.matriz.tocsc()[:, tocados].indices)
+        afectados = np.unique(np.concatenate([tocados, self.matriz[clientes_tocados].indices]))
+        self.vecinos[afectados], self.sims[afectados] = vecinos_productos(
+            self.matriz, self.k, productos=afectados
+        )
+        self._popularidad()
+        return len(afectados)
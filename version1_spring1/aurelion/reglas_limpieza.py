@@ -0,0 +1,369 @@
+"""
+Motor de limpieza con reglas de validación vectorizadas.
+
+Cada tabla declara sus reglas en REGLAS (clave, tipos, emails, fechas,
+referencias, importe). Cada regla evalúa columnas enteras de un chunk y
+devuelve una máscara booleana (True = la fila pasa); las máscaras de todas
+las reglas se apilan en una matriz filas x reglas, así una fila se rechaza
+si falla cualquiera y el reporte cuenta cuántas filas rechazó cada regla.
+
+Las tablas se limpian en orden (padres antes que hijos): las claves aceptadas
+de clientes / productos / ventas alimentan la integridad referencial de las
+tablas que las referencian.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aurelion.integridad import IndiceClaves
+
+TAMANIO_CHUNK = 50_000
+TOLERANCIA_IMPORTE = 0.01
+PATRON_EMAIL = r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9.\-]+\.[A-Za-z]{2,}"
+FORMATO_FECHA = "%Y-%m-%d"
+
+# ==========================================================
+# CONFIGURACIÓN
+# ==========================================================
+# tipos: 'entero' | 'decimal' | 'texto' | 'fecha'
+# clave: columnas que identifican la fila (None = fila completa)
+# referencias: columna -> (tabla, columna) que debe existir en la tabla padre
+REGLAS = {
+    "clientes": {
+        "clave": ["id_cliente"],
+        "tipos": {"id_cliente": "entero", "nombre_cliente": "texto", "email": "texto",
+                  "ciudad": "texto", "fecha_alta": "fecha"},
+        "obligatorias": ["id_cliente", "nombre_cliente"],
+        "emails": ["email"],
+        "fechas": {"fecha_alta": ("2000-01-01", None)},
+    },
+    "productos": {
+        "clave": ["id_producto"],
+        "tipos": {"id_producto": "entero", "nombre_producto": "texto",
+                  "categoria": "texto", "precio_unitario": "decimal"},
+        "obligatorias": ["id_producto", "nombre_producto", "precio_unitario"],
+        "positivas": ["precio_unitario"],
+    },
+    "ventas": {
+        "clave": ["id_venta"],
+        "tipos": {"id_venta": "entero", "fecha": "fecha", "id_cliente": "entero",
+                  "nombre_cliente": "texto", "email": "texto", "medio_pago": "texto"},
+        "obligatorias": ["id_venta", "fecha", "id_cliente"],
+        "emails": ["email"],
+        "fechas": {"fecha": ("2000-01-01", None)},
+        "referencias": {"id_cliente": ("clientes", "id_cliente")},
+    },
+    "detalle_ventas": {
+        # Un mismo producto puede aparecer dos veces en una venta: solo se
+        # descartan filas repetidas completas
+        "clave": None,
+        "tipos": {"id_venta": "entero", "id_producto": "entero", "nombre_producto": "texto",
+                  "cantidad": "entero", "precio_unitario": "decimal", "importe": "decimal"},
+        "obligatorias": ["id_venta", "id_producto", "cantidad", "precio_unitario", "importe"],
+        "positivas": ["cantidad", "precio_unitario"],
+        "referencias": {"id_venta": ("ventas", "id_venta"),
+                        "id_producto": ("productos", "id_producto")},
+        "importe": ("importe", "cantidad", "precio_unitario"),
+    },
+}
+
+# Orden en que deben limpiarse (padres primero)
+ORDEN_TABLAS = ["clientes", "productos", "ventas", "detalle_ventas"]
+
+
+# ==========================================================
+# COERCIÓN DE TIPOS
+# ==========================================================
+def coercionar(df: pd.DataFrame, tipos: dict[str, str]) -> tuple[pd.DataFrame, dict[str, np.ndarray]]:
+    """
+    Convierte cada columna a su tipo declarado. Devuelve el DataFrame
+    convertido y, por columna, la máscara de valores que NO se pudieron
+    convertir (no eran nulos y quedaron nulos).
+    """
+    columnas, fallos = {}, {}
+    for col in df.columns:
+        s = df[col]
+        tipo = tipos.get(col)
+        if tipo in ("entero", "decimal"):
+            convertida = pd.to_numeric(s, errors="coerce")
+            if tipo == "entero":
+                no_entero = convertida.notna() & (convertida % 1 != 0)
+                convertida = convertida.mask(no_entero)
+        elif tipo == "fecha":
+            if pd.api.types.is_datetime64_any_dtype(s):
+                convertida = s
+            else:
+                convertida = pd.to_datetime(s, format=FORMATO_FECHA, errors="coerce")
+        elif tipo == "texto":
+            convertida = s.astype("string").str.strip()
+            convertida = convertida.mask(convertida == "")
+        else:
+            convertida = s
+        if tipo is not None:
+            fallos[col] = (s.notna() & convertida.isna()).to_numpy()
+        columnas[col] = convertida
+    return pd.DataFrame(columnas, index=df.index), fallos
+
+
+def _restaurar_enteros(df: pd.DataFrame, tipos: dict[str, str]) -> pd.DataFrame:
+    """Las columnas enteras sin nulos vuelven a int64 (to_numeric puede dejar float)."""
+    for col, tipo in tipos.items():
+        if tipo == "entero" and col in df and df[col].notna().all():
+            df[col] = df[col].astype("int64")
+    return df
+
+
+# ==========================================================
+# REGLAS
+# ==========================================================
+class Regla:
+    """Regla vectorizada: evaluar() devuelve True por cada fila que pasa."""
+
+    nombre = "regla"
+
+    def evaluar(self, df: pd.DataFrame, contexto: dict) -> np.ndarray:
+        raise NotImplementedError
+
+
+class ReglaObligatoria(Regla):
+    def __init__(self, columna: str):
+        self.columna = columna
+        self.nombre = f"obligatoria:{columna}"
+
+    def evaluar(self, df, contexto):
+        return df[self.columna].notna().to_numpy()
+
+
+class ReglaPositiva(Regla):
+    def __init__(self, columna: str):
+        self.columna = columna
+        self.nombre = f"positiva:{columna}"
+
+    def evaluar(self, df, contexto):
+        return (df[self.columna].isna() | (df[self.columna] > 0)).to_numpy()
+
+
+class ReglaEmail(Regla):
+    def __init__(self, columna: str):
+        self.columna = columna
+        self.nombre = f"email:{columna}"
+
+    def evaluar(self, df, contexto):
+        s = df[self.columna]
+        return (s.isna() | s.str.fullmatch(PATRON_EMAIL).fillna(False)).to_numpy(dtype=bool)
+
+
+class ReglaFecha(Regla):
+    """Fecha dentro de [desde, hasta]; hasta=None significa 'no en el futuro'."""
+
+    def __init__(self, columna: str, desde: str | None = None, hasta: str | None = None):
+        self.columna = columna
+        self.desde = pd.Timestamp(desde) if desde else None
+        self.hasta = pd.Timestamp(hasta) if hasta else None
+        self.nombre = f"fecha:{columna}"
+
+    def evaluar(self, df, contexto):
+        s = df[self.columna]
+        hasta = self.hasta if self.hasta is not None else pd.Timestamp.now().normalize()
+        ok = s.isna() | (s <= hasta)
+        if self.desde is not None:
+            ok &= s.isna() | (s >= self.desde)
+        return ok.to_numpy()
+
+
+class ReglaReferencia(Regla):
+    """El valor debe existir entre las claves aceptadas de la tabla padre."""
+
+    def __init__(self, columna: str, tabla: str, columna_padre: str):
+        self.columna = columna
+        self.tabla = tabla
+        self.columna_padre = columna_padre
+        self.nombre = f"referencia:{columna}->{tabla}.{columna_padre}"
+
+    def evaluar(self, df, contexto):
+        claves = contexto.get((self.tabla, self.columna_padre))
+        if claves is None:
+            # Sin tabla padre cargada no se puede verificar: no se rechaza
+            return np.ones(len(df), dtype=bool)
+        s = df[self.columna]
+        return s.isna().to_numpy() | claves.contiene(s.to_numpy())
+
+
+class ReglaImporte(Regla):
+    """importe == cantidad * precio_unitario (con tolerancia)."""
+
+    def __init__(self, importe: str, cantidad: str, precio: str,
+                 tolerancia: float = TOLERANCIA_IMPORTE):
+        self.importe, self.cantidad, self.precio = importe, cantidad, precio
+        self.tolerancia = tolerancia
+        self.nombre = f"importe:{importe}={cantidad}*{precio}"
+
+    def evaluar(self, df, contexto):
+        esperado = df[self.cantidad].to_numpy(dtype=float) * df[self.precio].to_numpy(dtype=float)
+        real = df[self.importe].to_numpy(dtype=float)
+        nulos = np.isnan(esperado) | np.isnan(real)
+        return nulos | (np.abs(real - esperado) <= self.tolerancia)
+
+
+class ReglaUnica:
+    """
+    Deduplicación por clave entre chunks: se queda con la primera aparición
+    válida. Se evalúa después del resto de las reglas. Las claves vistas se
+    guardan como tuplas en un set (se comparan los valores, no un hash que
+    pueda chocar), así cada chunk cuesta O(filas) sin importar cuántas
+    claves se acumularon antes.
+    """
+
+    def __init__(self, clave: list[str] | None):
+        self.clave = clave
+        self.nombre = f"duplicado:{','.join(clave)}" if clave else "duplicado:fila"
+        self._vistas: set[tuple] = set()
+
+    @staticmethod
+    def _claves(df: pd.DataFrame) -> list[tuple]:
+        # Valores de Python: un id int64 es el mismo que ese id leído float64
+        # en otro chunk (por un nulo) y los enteros se comparan exactos, sin
+        # pasar por float64. Los faltantes quedan como None (NaN != NaN).
+        columnas = [df[c].astype(object).where(df[c].notna(), None).tolist() for c in df.columns]
+        return list(zip(*columnas))
+
+    def evaluar(self, df: pd.DataFrame) -> np.ndarray:
+        claves = self._claves(df[self.clave or list(df.columns)])
+        vistas = self._vistas
+        ok = np.empty(len(claves), dtype=bool)
+        for i, clave in enumerate(claves):
+            ok[i] = clave not in vistas
+            if ok[i]:
+                vistas.add(clave)
+        return ok
+
+
+def construir_reglas(config: dict) -> list[Regla]:
+    reglas: list[Regla] = [ReglaObligatoria(c) for c in config.get("obligatorias", [])]
+    reglas += [ReglaPositiva(c) for c in config.get("positivas", [])]
+    reglas += [ReglaEmail(c) for c in config.get("emails", [])]
+    reglas += [ReglaFecha(c, *rango) for c, rango in config.get("fechas", {}).items()]
+    reglas += [ReglaReferencia(c, t, cp) for c, (t, cp) in config.get("referencias", {}).items()]
+    if "importe" in config:
+        reglas.append(ReglaImporte(*config["importe"]))
+    return reglas
+
+
+# ==========================================================
+# RESULTADO
+# ==========================================================
+class ResultadoLimpieza:
+    """Filas aceptadas, filas rechazadas (con motivo) y conteo por regla."""
+
+    def __init__(self, tabla: str, limpio: pd.DataFrame, rechazadas: pd.DataFrame,
+                 conteos: dict[str, int], filas_entrada: int):
+        self.tabla = tabla
+        self.limpio = limpio
+        self.rechazadas = rechazadas
+        self.conteos = conteos
+        self.filas_entrada = filas_entrada
+
+    def reporte(self) -> pd.DataFrame:
+        """Una fila por regla: cuántas filas rechazó (una fila puede fallar varias)."""
+        return pd.DataFrame({
+            "tabla": self.tabla,
+            "regla": list(self.conteos),
+            "rechazadas": list(self.conteos.values()),
+        })
+
+
+# ==========================================================
+# LIMPIEZA POR CHUNKS
+# ==========================================================
+def limpiar_chunks(chunks, tabla: str, contexto: dict | None = None,
+                   config: dict | None = None) -> ResultadoLimpieza:
+    """
+    Aplica las reglas de `tabla` a cada chunk. `contexto` mapea
+    (tabla, columna) -> claves aceptadas de las tablas padre, y se actualiza
+    con las claves de esta tabla al terminar.
+    """
+    config = config if config is not None else REGLAS[tabla]
+    contexto = contexto if contexto is not None else {}
+    tipos = config.get("tipos", {})
+    reglas = construir_reglas(config)
+    unica = ReglaUnica(config.get("clave"))
+
+    nombres = [f"tipo:{c}" for c in tipos] + [r.nombre for r in reglas] + [unica.nombre]
+    conteos = dict.fromkeys(nombres, 0)
+    aceptados, rechazados = [], []
+    filas = 0
+
+    for chunk in chunks:
+        filas += len(chunk)
+        df, fallos_tipo = coercionar(chunk, tipos)
+
+        # Matriz filas x reglas (True = pasa)
+        pasa = np.ones((len(df), len(nombres)), dtype=bool)
+        for j, col in enumerate(tipos):
+            if col in fallos_tipo:
+                pasa[:, j] = ~fallos_tipo[col]
+        base = len(tipos)
+        for j, regla in enumerate(reglas, start=base):
+            pasa[:, j] = regla.evaluar(df, contexto)
+
+        validas = pasa[:, :-1].all(axis=1)
+        pasa[validas, -1] = unica.evaluar(df[validas])
+        ok = validas & pasa[:, -1]
+
+        for nombre, n in zip(nombres, (~pasa).sum(axis=0)):
+            conteos[nombre] += int(n)
+
+        aceptados.append(df[ok])
+        if not ok.all():
+            malos = chunk[~ok].copy()
+            fallas = ~pasa[~ok]
+            malos["motivo"] = [
+                "; ".join(n for n, f in zip(nombres, fila) if f) for fila in fallas
+            ]
+            rechazados.append(malos)
+
+    limpio = pd.concat(aceptados, ignore_index=True) if aceptados else pd.DataFrame()
+    limpio = _restaurar_enteros(limpio, tipos)
+    rechazadas = (pd.concat(rechazados, ignore_index=True) if rechazados
+                  else pd.DataFrame(columns=[*limpio.columns, "motivo"]))
+
+    # Claves aceptadas, para las tablas que referencian a esta
+    for col in limpio.columns:
+        if tipos.get(col) == "entero":
+            contexto[(tabla, col)] = IndiceClaves(limpio[col].to_numpy())
+
+    return ResultadoLimpieza(tabla, limpio, rechazadas, conteos, filas)
+
+
+def en_chunks(df: pd.DataFrame, tamanio_chunk: int = TAMANIO_CHUNK):
+    """Parte un DataFrame ya cargado (p.ej. un Excel) en chunks."""
+    for inicio in range(0, len(df), tamanio_chunk):
+        yield df.iloc[inicio:inicio + tamanio_chunk]
+
+
+def limpiar_tablas(fuentes: dict, tamanio_chunk: int = TAMANIO_CHUNK) -> dict[str, ResultadoLimpieza]:
+    """
+    Limpia varias tablas en orden de dependencia. `fuentes` mapea
+    tabla -> DataFrame o ruta a un CSV (que se lee por chunks).
+    """
+    contexto: dict = {}
+    resultados = {}
+    orden = [t for t in ORDEN_TABLAS if t in fuentes] + [t for t in fuentes if t not in ORDEN_TABLAS]
+    for tabla in orden:
+        fuente = fuentes[tabla]
+        if isinstance(fuente, pd.DataFrame):
+            chunks = en_chunks(fuente, tamanio_chunk)
+        else:
+            chunks = pd.read_csv(Path(fuente), chunksize=tamanio_chunk)
+        resultados[tabla] = limpiar_chunks(chunks, tabla, contexto)
+    return resultados
+
+
+def reporte_rechazos(resultados: dict[str, ResultadoLimpieza]) -> pd.DataFrame:
+    """Reporte conjunto: tabla, regla, filas rechazadas."""
+    partes = [r.reporte() for r in resultados.values()]
+    if not partes:
+        return pd.DataFrame(columns=["tabla", "regla", "rechazadas"])
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,201 @@
+"""
+Segmentación de clientes: gasto, frecuencia, tamaño de canasta, mezcla de
+medios de pago y ciudad, agrupados con k-means por mini-lotes.
+
+- AcumuladorClientes: suma las compras por cliente de a bloques de tickets
+  (p.ej. un mes por vez) en arrays densos por id_cliente. La memoria depende
+  de la cantidad de clientes, no de la de tickets.
+- Segmentador: ajusta MiniBatchKMeans con partial_fit de a `tamanio_lote`
+  clientes, así nunca tiene más de un lote en el algoritmo. Guarda sus
+  columnas, la estandarización y los centroides: asignar un cliente nuevo
+  es buscar el centroide más cercano (sin sklearn), y actualizar() mueve los
+  centroides con los clientes nuevos como lo haría un mini-lote más.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+K_SEGMENTOS = 4
+TAMANIO_LOTE = 4096
+PASADAS = 5
+SEMILLA = 42
+
+# Se estandarizan; las proporciones de pago y la ciudad (0/1) quedan como están
+COLUMNAS_NUMERICAS = ["gasto_log", "frecuencia_log", "ticket_promedio_log", "unidades_por_ticket"]
+
+
+# ==========================================================
+# ACUMULADO POR CLIENTE
+# ==========================================================
+class AcumuladorClientes:
+    """Compras, gasto, unidades y tickets por medio de pago, indexados por id_cliente."""
+
+    def __init__(self):
+        self.compras = np.zeros(0, dtype=np.int64)
+        self.gasto = np.zeros(0)
+        self.unidades = np.zeros(0)
+        self.pagos: dict[str, np.ndarray] = {}
+
+    @property
+    def n_ids(self) -> int:
+        return len(self.compras)
+
+    def __repr__(self):
+        return f"AcumuladorClientes({int((self.compras > 0).sum())} clientes, {int(self.compras.sum())} tickets)"
+
+    def agregar(self, tickets: pd.DataFrame):
+        """Un bloque de tickets: id_cliente, medio_pago, ticket_total, num_items."""
+        tickets = tickets.dropna(subset=["id_cliente"])
+        ids = tickets["id_cliente"].to_numpy(dtype=np.int64)
+        if not len(ids):
+            return
+        n = max(self.n_ids, int(ids.max()) + 1)
+
+        def sumar(actual, pesos=None):
+            return np.pad(actual, (0, n - len(actual))) + np.bincount(ids, pesos, minlength=n)
+
+        self.compras = sumar(self.compras).astype(np.int64)
+        self.gasto = sumar(self.gasto, tickets["ticket_total"].fillna(0).to_numpy(dtype=np.float64))
+        self.unidades = sumar(self.unidades, tickets["num_items"].fillna(0).to_numpy(dtype=np.float64))
+        medios = tickets["medio_pago"].astype(object).fillna("desconocido").astype(str).to_numpy()
+        for medio in np.unique(medios):
+            self.pagos[medio] = sumar(self.pagos.get(medio, np.zeros(0)), (medios == medio).astype(np.float64))
+        for medio in self.pagos:
+            self.pagos[medio] = np.pad(self.pagos[medio], (0, n - len(self.pagos[medio])))
+
+    def features(self, df_clientes: pd.DataFrame | None = None) -> pd.DataFrame:
+        """Una fila por cliente con compras, indexada por id_cliente."""
+        ids = np.flatnonzero(self.compras > 0)
+        compras = self.compras[ids]
+        gasto = self.gasto[ids]
+        features = pd.DataFrame({
+            "gasto_log": np.log1p(gasto),
+            "frecuencia_log": np.log1p(compras),
+            "ticket_promedio_log": np.log1p(gasto / compras),
+            "unidades_por_ticket": self.unidades[ids] / compras,
+            **{f"pago_{m}": self.pagos[m][ids] / compras for m in sorted(self.pagos)},
+        }, index=pd.Index(ids, name="id_cliente"))
+        if df_clientes is not None:
+            ciudad = df_clientes.drop_duplicates("id_cliente").set_index("id_cliente")["ciudad"]
+            dummies = pd.get_dummies(ciudad.reindex(ids).astype(object), prefix="ciudad", dtype=float)
+            features = features.join(dummies.set_axis(features.index))
+        return features
+
+
+# ==========================================================
+# K-MEANS POR MINI-LOTES
+# ==========================================================
+class Segmentador:
+    """Centroides de los segmentos + cómo llevar un cliente a su espacio."""
+
+    def __init__(self, columnas: list[str], media: np.ndarray, desvio: np.ndarray,
+                 centroides: np.ndarray, conteos: np.ndarray):
+        self.columnas = list(columnas)
+        self.media = media
+        self.desvio = desvio
+        self.centroides = centroides
+        self.conteos = conteos
+
+    @property
+    def k(self) -> int:
+        return len(self.centroides)
+
+    def __repr__(self):
+        return f"Segmentador(k={self.k}, {len(self.columnas)} columnas, {int(self.conteos.sum())} clientes)"
+
+    def _matriz(self, features: pd.DataFrame) -> np.ndarray:
+        """Columnas del modelo (las que falten, p.ej. una ciudad nueva, en 0) y estandarizadas."""
+        X = features.reindex(columns=self.columnas, fill_value=0.0).to_numpy(dtype=np.float64)
+        return (X - self.media) / self.desvio
+
+    @classmethod
+    def ajustar(cls, features: pd.DataFrame, k: int = K_SEGMENTOS, tamanio_lote: int = TAMANIO_LOTE,
+                pasadas: int = PASADAS, semilla: int = SEMILLA) -> "Segmentador":
+        """MiniBatchKMeans con partial_fit de a un lote, `pasadas` veces en orden aleatorio."""
+        from sklearn.cluster import MiniBatchKMeans
+
+        columnas = list(features.columns)
+        numericas = np.isin(columnas, COLUMNAS_NUMERICAS)
+        media = np.where(numericas, features.mean().to_numpy(), 0.0)
+        desvio = np.where(numericas, features.std(ddof=0).to_numpy(), 1.0)
+        desvio[desvio == 0] = 1.0
+        segmentador = cls(columnas, media, desvio, np.zeros((0, len(columnas))), np.zeros(0))
+        X = segmentador._matriz(features)
+
+        k = min(k, len(X))
+        lote = max(tamanio_lote, k)
+        kmeans = MiniBatchKMeans(n_clusters=k, batch_size=lote, random_state=semilla, n_init=3)
+        rng = np.random.default_rng(semilla)
+        for _ in range(pasadas):
+            orden = rng.permutation(len(X))
+            for inicio in range(0, len(X), lote):
+                bloque = orden[inicio:inicio + lote]
+                if len(bloque) >= k:
+                    kmeans.partial_fit(X[bloque])
+
+        # Segmento 0 = el de más gasto: etiquetas estables entre reajustes
+        centroides = kmeans.cluster_centers_[np.argsort(-kmeans.cluster_centers_[:, 0])]
+        segmentador.centroides = centroides
+        segmentador.conteos = np.bincount(segmentador.asignar(features), minlength=k).astype(np.float64)
+        return segmentador
+
+    def asignar(self, features: pd.DataFrame, tamanio_lote: int = TAMANIO_LOTE) -> np.ndarray:
+        """Segmento (centroide más cercano) de cada fila."""
+        X = self._matriz(features)
+        normas = (self.centroides ** 2).sum(axis=1)
+        etiquetas = np.empty(len(X), dtype=np.int32)
+        for inicio in range(0, len(X), tamanio_lote):
+            bloque = X[inicio:inicio + tamanio_lote]
+            etiquetas[inicio:inicio + tamanio_lote] = np.argmin(normas - 2 * bloque @ self.centroides.T, axis=1)
+        return etiquetas
+
+    def actualizar(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Asigna clientes nuevos y mueve cada centroide hacia el promedio de
+        los suyos, pesando por los clientes que ya tenía (un paso de mini-lote).
+        """
+        etiquetas = self.asignar(features)
+        if not len(etiquetas):
+            return etiquetas
+        X = self._matriz(features)
+        nuevos = np.bincount(etiquetas, minlength=self.k).astype(np.float64)
+        sumas = np.zeros_like(self.centroides)
+        np.add.at(sumas, etiquetas, X)
+        total = self.conteos + nuevos
+        con_nuevos = nuevos > 0
+        self.centroides[con_nuevos] = (
+            self.centroides[con_nuevos] * self.conteos[con_nuevos, None] + sumas[con_nuevos]
+        ) / total[con_nuevos, None]
+        self.conteos = total
+        return etiquetas
+
+    def perfiles(self) -> pd.DataFrame:
+        """Centroides en las unidades originales (proporciones y logs sin estandarizar)."""
+        return pd.DataFrame(self.centroides * self.desvio + self.media, columns=self.columnas)
+
+    # ------------------------------------------------------
+    # PERSISTENCIA
+    # ------------------------------------------------------
+    def guardar(self, ruta: str | Path, **extra: np.ndarray):
+        """Escribe aparte y reemplaza: quien lo cargue nunca ve un .npz a medias."""
+        ruta = Path(ruta)
+        temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temporal, "wb") as archivo:
+            np.savez(archivo, columnas=json.dumps(self.columnas), media=self.media, desvio=self.desvio,
+                     centroides=self.centroides, conteos=self.conteos, **extra)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str | Path) -> tuple["Segmentador", dict]:
+        """(segmentador, arrays extra guardados con él)."""
+        with np.load(ruta) as datos:
+            propios = {"columnas", "media", "desvio", "centroides", "conteos"}
+            segmentador = cls(json.loads(str(datos["columnas"])), datos["media"], datos["desvio"],
+                              datos["centroides"], datos["conteos"])
+            extra = {c: datos[c] for c in datos.files if c not in propios}
+        return segmentador, extra
@@ -0,0 +1,183 @@
+"""
+Sketches de una pasada compartidos por los motores de estadísticas,
+correlaciones y outliers: cuantiles con memoria acotada, histogramas
+con bins adaptativos y mediana / MAD de a un valor (para streams).
+"""
+
+import math
+
+import numpy as np
+
+BINS_HISTOGRAMA = 30
+MAX_MUESTRAS_SKETCH = 1_000_000
+ANCHO_BIN_ROBUSTO = 0.02
+MAX_PENDIENTES_ROBUSTO = 256
+MAX_BINS_PYTHON = 32
+
+
+# ==========================================================
+# SKETCH DE CUANTILES
+# ==========================================================
+class SketchCuantiles:
+    """
+    Guarda los valores exactos hasta `capacidad`; a partir de ahí mantiene una
+    muestra uniforme (reservoir sampling), así la memoria queda acotada.
+    Mientras `exacto` sea True los cuantiles coinciden con pandas.
+    """
+
+    def __init__(self, capacidad: int = MAX_MUESTRAS_SKETCH, seed: int = 42):
+        self.capacidad = capacidad
+        self.vistos = 0
+        self._buffer = np.empty(0, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exacto(self) -> bool:
+        return self.vistos <= self.capacidad
+
+    def agregar(self, valores: np.ndarray):
+        valores = valores[~np.isnan(valores)]
+        if valores.size == 0:
+            return
+        libres = self.capacidad - self._buffer.size
+        if libres > 0:
+            self._buffer = np.concatenate([self._buffer, valores[:libres]])
+            self.vistos += min(libres, valores.size)
+            valores = valores[libres:]
+        if valores.size == 0:
+            return
+        # Algoritmo R vectorizado: el i-ésimo valor visto entra con prob. k/i
+        posiciones = self.vistos + 1 + np.arange(valores.size)
+        destinos = (self._rng.random(valores.size) * posiciones).astype(np.int64)
+        entran = destinos < self.capacidad
+        self._buffer[destinos[entran]] = valores[entran]
+        self.vistos += valores.size
+
+    def valores(self) -> np.ndarray:
+        return self._buffer
+
+    def cuantiles(self, qs) -> np.ndarray:
+        if self._buffer.size == 0:
+            return np.full(len(qs), np.nan)
+        return np.quantile(self._buffer, qs)
+
+    def limites_iqr(self, factor: float = 1.5) -> tuple[float, float]:
+        q1, q3 = self.cuantiles([0.25, 0.75])
+        iqr = q3 - q1
+        return q1 - factor * iqr, q3 + factor * iqr
+
+
+# ==========================================================
+# HISTOGRAMA ADAPTATIVO
+# ==========================================================
+class HistogramaAdaptativo:
+    """
+    Histograma de ancho fijo que se arma con el rango del primer chunk.
+    Si llega un valor fuera de rango, se duplica el ancho de los bins
+    (fusionando pares de bins vecinos) hasta cubrirlo.
+    """
+
+    def __init__(self, bins: int = BINS_HISTOGRAMA):
+        self.bins = bins + bins % 2  # par, para poder fusionar de a dos
+        self.inicio: float | None = None
+        self.ancho: float | None = None
+        self.conteos = np.zeros(self.bins, dtype=np.int64)
+
+    def _fin(self) -> float:
+        return self.inicio + self.ancho * self.bins
+
+    def _duplicar(self, hacia_izquierda: bool):
+        fusion = self.conteos.reshape(-1, 2).sum(axis=1)
+        vacios = np.zeros(self.bins // 2, dtype=np.int64)
+        if hacia_izquierda:
+            self.inicio -= self.ancho * self.bins
+            self.conteos = np.concatenate([vacios, fusion])
+        else:
+            self.conteos = np.concatenate([fusion, vacios])
+        self.ancho *= 2
+
+    def agregar(self, valores: np.ndarray):
+        valores = valores[np.isfinite(valores)]
+        if valores.size == 0:
+            return
+        vmin, vmax = float(valores.min()), float(valores.max())
+        if self.inicio is None:
+            self.inicio = vmin
+            rango = vmax - vmin
+            self.ancho = rango / self.bins if rango > 0 else 1.0
+        while vmin < self.inicio or vmax > self._fin():
+            self._duplicar(hacia_izquierda=vmin < self.inicio)
+        idx = ((valores - self.inicio) / self.ancho).astype(np.int64)
+        np.clip(idx, 0, self.bins - 1, out=idx)
+        self.conteos += np.bincount(idx, minlength=self.bins)
+
+    def bordes(self) -> np.ndarray:
+        if self.inicio is None:
+            return np.empty(0)
+        return self.inicio + self.ancho * np.arange(self.bins + 1)
+
+
+# ==========================================================
+# MEDIANA Y MAD EN STREAMING
+# ==========================================================
+class SketchRobusto:
+    """
+    Mediana y MAD aproximadas (error <= `ancho`) con un histograma disperso
+    de bins de ancho fijo: agregar un valor es sumar 1 en un dict. Los
+    estadísticos se recalculan cada tanto (más seguido al principio), así
+    leerlos es O(1). La memoria depende del rango de valores, no de cuántos.
+    """
+
+    __slots__ = ("ancho", "conteos", "vistos", "mediana", "mad", "_pendientes")
+
+    def __init__(self, ancho: float = ANCHO_BIN_ROBUSTO):
+        self.ancho = ancho
+        self.conteos: dict[int, int] = {}
+        self.vistos = 0
+        self.mediana = math.nan
+        self.mad = math.nan
+        self._pendientes = 0
+
+    def agregar(self, valor: float):
+        if valor != valor:  # NaN
+            return
+        b = math.floor(valor / self.ancho)
+        self.conteos[b] = self.conteos.get(b, 0) + 1
+        self.vistos += 1
+        self._pendientes += 1
+        if self._pendientes >= min(max(1, self.vistos // 4), MAX_PENDIENTES_ROBUSTO):
+            self._recalcular()
+
+    def _recalcular(self):
+        if len(self.conteos) <= MAX_BINS_PYTHON:
+            # Pocos bins (lo común: precios estables): más rápido sin numpy
+            pares = sorted(((b + 0.5) * self.ancho, c) for b, c in self.conteos.items())
+            self.mediana = _mediana_de_pares(pares, self.vistos)
+            self.mad = _mediana_de_pares(sorted((abs(v - self.mediana), c) for v, c in pares), self.vistos)
+        else:
+            bins = np.fromiter(self.conteos, dtype=np.int64, count=len(self.conteos))
+            pesos = np.fromiter(self.conteos.values(), dtype=np.int64, count=len(self.conteos))
+            centros = (bins + 0.5) * self.ancho
+            self.mediana = _mediana_ponderada(centros, pesos)
+            self.mad = _mediana_ponderada(np.abs(centros - self.mediana), pesos)
+        self._pendientes = 0
+
+    def z_robusto(self, valor: float) -> float:
+        """(valor - mediana) / (1.4826 · MAD); la MAD nunca baja de `ancho`."""
+        return (valor - self.mediana) / (1.4826 * max(self.mad, self.ancho))
+
+
+def _mediana_ponderada(valores: np.ndarray, pesos: np.ndarray) -> float:
+    orden = np.argsort(valores)
+    acumulado = np.cumsum(pesos[orden])
+    return float(valores[orden][np.searchsorted(acumulado, acumulado[-1] / 2)])
+
+
+def _mediana_de_pares(pares: list[tuple[float, int]], total: int) -> float:
+    """Mediana ponderada de [(valor, peso)] ya ordenados por valor."""
+    acumulado, mitad = 0, total / 2
+    for valor, peso in pares:
+        acumulado += peso
+        if acumulado >= mitad:
+            return valor
+    return pares[-1][0]
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Caché en memoria de respuestas estáticas del dashboard.
+
+Las páginas informativas (/, /historia, /estructura) se renderizan UNA vez y
+se guardan ya comprimidas (gzip y, si está instalado el paquete 'brotli',
+también br). Las figuras de static/figuras se leen una vez y se vuelven a
+leer solo si el archivo cambia en disco (los scripts las regeneran).
+
+Cada variante lleva un ETag fuerte (hash del contenido + codificación): si el
+navegador manda If-None-Match con ese ETag se responde 304 sin cuerpo, así
+que una visita repetida cuesta una búsqueda en un diccionario.
+
+Las imágenes PNG ya vienen comprimidas: se sirven tal cual (gzip no las achica).
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import Response, request
+from werkzeug.exceptions import NotFound
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Páginas: el navegador las reusa unos minutos y después revalida con el ETag
+CACHE_PAGINAS = "public, max-age=300"
+# Figuras: cambian al re-ejecutar los modelos, siempre se revalidan (304 si no cambiaron)
+CACHE_FIGURAS = "public, no-cache"
+TIPOS_COMPRIMIBLES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+# Por debajo de este tamaño comprimir no compensa
+MIN_BYTES_COMPRESION = 256
+
+
+# ==========================================================
+# RECURSO PRE-COMPRIMIDO
+# ==========================================================
+class Recurso:
+    """Contenido fijo con sus variantes comprimidas y un ETag por variante."""
+
+    def __init__(self, contenido: bytes, tipo: str, cache_control: str):
+        self.tipo = tipo
+        self.cache_control = cache_control
+        base = hashlib.sha1(contenido).hexdigest()[:20]
+        # codificación -> (cuerpo, etag)
+        self.variantes = {"identity": (contenido, base)}
+        if len(contenido) >= MIN_BYTES_COMPRESION and tipo.startswith(TIPOS_COMPRIMIBLES):
+            self.variantes["gzip"] = (gzip.compress(contenido, 9, mtime=0), f"{base}-gz")
+            if brotli is not None:
+                self.variantes["br"] = (brotli.compress(contenido), f"{base}-br")
+        self.etags = {etag for _, etag in self.variantes.values()}
+
+    def _codificacion(self) -> str:
+        aceptadas = request.accept_encodings
+        for cod in ("br", "gzip"):
+            if cod in self.variantes and aceptadas.quality(cod) > 0:
+                return cod
+        return "identity"
+
+    def respuesta(self) -> Response:
+        cod = self._codificacion()
+        cuerpo, etag = self.variantes[cod]
+        # Cualquier variante vigente sirve para revalidar: el contenido es el mismo
+        if any(request.if_none_match.contains(e) for e in self.etags):
+            resp = Response(status=304)
+        else:
+            resp = Response(cuerpo, content_type=self.tipo)
+            if cod != "identity":
+                resp.headers["Content-Encoding"] = cod
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = self.cache_control
+        if len(self.variantes) > 1:
+            resp.headers["Vary"] = "Accept-Encoding"
+        return resp
+
+
+# ==========================================================
+# CACHÉ
+# ==========================================================
+class CacheEstatico:
+    def __init__(self):
+        self._paginas: dict[str, Recurso] = {}
+        # nombre -> ((mtime_ns, tamaño), Recurso)
+        self._archivos: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def pagina(self, clave: str, renderizar) -> Response:
+        """Sirve la página `clave`; la renderiza (una sola vez) si no está."""
+        recurso = self._paginas.get(clave)
+        if recurso is None:
+            with self._lock:
+                recurso = self._paginas.get(clave)
+                if recurso is None:
+                    html = renderizar()
+                    recurso = Recurso(html.encode("utf-8"), "text/html; charset=utf-8", CACHE_PAGINAS)
+                    self._paginas[clave] = recurso
+        return recurso.respuesta()
+
+    def archivo(self, carpeta: str, nombre: str) -> Response:
+        """Sirve carpeta/nombre desde memoria; lo relee si cambió en disco."""
+        ruta = safe_join(carpeta, nombre)
+        if ruta is None or not os.path.isfile(ruta):
+            raise NotFound()
+        st = os.stat(ruta)
+        firma = (st.st_mtime_ns, st.st_size)
+        entrada = self._archivos.get(ruta)
+        if entrada is None or entrada[0] != firma:
+            with open(ruta, "rb") as f:
+                contenido = f.read()
+            tipo = mimetypes.guess_type(ruta)[0] or "application/octet-stream"
+            entrada = (firma, Recurso(contenido, tipo, CACHE_FIGURAS))
+            self._archivos[ruta] = entrada
+        return entrada[1].respuesta()
+
+    def limpiar(self):
+        with self._lock:
+            self._paginas.clear()
+            self._archivos.clear()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Caché de la matriz de features en disco, memory-mapped.
+
+La primera vez se arma X / y con `preparar_datos` (dropna + get_dummies) y se
+guardan como arrays .npy contiguos en float32, junto a un manifiesto JSON con
+las columnas, la huella del CSV de origen y la del código que arma las
+features. Las siguientes ejecuciones abren los arrays con np.load(mmap_mode="r"):
+no se copian a RAM, y varios procesos que abran el mismo archivo comparten las
+mismas páginas del sistema operativo.
+
+Los archivos nuevos se escriben aparte y se cambian con os.replace (el
+manifiesto al final): un proceso que tenga mapeada la versión anterior la
+sigue leyendo entera, nunca ve una matriz a medio escribir.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CARPETA_CACHE = Path(__file__).resolve().parent / "cache"
+
+# Subir este número si cambia el formato de la caché (el código de las
+# features ya entra en la huella: ver huella_codigo)
+VERSION_FEATURES = 1
+
+
+# ==========================================================
+# MATRIZ EN DISCO
+# ==========================================================
+class MatrizFeatures:
+    """X e y abiertos en modo solo lectura (memmap) + nombres de columnas."""
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, columnas: list[str], manifiesto: dict):
+        self.X = X
+        self.y = y
+        self.columnas = list(columnas)
+        self.manifiesto = manifiesto
+
+    def indice(self, columna: str) -> int:
+        return self.columnas.index(columna)
+
+    def columna(self, nombre: str) -> np.ndarray:
+        """Vista (sin copia) de una columna de X."""
+        return self.X[:, self.indice(nombre)]
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.X.shape
+
+
+def _rutas(nombre: str, carpeta: Path) -> tuple[Path, Path, Path]:
+    return (
+        carpeta / f"{nombre}.X.npy",
+        carpeta / f"{nombre}.y.npy",
+        carpeta / f"{nombre}.json",
+    )
+
+
+def huella_archivo(ruta: str | Path) -> dict:
+    """Tamaño y fecha de modificación: alcanza para detectar un CSV regenerado."""
+    st = Path(ruta).stat()
+    return {"ruta": str(Path(ruta).resolve()), "bytes": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def huella_codigo(funcion) -> str:
+    """
+    sha1 del código fuente que arma las features: el módulo de `funcion` y,
+    si es parte de un paquete (p.ej. aurelion), todos los módulos del paquete.
+    """
+    modulo = sys.modules[funcion.__module__]
+    ruta = Path(modulo.__file__)
+    archivos = sorted(ruta.parent.glob("*.py")) if "." in funcion.__module__ else [ruta]
+    sha = hashlib.sha1()
+    for archivo in archivos:
+        sha.update(archivo.name.encode())
+        sha.update(archivo.read_bytes())
+    return sha.hexdigest()[:16]
+
+
+def _temporal(ruta: Path) -> Path:
+    return ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+
+
+def guardar_matriz(X, y, nombre: str, origen: str | Path | None = None,
+                   carpeta: Path = CARPETA_CACHE, codigo: str | None = None) -> MatrizFeatures:
+    """Persiste X (float32, C-contiguo) e y y devuelve la versión memory-mapped."""
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta_X, ruta_y, ruta_manifiesto = _rutas(nombre, carpeta)
+    tmp_X, tmp_y, tmp_manifiesto = _temporal(ruta_X), _temporal(ruta_y), _temporal(ruta_manifiesto)
+
+    columnas = [str(c) for c in getattr(X, "columns", range(np.shape(X)[1]))]
+    forma = np.shape(X)
+
+    # .npy en formato C-contiguo, listo para abrirse con mmap
+    destino = np.lib.format.open_memmap(tmp_X, mode="w+", dtype=np.float32, shape=forma)
+    destino[:] = np.asarray(X, dtype=np.float32)
+    destino.flush()
+    del destino
+    with open(tmp_y, "wb") as f:
+        np.save(f, np.ascontiguousarray(np.asarray(y)))
+
+    manifiesto = {
+        "version": VERSION_FEATURES,
+        "codigo": codigo,
+        "columnas": columnas,
+        "filas": int(forma[0]),
+        "dtype": "float32",
+        "origen": huella_archivo(origen) if origen is not None else None,
+    }
+    tmp_manifiesto.write_text(json.dumps(manifiesto, indent=2, ensure_ascii=False),
+                              encoding="utf-8")
+
+    # Sin manifiesto la caché no está vigente: mientras se cambian X e y
+    # nadie combina arrays nuevos con columnas viejas
+    ruta_manifiesto.unlink(missing_ok=True)
+    os.replace(tmp_X, ruta_X)
+    os.replace(tmp_y, ruta_y)
+    os.replace(tmp_manifiesto, ruta_manifiesto)
+    return abrir_matriz(nombre, carpeta)
+
+
+def abrir_matriz(nombre: str, carpeta: Path = CARPETA_CACHE) -> MatrizFeatures:
+    """Abre X e y sin copiarlos a memoria (mmap de solo lectura)."""
+    ruta_X, ruta_y, ruta_manifiesto = _rutas(nombre, carpeta)
+    manifiesto = json.loads(ruta_manifiesto.read_text(encoding="utf-8"))
+    X = np.load(ruta_X, mmap_mode="r")
+    y = np.load(ruta_y, mmap_mode="r")
+    return MatrizFeatures(X, y, manifiesto["columnas"], manifiesto)
+
+
+def matriz_en_memoria(X, y) -> MatrizFeatures:
+    """MatrizFeatures sin pasar por disco; la huella del contenido hace de versión."""
+    columnas = [str(c) for c in getattr(X, "columns", range(np.shape(X)[1]))]
+    valores_X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+    valores_y = np.ascontiguousarray(np.asarray(y))
+    huella = hashlib.sha1(valores_X.tobytes() + valores_y.tobytes()).hexdigest()
+    manifiesto = {
+        "version": VERSION_FEATURES,
+        "columnas": columnas,
+        "filas": int(valores_X.shape[0]),
+        "dtype": "float32",
+        "origen": {"memoria": huella},
+    }
+    return MatrizFeatures(valores_X, valores_y, columnas, manifiesto)
+
+
+def cache_vigente(nombre: str, origen: str | Path | None = None,
+                  carpeta: Path = CARPETA_CACHE, codigo: str | None = None) -> bool:
+    """True si la caché existe, es de esta versión y ni el origen ni el código cambiaron."""
+    ruta_X, ruta_y, ruta_manifiesto = _rutas(nombre, carpeta)
+    if not (ruta_X.is_file() and ruta_y.is_file() and ruta_manifiesto.is_file()):
+        return False
+    try:
+        manifiesto = json.loads(ruta_manifiesto.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    if manifiesto.get("version") != VERSION_FEATURES:
+        return False
+    if codigo is not None and manifiesto.get("codigo") != codigo:
+        return False
+    if origen is not None and manifiesto.get("origen") != huella_archivo(origen):
+        return False
+    return True
+
+
+# ==========================================================
+# PUNTO DE ENTRADA PARA LOS MODELOS
+# ==========================================================
+def obtener_matriz(ruta_csv: str | Path, preparar_datos, cargar_df=None,
+                   nombre: str | None = None,
+                   carpeta: Path = CARPETA_CACHE) -> MatrizFeatures:
+    """
+    Devuelve la matriz de features del CSV, desde la caché si sigue vigente.
+    Si no, carga el CSV (con `cargar_df()` si se pasa, o pd.read_csv), aplica
+    `preparar_datos(df) -> (X, y)` y la persiste.
+    """
+    ruta_csv = Path(ruta_csv)
+    nombre = nombre or ruta_csv.stem
+    codigo = huella_codigo(preparar_datos)
+    if cache_vigente(nombre, ruta_csv, carpeta, codigo):
+        print(f"⚡ Matriz de features desde caché: {carpeta / nombre}.X.npy")
+        return abrir_matriz(nombre, carpeta)
+
+    df = cargar_df() if cargar_df is not None else pd.read_csv(ruta_csv)
+    X, y = preparar_datos(df)
+    matriz = guardar_matriz(X, y, nombre, origen=ruta_csv, carpeta=carpeta, codigo=codigo)
+    print(f"💾 Matriz de features guardada en caché: {carpeta / nombre}.X.npy")
+    return matriz
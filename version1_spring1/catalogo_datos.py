@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Catálogo de datos del proyecto.
+
+Arma UNA vez un manifiesto nombre -> {ruta, columnas, dtypes, bytes, sha1}
+de todos los datasets (CSV / Excel) de la carpeta 'datos' y de los CSV que
+están junto a los scripts, y lo guarda en cache/catalogo.json.
+En los siguientes arranques se lee el manifiesto y solo se verifica la fecha
+de modificación de las carpetas registradas; resolver 'df_ventas_limpio' es
+una búsqueda en un diccionario, sin recorrer el árbol de directorios.
+
+Sobrescribir un archivo no cambia la fecha de su carpeta: los scripts que
+exportan datos llaman a registrar_archivo() para actualizar su entrada.
+
+Una carpeta con un archivo _particiones.json es UN dataset particionado
+(p.ej. df_ventas_limpio/2024-06.csv, ...): se registra con el nombre de la
+carpeta y sus archivos no aparecen como datasets sueltos.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from importacion_diferida import diferido
+
+# pandas se carga solo al leer o inspeccionar un dataset (pipeline no lo necesita)
+pd = diferido("pandas")
+
+BASE_DIR = Path(__file__).resolve().parent
+RUTA_MANIFIESTO = BASE_DIR / "cache" / "catalogo.json"
+EXTENSIONES = (".csv", ".xlsx", ".xls")
+MARCADOR_PARTICIONES = "_particiones.json"
+VERSION_CATALOGO = 2
+
+_CATALOGO = None
+
+
+# ==========================================================
+# LOCALIZAR CARPETA DE DATOS
+# ==========================================================
+def find_data_dir(start: Path | None = None, names=("datos", "data")) -> Path | None:
+    """Busca una carpeta llamada 'datos' o 'data' en el árbol de directorios."""
+    if start is None:
+        start = Path.cwd()
+    start = Path(start).resolve()
+    for parent in [start] + list(start.parents):
+        for n in names:
+            candidate = parent / n
+            if candidate.is_dir():
+                return candidate
+    return None
+
+
+# ==========================================================
+# CATÁLOGO
+# ==========================================================
+class CatalogoDatos:
+    """Manifiesto de datasets: nombre (stem del archivo) -> metadatos."""
+
+    def __init__(self, entradas: dict, directorios: dict, data_dir: str | None):
+        self.entradas = entradas
+        self.directorios = directorios
+        self.data_dir = Path(data_dir) if data_dir else None
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self.entradas
+
+    def nombres(self) -> list[str]:
+        return list(self.entradas)
+
+    def entrada(self, nombre: str) -> dict:
+        try:
+            return self.entradas[nombre]
+        except KeyError:
+            raise FileNotFoundError(
+                f"El dataset '{nombre}' no está en el catálogo de datos."
+            ) from None
+
+    def ruta(self, nombre: str) -> Path:
+        return Path(self.entrada(nombre)["ruta"])
+
+    def vigente(self) -> bool:
+        """True si ninguna carpeta registrada cambió desde que se armó."""
+        for carpeta, mtime in self.directorios.items():
+            try:
+                if Path(carpeta).stat().st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def a_dict(self) -> dict:
+        return {
+            "version": VERSION_CATALOGO,
+            "data_dir": str(self.data_dir) if self.data_dir else None,
+            "directorios": self.directorios,
+            "entradas": self.entradas,
+        }
+
+
+def _sha1(ruta: Path, bloque: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for parte in iter(lambda: f.read(bloque), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def es_particionado(ruta: Path) -> bool:
+    return ruta.is_dir() and (ruta / MARCADOR_PARTICIONES).is_file()
+
+
+def archivos_particiones(ruta: Path) -> list[Path]:
+    return sorted(ruta.glob("*.csv"))
+
+
+def _esquema(ruta: Path) -> dict | None:
+    """Columnas y dtypes inferidos de las primeras filas."""
+    try:
+        if ruta.is_dir():
+            partes = archivos_particiones(ruta)
+            muestra = pd.read_csv(partes[0], nrows=1000) if partes else pd.DataFrame()
+        elif ruta.suffix.lower() == ".csv":
+            muestra = pd.read_csv(ruta, nrows=1000)
+        else:
+            muestra = pd.read_excel(ruta, nrows=1000)
+    except Exception:
+        return None
+    return {str(c): str(t) for c, t in muestra.dtypes.items()}
+
+
+def _describir(ruta: Path) -> dict:
+    if es_particionado(ruta):
+        # El marcador se reescribe en cada exportación: su hash identifica la versión
+        marcador = ruta / MARCADOR_PARTICIONES
+        return {
+            "ruta": str(ruta),
+            "formato": "particionado",
+            "bytes": sum(p.stat().st_size for p in archivos_particiones(ruta)),
+            "mtime_ns": marcador.stat().st_mtime_ns,
+            "sha1": _sha1(marcador),
+            "esquema": _esquema(ruta),
+        }
+    st = ruta.stat()
+    return {
+        "ruta": str(ruta),
+        "formato": ruta.suffix.lower().lstrip("."),
+        "bytes": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha1": _sha1(ruta),
+        "esquema": _esquema(ruta),
+    }
+
+
+def construir_catalogo(data_dir: Path | None = None, extra: list[Path] | None = None) -> CatalogoDatos:
+    """
+    Recorre la carpeta de datos (recursivo) y las carpetas `extra` (solo su
+    primer nivel). Si dos archivos tienen el mismo nombre gana el primero.
+    """
+    if data_dir is None:
+        data_dir = find_data_dir(BASE_DIR)
+    if extra is None:
+        extra = [BASE_DIR]
+
+    archivos: list[Path] = []
+    directorios: dict[str, int] = {}
+    if data_dir is not None:
+        particionadas: list[Path] = []
+        for carpeta in [data_dir] + sorted(p for p in data_dir.rglob("*") if p.is_dir()):
+            if any(carpeta.is_relative_to(p) for p in particionadas):
+                continue
+            directorios[str(carpeta)] = carpeta.stat().st_mtime_ns
+            if es_particionado(carpeta):
+                # Ya la agregó la carpeta padre como un solo dataset
+                particionadas.append(carpeta)
+                continue
+            archivos += sorted(p for p in carpeta.iterdir()
+                               if p.suffix.lower() in EXTENSIONES or es_particionado(p))
+    for carpeta in extra:
+        if carpeta.is_dir():
+            directorios[str(carpeta)] = carpeta.stat().st_mtime_ns
+            archivos += sorted(p for p in carpeta.iterdir() if p.suffix.lower() in EXTENSIONES)
+
+    entradas = {}
+    for ruta in archivos:
+        nombre = ruta.name if ruta.is_dir() else ruta.stem
+        if (ruta.is_file() or es_particionado(ruta)) and nombre not in entradas:
+            entradas[nombre] = _describir(ruta)
+    return CatalogoDatos(entradas, directorios, str(data_dir) if data_dir else None)
+
+
+def guardar_catalogo(catalogo: CatalogoDatos, ruta: Path = RUTA_MANIFIESTO):
+    """Escribe aparte y reemplaza: etapas en paralelo nunca leen un JSON a medias."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    temporal.write_text(json.dumps(catalogo.a_dict(), indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporal, ruta)
+
+
+def cargar_catalogo(ruta: Path = RUTA_MANIFIESTO) -> CatalogoDatos | None:
+    try:
+        datos = json.loads(ruta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if datos.get("version") != VERSION_CATALOGO:
+        return None
+    return CatalogoDatos(datos["entradas"], datos["directorios"], datos.get("data_dir"))
+
+
+def obtener_catalogo(refrescar: bool = False) -> CatalogoDatos:
+    """Catálogo en memoria; si no, el manifiesto en disco; si no, lo construye."""
+    global _CATALOGO
+    if _CATALOGO is not None and not refrescar:
+        return _CATALOGO
+    catalogo = None if refrescar else cargar_catalogo()
+    if catalogo is None or not catalogo.vigente():
+        catalogo = construir_catalogo()
+        guardar_catalogo(catalogo)
+    _CATALOGO = catalogo
+    return catalogo
+
+
+# ==========================================================
+# ACCESOS DIRECTOS
+# ==========================================================
+def data_dir() -> Path | None:
+    return obtener_catalogo().data_dir
+
+
+def ruta_dataset(nombre: str) -> Path:
+    """Ruta del dataset; si el archivo desapareció, reconstruye el catálogo una vez."""
+    ruta = obtener_catalogo().ruta(nombre)
+    if not (ruta.is_file() or es_particionado(ruta)):
+        ruta = obtener_catalogo(refrescar=True).ruta(nombre)
+    return ruta
+
+
+def registrar_archivo(ruta: str | Path) -> dict:
+    """Agrega o actualiza (tamaño, hash, esquema) la entrada de un archivo (o carpeta particionada) recién escrito."""
+    catalogo = obtener_catalogo()
+    ruta = Path(ruta).resolve()
+    entrada = _describir(ruta)
+    catalogo.entradas[ruta.name if ruta.is_dir() else ruta.stem] = entrada
+    for carpeta in (ruta.parent, ruta):
+        if str(carpeta) in catalogo.directorios:
+            catalogo.directorios[str(carpeta)] = carpeta.stat().st_mtime_ns
+    guardar_catalogo(catalogo)
+    return entrada
+
+
+def leer_dataset(nombre: str, **kwargs) -> "pd.DataFrame":
+    """Lee un dataset del catálogo (CSV, Excel o carpeta particionada) por su nombre."""
+    ruta = ruta_dataset(nombre)
+    if ruta.is_dir():
+        partes = [pd.read_csv(p, **kwargs) for p in archivos_particiones(ruta)]
+        return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+    if ruta.suffix.lower() == ".csv":
+        return pd.read_csv(ruta, **kwargs)
+    return pd.read_excel(ruta, **kwargs)
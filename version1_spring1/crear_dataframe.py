@@ -1,128 +1,129 @@
+import hashlib
+import json
+import sys
+
 import pandas as pd
 from pathlib import Path
 
+from aurelion.clientes import rfm_al_momento
+from aurelion.features import agregar_tickets, dataframe_modelo, umbral_ticket_alto
+from aurelion.integridad import verificar_integridad
+from cache_features import CARPETA_CACHE, huella_archivo
+from catalogo_datos import leer_dataset, registrar_archivo
+from modelo_datos import leer_tabla, rutas_tabla
+from integridad_referencial import imprimir_integridad
+from intercambio import guardar_csv_e_intercambio
+
 # =========================================
 # FUNCIONES AUXILIARES
 # =========================================
 
 def cargar_csv_con_busqueda(nombre_archivo: str) -> pd.DataFrame:
     """
-    Intenta cargar un CSV probando varias rutas relativas a la ubicación de ML.py.
-    Imprime qué archivo termina usando o qué errores encuentra.
+    Carga un CSV resolviendo su ruta con el catálogo de datos
+    (búsqueda en el manifiesto, sin probar rutas una por una).
     """
-    script_dir = Path(__file__).resolve().parent
-    print(f"\n🔎 Buscando {nombre_archivo}...")
-
-    # Rutas candidatas (ajusta si usás otra estructura)
-    candidatos = [
-        script_dir / nombre_archivo,
-        script_dir / "limpios" / nombre_archivo,
-        script_dir / "datos" / "limpios" / nombre_archivo,
-        script_dir / "data" / "limpios" / nombre_archivo,
-        script_dir / "datos" / nombre_archivo,
-        script_dir / "data" / nombre_archivo,
-    ]
-
-    for ruta in candidatos:
-        print(f"  - Probando: {ruta}")
-        if ruta.is_file():
-            print(f"✅ Encontrado: {ruta}")
-            return pd.read_csv(ruta)
-
-    raise FileNotFoundError(
-        f"No se encontró {nombre_archivo} en ninguna de las rutas probadas.\n"
-        f"Ubicación de ML.py: {script_dir}"
-    )
+    return leer_dataset(Path(nombre_archivo).stem)
+
+
+CARPETA_TICKETS = CARPETA_CACHE / "tickets"
 
 
 # =========================================
 # 1) CARGA DE DATASETS
 # =========================================
 
-def cargar_datasets_ml():
+def tickets_incrementales(desde=None, hasta=None):
+    """
+    Tickets a partir del detalle particionado por mes. Cada partición se
+    agrega una sola vez y queda en cache/tickets; solo se recalculan los
+    meses cuyo archivo cambió. Como el detalle se particiona por la fecha de
+    su venta, un ticket nunca queda repartido entre dos particiones.
+    """
+    CARPETA_TICKETS.mkdir(parents=True, exist_ok=True)
+    partes, recalculadas = [], 0
+    rutas = rutas_tabla("detalle_ventas", desde, hasta)
+    for ruta in rutas:
+        huella = json.dumps(huella_archivo(ruta), sort_keys=True).encode()
+        cache = CARPETA_TICKETS / f"{ruta.stem}_{hashlib.sha1(huella).hexdigest()[:12]}.pkl"
+        if cache.is_file():
+            partes.append(pd.read_pickle(cache))
+            continue
+        for vieja in CARPETA_TICKETS.glob(f"{ruta.stem}_*.pkl"):
+            vieja.unlink()
+        parte = agregar_tickets(
+            pd.read_csv(ruta, usecols=["id_venta", "id_producto", "cantidad", "importe"])
+        )
+        parte.to_pickle(cache)
+        partes.append(parte)
+        recalculadas += 1
+    print(f"🧾 Tickets: {len(rutas)} particiones ({recalculadas} recalculadas)")
+    if not partes:
+        return agregar_tickets(pd.DataFrame(columns=["id_venta", "id_producto", "cantidad", "importe"]))
+    return pd.concat(partes, ignore_index=True).sort_values("id_venta", ignore_index=True)
+
+
+def cargar_datasets_ml(desde=None, hasta=None):
     print("=========================================")
     print("   INICIO ML.py")
     print("=========================================")
     script_dir = Path(__file__).resolve().parent
     print(f"📂 Carpeta donde está ML.py: {script_dir}")
 
-    df_clientes = cargar_csv_con_busqueda("df_clientes_limpio.csv")
-    df_ventas = cargar_csv_con_busqueda("df_ventas_limpio.csv")
-    df_detalle = cargar_csv_con_busqueda("df_detalle_ventas_limpio.csv")
+    # Tablas normalizadas: solo las columnas que usa el modelo, y de ventas /
+    # detalle solo los meses pedidos
+    df_clientes = leer_tabla("clientes", ["id_cliente", "ciudad", "fecha_alta"])
+    df_ventas = leer_tabla("ventas", ["id_venta", "fecha", "id_cliente", "medio_pago"],
+                           desde=desde, hasta=hasta)
+    df_ticket = tickets_incrementales(desde, hasta)
 
     print("\nTamaños de los dataframes cargados:")
     print("  Clientes:", df_clientes.shape)
     print("  Ventas  :", df_ventas.shape)
-    print("  Detalle :", df_detalle.shape)
+    print("  Tickets :", df_ticket.shape)
 
-    return df_clientes, df_ventas, df_detalle
+    return df_clientes, df_ventas, df_ticket
 
 
 # =========================================
 # 2) CONSTRUIR DATAFRAME NIVEL VENTA
 # =========================================
 
-def construir_df_modelo(df_clientes, df_ventas, df_detalle):
+def construir_df_modelo(df_clientes, df_ventas, df_detalle=None, df_ticket=None,
+                        historial=None):
+    """
+    Con `df_ticket` (tickets ya agregados) no hace falta el detalle.
+    `historial`: (ventas, tickets) con toda la historia de compras para el
+    RFM; si no se pasa, se usan estas mismas ventas y tickets.
+    """
     print("\n=========================================")
     print("   CONSTRUYENDO DATAFRAME df_modelo")
     print("=========================================")
 
-    # Aseguramos tipos numéricos
-    df_detalle["importe"] = pd.to_numeric(df_detalle["importe"], errors="coerce").fillna(0)
-    df_detalle["cantidad"] = pd.to_numeric(df_detalle["cantidad"], errors="coerce").fillna(0)
+    # Los merges son 'left': una clave huérfana deja NaN en ciudad / fecha_alta.
+    # Se avisa antes de unir para que no pase en silencio.
+    print("\n🔗 Integridad referencial:")
+    imprimir_integridad(verificar_integridad({
+        "clientes": df_clientes,
+        "ventas": df_ventas,
+        "detalle_ventas": df_detalle if df_ticket is None else df_ticket,
+    }))
 
     # --- Agregamos por id_venta (ticket) ---
-    df_ticket = (
-        df_detalle
-        .groupby("id_venta")
-        .agg(
-            ticket_total=("importe", "sum"),            # suma del importe del ticket
-            num_items=("cantidad", "sum"),             # total de unidades compradas
-            num_lineas=("id_producto", "size"),        # cantidad de líneas del ticket
-            num_unique_products=("id_producto", "nunique")  # productos distintos
-        )
-        .reset_index()
-    )
-
+    if df_ticket is None:
+        df_ticket = agregar_tickets(df_detalle)
     print("✔ Ticket (nivel venta) generado. Tamaño:", df_ticket.shape)
 
-    # --- Unimos con ventas ---
-    columnas_ventas = ["id_venta", "id_cliente", "fecha"]
-    if "medio_pago" in df_ventas.columns:
-        columnas_ventas.append("medio_pago")
-
-    df_ventas_sel = df_ventas[columnas_ventas].copy()
-    df_modelo = df_ticket.merge(df_ventas_sel, on="id_venta", how="left")
-    print("✔ Merge con ventas. Tamaño actual:", df_modelo.shape)
-
-    # --- Unimos con clientes ---
-    columnas_clientes = ["id_cliente", "ciudad"]
-    if "fecha_alta" in df_clientes.columns:
-        columnas_clientes.append("fecha_alta")
-
-    df_clientes_sel = df_clientes[columnas_clientes].copy()
-    df_modelo = df_modelo.merge(df_clientes_sel, on="id_cliente", how="left")
-    print("✔ Merge con clientes. Tamaño actual:", df_modelo.shape)
-
-    # --- Fechas y features de tiempo ---
-    df_modelo["fecha"] = pd.to_datetime(df_modelo["fecha"], errors="coerce")
-
-    if "fecha_alta" in df_modelo.columns:
-        df_modelo["fecha_alta"] = pd.to_datetime(df_modelo["fecha_alta"], errors="coerce")
-        df_modelo["antiguedad_cliente_dias"] = (
-            df_modelo["fecha"] - df_modelo["fecha_alta"]
-        ).dt.days
-    else:
-        df_modelo["antiguedad_cliente_dias"] = pd.NA
-
-    df_modelo["mes"] = df_modelo["fecha"].dt.month
-    df_modelo["dia_semana"] = df_modelo["fecha"].dt.weekday  # 0=lunes, 6=domingo
+    # --- Merges, features de tiempo y objetivo (aurelion.features) ---
+    df_modelo = dataframe_modelo(df_clientes, df_ventas, df_ticket)
+    print("✔ Merge con ventas y clientes. Tamaño actual:", df_modelo.shape)
 
-    # --- Variable objetivo: ticket_alto (p75) ---
-    umbral_75 = df_modelo["ticket_total"].quantile(0.75)
-    print(f"\nUmbral para 'ticket_alto' (percentil 75): {umbral_75:.2f}")
+    # --- Historia del cliente (RFM) al día de cada ticket: join as-of, sin fuga ---
+    ventas_historial, tickets_historial = historial or (df_ventas, df_ticket)
+    df_modelo = rfm_al_momento(df_modelo, ventas_historial, tickets_historial)
+    print("✔ Features RFM de cliente (as-of) agregadas. Tamaño actual:", df_modelo.shape)
 
-    df_modelo["ticket_alto"] = (df_modelo["ticket_total"] >= umbral_75).astype(int)
+    print(f"\nUmbral para 'ticket_alto' (percentil 75): {umbral_ticket_alto(df_modelo['ticket_total']):.2f}")
 
     print("\nDistribución de 'ticket_alto' (0 = normal, 1 = alto):")
     print(df_modelo["ticket_alto"].value_counts(normalize=True))
@@ -134,10 +135,17 @@ def construir_df_modelo(df_clientes, df_ventas, df_detalle):
 # 3) MAIN
 # =========================================
 
-def main():
+def main(desde=None, hasta=None) -> bool:
+    """Devuelve False si algo falló (el script sale con código 1)."""
     try:
-        df_clientes, df_ventas, df_detalle = cargar_datasets_ml()
-        df_modelo = construir_df_modelo(df_clientes, df_ventas, df_detalle)
+        df_clientes, df_ventas, df_ticket = cargar_datasets_ml(desde, hasta)
+        # El RFM usa toda la historia hasta `hasta`, aunque el período empiece en `desde`
+        historial = None
+        if desde is not None:
+            historial = (leer_tabla("ventas", ["id_venta", "fecha", "id_cliente"], hasta=hasta),
+                         tickets_incrementales(None, hasta))
+        df_modelo = construir_df_modelo(df_clientes, df_ventas, df_ticket=df_ticket,
+                                        historial=historial)
 
         print("\n=========================================")
         print("   PRIMERAS FILAS DEL DATAFRAME FINAL")
@@ -147,15 +155,28 @@ def main():
         # Guardamos el dataframe final en la misma carpeta de ML.py
         script_dir = Path(__file__).resolve().parent
         salida = script_dir / "df_modelo_ticket_alto.csv"
-        df_modelo.to_csv(salida, index=False)
+        # CSV de referencia + copia columnar que abren sin parsear las etapas siguientes
+        intercambio = guardar_csv_e_intercambio(df_modelo, salida)
+        registrar_archivo(salida)
         print(f"\n✅ Archivo guardado en: {salida}")
+        print(f"⚡ Intercambio para las etapas siguientes: {intercambio}")
+        return True
 
     except Exception as e:
         print("\n❌ OCURRIÓ UN ERROR EN ML.py")
         print(type(e).__name__, ":", e)
+        return False
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Construye df_modelo_ticket_alto.csv")
+    parser.add_argument("--desde", help="Primer mes a incluir (AAAA-MM)")
+    parser.add_argument("--hasta", help="Último mes a incluir (AAAA-MM)")
+    args = parser.parse_args()
+    # Código de salida != 0: pipeline.py no marca la etapa como hecha
+    if not main(args.desde, args.hasta):
+        sys.exit(1)
 
 
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Almacén de features de cliente (RFM) mantenido en forma incremental.
+
+Cada mes de ventas / detalle (una partición) se agrega por cliente una sola
+vez y queda en cache/features_clientes; solo se recalculan los meses cuyos
+archivos cambiaron. Con esos agregados se arman las matrices densas de
+aurelion.clientes.FeaturesClientes, que resuelven las features de cada
+ticket en O(1).
+
+Las features de un cliente necesitan toda su historia: por eso se leen
+todos los meses hasta `hasta`, aunque el modelo use solo un período.
+
+    python features_clientes.py [--hasta AAAA-MM]    # resumen por cliente
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from aurelion.clientes import FeaturesClientes, agregar_mes
+from aurelion.features import agregar_tickets
+from cache_features import CARPETA_CACHE, huella_archivo
+from catalogo_datos import es_particionado
+from modelo_datos import SIN_FECHA, leer_tabla, ruta_tabla, rutas_tabla
+
+CARPETA_FEATURES_CLIENTES = CARPETA_CACHE / "features_clientes"
+COLUMNAS_AGREGADO = ["id_cliente", "compras", "gasto", "unidades", "ultima"]
+
+
+def _clave(*rutas) -> str:
+    huellas = json.dumps([huella_archivo(r) for r in rutas], sort_keys=True).encode()
+    return hashlib.sha1(huellas).hexdigest()[:12]
+
+
+def _agregar_particion(ruta_ventas, ruta_detalle) -> pd.DataFrame:
+    ventas = pd.read_csv(ruta_ventas, usecols=["id_venta", "id_cliente", "fecha"],
+                         encoding="utf-8-sig")
+    if ruta_detalle is not None:
+        detalle = pd.read_csv(ruta_detalle, usecols=["id_venta", "id_producto", "cantidad", "importe"],
+                              encoding="utf-8-sig")
+    else:
+        detalle = pd.DataFrame(columns=["id_venta", "id_producto", "cantidad", "importe"])
+    return agregar_mes(ventas, agregar_tickets(detalle))
+
+
+def _guardar_agregado(agregado: pd.DataFrame, ruta):
+    """Escribe aparte y reemplaza: otra corrida nunca lee un .npz a medias."""
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(temporal, "wb") as archivo:
+        np.savez(archivo, **{c: agregado[c].to_numpy() for c in COLUMNAS_AGREGADO})
+    os.replace(temporal, ruta)
+
+
+def features_incrementales(hasta=None) -> FeaturesClientes:
+    """Almacén RFM con todos los meses hasta `hasta` ('AAAA-MM'), desde la caché."""
+    if not (es_particionado(ruta_tabla("ventas")) and es_particionado(ruta_tabla("detalle_ventas"))):
+        # Tablas sin particionar: no hay meses que reusar, se agrega todo en memoria
+        ventas = leer_tabla("ventas", ["id_venta", "id_cliente", "fecha"])
+        if hasta is not None:
+            ventas = ventas[pd.to_datetime(ventas["fecha"], errors="coerce").dt.to_period("M")
+                            <= pd.Period(hasta, freq="M")]
+        detalle = leer_tabla("detalle_ventas", ["id_venta", "id_producto", "cantidad", "importe"])
+        return FeaturesClientes.desde_tablas(ventas, agregar_tickets(detalle))
+
+    rutas_ventas = rutas_tabla("ventas", hasta=hasta)
+    rutas_detalle = {r.stem: r for r in rutas_tabla("detalle_ventas", hasta=hasta)}
+    CARPETA_FEATURES_CLIENTES.mkdir(parents=True, exist_ok=True)
+    agregados, recalculados = {}, 0
+    for ruta in rutas_ventas:
+        mes = ruta.stem
+        if mes == SIN_FECHA:
+            continue  # sin fecha no se puede ubicar en la historia
+        ruta_detalle = rutas_detalle.get(mes)
+        rutas = [ruta] + ([ruta_detalle] if ruta_detalle is not None else [])
+        cache = CARPETA_FEATURES_CLIENTES / f"{mes}_{_clave(*rutas)}.npz"
+        if cache.is_file():
+            with np.load(cache) as datos:
+                agregados[mes] = pd.DataFrame({c: datos[c] for c in COLUMNAS_AGREGADO})
+            continue
+        for vieja in CARPETA_FEATURES_CLIENTES.glob(f"{mes}_*.npz"):
+            vieja.unlink()
+        agregado = _agregar_particion(ruta, ruta_detalle)
+        _guardar_agregado(agregado, cache)
+        agregados[mes] = agregado
+        recalculados += 1
+
+    print(f"👥 Features de clientes: {len(agregados)} meses ({recalculados} recalculados)")
+    return FeaturesClientes.desde_meses(agregados)
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def imprimir_resumen(features: FeaturesClientes, top: int = 10):
+    """Clientes con más gasto acumulado y sus features RFM (para el dashboard)."""
+    tabla = features.al_cierre().sort_values("rfm_monto", ascending=False)
+    print(f"\n👥 {len(tabla)} clientes con compras en {len(features.meses)} meses "
+          f"({features.meses[0] if features.meses else '-'} a {features.meses[-1] if features.meses else '-'})")
+    print(f"\n🏆 Top {top} clientes por gasto acumulado:")
+    print(tabla.head(top).to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+    print("\n📊 Distribución de las features RFM:")
+    print(tabla.drop(columns="id_cliente").describe().transpose().round(2).to_string())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Features RFM por cliente")
+    parser.add_argument("--hasta", help="Último mes a incluir (AAAA-MM)")
+    args = parser.parse_args()
+    imprimir_resumen(features_incrementales(args.hasta))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Guardado de figuras para la web.
+
+guardar_figura() reemplaza a plt.savefig + plt.close en los scripts:
+- renderiza la figura actual con un DPI configurable (AURELION_DPI_FIGURAS),
+- la optimiza como PNG de paleta (256 colores: los gráficos tienen pocos
+  colores y pesan varias veces menos que el PNG RGBA de matplotlib),
+- y genera una miniatura WebP en static/figuras/miniaturas.
+
+Las páginas muestran las miniaturas (con loading="lazy") y cada una enlaza a
+la figura completa, que se descarga solo si el usuario la abre.
+"""
+
+import io
+import os
+from pathlib import Path
+
+from importacion_diferida import diferido
+
+# El servidor solo arma galerías: pyplot y Pillow se cargan al guardar o abrir imágenes
+plt = diferido("matplotlib.pyplot")
+Image = diferido("PIL.Image")
+
+CARPETA_FIGURAS = Path(__file__).resolve().parent / "static" / "figuras"
+CARPETA_MINIATURAS = CARPETA_FIGURAS / "miniaturas"
+
+DPI_FIGURAS = int(os.environ.get("AURELION_DPI_FIGURAS", "100"))
+COLORES_PALETA = 256
+ANCHO_MINIATURA = 360
+CALIDAD_WEBP = 80
+
+
+# ==========================================================
+# OPTIMIZACIÓN
+# ==========================================================
+def _a_rgb(img: "Image.Image") -> "Image.Image":
+    """Aplana la transparencia sobre fondo blanco (el fondo de la página)."""
+    if img.mode in ("RGBA", "LA", "P"):
+        img = img.convert("RGBA")
+        fondo = Image.new("RGB", img.size, "white")
+        fondo.paste(img, mask=img.getchannel("A"))
+        return fondo
+    return img.convert("RGB")
+
+
+def _escribir_si_cambio(ruta: Path, contenido: bytes):
+    # Sin reescribir si el resultado es idéntico: el mtime no cambia y la
+    # caché del servidor sigue sirviendo la versión que ya tiene
+    if ruta.exists() and ruta.read_bytes() == contenido:
+        return
+    ruta.write_bytes(contenido)
+
+
+def ruta_miniatura(ruta_figura: Path) -> Path:
+    return CARPETA_MINIATURAS / (Path(ruta_figura).stem + ".webp")
+
+
+def crear_miniatura(ruta_figura: Path, img: "Image.Image | None" = None) -> Path:
+    """Miniatura WebP de una figura (abre el PNG si no se pasa la imagen)."""
+    destino = ruta_miniatura(ruta_figura)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    if img is None:
+        with Image.open(ruta_figura) as original:
+            img = _a_rgb(original)
+    mini = img.copy()
+    mini.thumbnail((ANCHO_MINIATURA, ANCHO_MINIATURA * 4), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    mini.save(buffer, format="WEBP", quality=CALIDAD_WEBP, method=6)
+    destino.write_bytes(buffer.getvalue())
+    return destino
+
+
+def tamanio_imagen(ruta) -> tuple[int, int]:
+    """(ancho, alto) leyendo solo el encabezado del archivo."""
+    with Image.open(ruta) as img:
+        return img.size
+
+
+def asegurar_miniatura(ruta_figura: Path) -> Path:
+    """Crea la miniatura si falta o si la figura es más nueva."""
+    destino = ruta_miniatura(ruta_figura)
+    if not destino.exists() or destino.stat().st_mtime_ns < Path(ruta_figura).stat().st_mtime_ns:
+        crear_miniatura(ruta_figura)
+    return destino
+
+
+# ==========================================================
+# GUARDADO
+# ==========================================================
+def guardar_figura(ruta, fig=None, dpi: int | None = None) -> Path:
+    """
+    Guarda `fig` (o la figura actual) como PNG de paleta en `ruta`, genera su
+    miniatura y cierra la figura.
+    """
+    ruta = Path(ruta)
+    fig = fig or plt.gcf()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi or DPI_FIGURAS, bbox_inches="tight")
+    plt.close(fig)
+
+    buffer.seek(0)
+    with Image.open(buffer) as original:
+        img = _a_rgb(original)
+    paleta = img.quantize(colors=COLORES_PALETA, method=Image.Quantize.MEDIANCUT)
+    salida = io.BytesIO()
+    paleta.save(salida, format="PNG", optimize=True)
+
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    _escribir_si_cambio(ruta, salida.getvalue())
+    crear_miniatura(ruta, img)
+    return ruta
+
+
+def borrar_figuras(patron: str):
+    """Borra las figuras que cumplen `patron` y sus miniaturas."""
+    for f in CARPETA_FIGURAS.glob(patron):
+        for ruta in (f, ruta_miniatura(f)):
+            try:
+                ruta.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Corre todas las etapas en memoria (aurelion.flujo): origen -> limpieza ->
+df_modelo -> aumento -> modelos, sin escribir ni releer CSV intermedios.
+
+    python flujo_en_memoria.py
+"""
+
+from pathlib import Path
+
+from aurelion.flujo import ejecutar
+from aurelion.limpieza import ARCHIVOS_ORIGEN
+from catalogo_datos import leer_dataset
+
+
+def main():
+    print("--- 🧪 FLUJO COMPLETO EN MEMORIA ---")
+    origen = {t: leer_dataset(Path(a).stem) for t, a in ARCHIVOS_ORIGEN.items()}
+    salida = ejecutar(origen)
+    for nombre, res in salida["limpieza"].items():
+        print(f"🧹 {nombre}: {len(res.limpio)} filas limpias, {len(res.rechazadas)} rechazadas")
+    print(f"🧾 df_modelo: {salida['df_modelo'].shape}, aumentado: {salida['df_aumentado'].shape}")
+    for dataset, resultados in salida["modelos"].items():
+        for res in resultados.values():
+            print(f"🤖 {dataset:<10} {res.nombre:<10} accuracy={res.accuracy:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Superficies de frontera de decisión precalculadas y cacheadas.
+
+- El modelo de 2 features (regresión logística) se entrena una sola vez por
+  versión de la matriz de features y queda guardado en cache/modelos.
+- La superficie se evalúa con decision_function en UNA pasada vectorizada
+  sobre toda la malla y se guarda en cache/fronteras, con clave
+  (versión del modelo, par de features, resolución).
+- superficies() calcula varios pares de features en paralelo.
+- De cada par se conservan solo las MAX_VERSIONES usadas más recientemente
+  (al escribir una nueva se borran las demás), así la caché no crece con
+  cada CSV regenerado.
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+from cache_features import CARPETA_CACHE, MatrizFeatures
+
+RESOLUCION = 200
+MARGEN = 1.0
+CARPETA_MODELOS = CARPETA_CACHE / "modelos"
+CARPETA_FRONTERAS = CARPETA_CACHE / "fronteras"
+# Versiones por par: alcanza para alternar entre la matriz original y la aumentada
+MAX_VERSIONES = 4
+
+
+# ==========================================================
+# SUPERFICIE
+# ==========================================================
+class Superficie:
+    """Ejes de la malla (1-D) y valores de decision_function (res_y x res_x)."""
+
+    def __init__(self, eje_x: np.ndarray, eje_y: np.ndarray, Z: np.ndarray, version: str):
+        self.eje_x = eje_x
+        self.eje_y = eje_y
+        self.Z = Z
+        self.version = version
+
+    def clases(self) -> np.ndarray:
+        """Clase predicha en cada punto (equivale a model.predict)."""
+        return (self.Z > 0).astype(int)
+
+
+def _huella(*partes) -> str:
+    return hashlib.sha1(json.dumps(partes, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def _usar(ruta: Path):
+    """Marca el archivo como usado recién (orden para podar)."""
+    try:
+        os.utime(ruta)
+    except OSError:
+        pass
+
+
+def _podar(carpeta: Path, prefijo: str, extension: str, maximo: int = MAX_VERSIONES):
+    """
+    Deja solo las `maximo` versiones usadas más recientemente de
+    prefijo + <huella> + extension. La huella tiene que ser hexadecimal, así
+    no se confunden pares cuyos nombres empiezan igual.
+    """
+    patron = re.compile(re.escape(prefijo) + r"[0-9a-f]+" + re.escape(extension))
+    versiones = []
+    for ruta in carpeta.iterdir():
+        if patron.fullmatch(ruta.name):
+            try:
+                versiones.append((ruta.stat().st_mtime_ns, ruta))
+            except OSError:
+                continue
+    for _, ruta in sorted(versiones, reverse=True)[maximo:]:
+        ruta.unlink(missing_ok=True)
+
+
+def version_modelo(modelo: LogisticRegression) -> str:
+    """Huella de los coeficientes: cambia solo si el modelo cambia."""
+    h = hashlib.sha1()
+    for arr in (modelo.coef_, modelo.intercept_, modelo.classes_):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    return h.hexdigest()[:12]
+
+
+# ==========================================================
+# MODELO PERSISTIDO
+# ==========================================================
+def modelo_par(matriz: MatrizFeatures, feature_x: str, feature_y: str,
+               carpeta: Path = CARPETA_MODELOS) -> LogisticRegression:
+    """Devuelve la regresión logística de 2 features, entrenándola solo si no existe."""
+    clave = _huella(matriz.manifiesto, feature_x, feature_y)
+    prefijo = f"logistica_{feature_x}_{feature_y}_"
+    ruta = carpeta / f"{prefijo}{clave}.joblib"
+    if ruta.is_file():
+        _usar(ruta)
+        return joblib.load(ruta)
+
+    X_par = matriz.X[:, [matriz.indice(feature_x), matriz.indice(feature_y)]]
+    modelo = LogisticRegression()
+    modelo.fit(X_par, np.asarray(matriz.y))
+    carpeta.mkdir(parents=True, exist_ok=True)
+    joblib.dump(modelo, ruta)
+    _podar(carpeta, prefijo, ".joblib")
+    return modelo
+
+
+def limites_malla(X_par: np.ndarray, margen: float = MARGEN):
+    minimos = X_par.min(axis=0) - margen
+    maximos = X_par.max(axis=0) + margen
+    return (minimos[0], maximos[0]), (minimos[1], maximos[1])
+
+
+def calcular_superficie(modelo, limites_x, limites_y, resolucion: int = RESOLUCION) -> Superficie:
+    """Evalúa decision_function en toda la malla de una sola vez."""
+    eje_x = np.linspace(*limites_x, resolucion)
+    eje_y = np.linspace(*limites_y, resolucion)
+    xx, yy = np.meshgrid(eje_x, eje_y)
+    Z = modelo.decision_function(np.column_stack([xx.ravel(), yy.ravel()]))
+    return Superficie(eje_x, eje_y, Z.reshape(xx.shape).astype(np.float32),
+                      version_modelo(modelo))
+
+
+# ==========================================================
+# CACHÉ
+# ==========================================================
+def superficie_cacheada(matriz: MatrizFeatures, feature_x: str, feature_y: str,
+                        resolucion: int = RESOLUCION,
+                        carpeta: Path = CARPETA_FRONTERAS) -> Superficie:
+    """Superficie para (modelo, par de features, resolución), desde disco si ya existe."""
+    modelo = modelo_par(matriz, feature_x, feature_y)
+    version = version_modelo(modelo)
+    X_par = matriz.X[:, [matriz.indice(feature_x), matriz.indice(feature_y)]]
+    limites_x, limites_y = limites_malla(X_par)
+
+    clave = _huella(version, feature_x, feature_y, resolucion, limites_x, limites_y)
+    prefijo = f"frontera_{feature_x}_{feature_y}_{resolucion}_"
+    ruta = carpeta / f"{prefijo}{clave}.npz"
+    if ruta.is_file():
+        _usar(ruta)
+        with np.load(ruta) as datos:
+            return Superficie(datos["eje_x"], datos["eje_y"], datos["Z"], version)
+
+    superficie = calcular_superficie(modelo, limites_x, limites_y, resolucion)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    np.savez(ruta, eje_x=superficie.eje_x, eje_y=superficie.eje_y, Z=superficie.Z)
+    _podar(carpeta, prefijo, ".npz")
+    return superficie
+
+
+def superficies(matriz: MatrizFeatures, pares: list[tuple[str, str]],
+                resolucion: int = RESOLUCION, max_workers: int | None = None) -> dict:
+    """Varias superficies en paralelo (numpy/BLAS liberan el GIL)."""
+    with ThreadPoolExecutor(max_workers=max_workers) as ejecutor:
+        futuros = {
+            par: ejecutor.submit(superficie_cacheada, matriz, par[0], par[1], resolucion)
+            for par in pares
+        }
+        return {par: f.result() for par, f in futuros.items()}
@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Importaciones diferidas y reporte de tiempos de importación.
+
+numpy, pandas, matplotlib, seaborn y sklearn tardan entre 0,1 y 1 s cada uno
+en importarse. Con diferido() el módulo se importa recién cuando se usa uno
+de sus atributos, así el menú y el dashboard arrancan sin cargarlos:
+
+    pd = diferido("pandas")        # no importa nada todavía
+    pd.read_csv(...)               # acá se importa pandas (una sola vez)
+
+Las anotaciones de funciones se evalúan al definirlas: con un módulo diferido
+hay que escribirlas entre comillas ("pd.DataFrame") para no forzar la carga.
+
+Reporte:
+- AURELION_REPORTE_IMPORTS=1 imprime al salir qué módulos diferidos se
+  cargaron y cuánto tardó cada uno.
+- python importacion_diferida.py [modulo ...] mide el arranque en frío de los
+  puntos de entrada (python -X importtime) y lista las dependencias más caras.
+"""
+
+import atexit
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Puntos de entrada que se miden por defecto (importarlos no ejecuta nada)
+PUNTOS_DE_ENTRADA = ["programa", "programa_web", "servidor_asgi", "pipeline"]
+TOP_REPORTE = 8
+
+# módulo -> segundos que tardó su importación diferida
+_TIEMPOS: dict[str, float] = {}
+_LOCK = threading.Lock()
+
+
+# ==========================================================
+# MÓDULO DIFERIDO
+# ==========================================================
+class ModuloDiferido:
+    """Se comporta como el módulo `nombre`, que se importa en el primer uso."""
+
+    def __init__(self, nombre: str):
+        self._nombre = nombre
+        self._modulo = None
+
+    def _cargar(self):
+        if self._modulo is None:
+            with _LOCK:
+                if self._modulo is None:
+                    nuevo = self._nombre not in sys.modules
+                    inicio = time.perf_counter()
+                    modulo = importlib.import_module(self._nombre)
+                    if nuevo:  # si otro import ya lo había cargado, no costó nada
+                        _TIEMPOS.setdefault(self._nombre, time.perf_counter() - inicio)
+                    self._modulo = modulo
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self._cargar(), atributo)
+
+    def __dir__(self):
+        return dir(self._cargar())
+
+    def __repr__(self):
+        estado = "cargado" if self._modulo is not None else "sin cargar"
+        return f"<módulo diferido {self._nombre!r} ({estado})>"
+
+
+def diferido(nombre: str):
+    """El módulo si ya estaba importado; si no, un ModuloDiferido."""
+    modulo = sys.modules.get(nombre)
+    return modulo if modulo is not None else ModuloDiferido(nombre)
+
+
+# ==========================================================
+# REPORTE EN EJECUCIÓN
+# ==========================================================
+def tiempos_carga() -> dict[str, float]:
+    return dict(_TIEMPOS)
+
+
+def imprimir_tiempos_carga():
+    if not _TIEMPOS:
+        print("📦 No se cargó ningún módulo diferido.")
+        return
+    print("\n📦 Módulos diferidos cargados:")
+    for nombre, seg in sorted(_TIEMPOS.items(), key=lambda kv: -kv[1]):
+        print(f"   {nombre:<28} {seg * 1000:8.1f} ms")
+
+
+if os.environ.get("AURELION_REPORTE_IMPORTS") == "1":
+    atexit.register(imprimir_tiempos_carga)
+
+
+# ==========================================================
+# REPORTE DE ARRANQUE EN FRÍO
+# ==========================================================
+def medir_arranque(modulo: str, carpeta: str | None = None) -> tuple[float, list[tuple[str, float]]]:
+    """
+    Importa `modulo` en un intérprete nuevo con -X importtime. Devuelve el
+    tiempo total (s) y los paquetes de primer nivel más caros [(nombre, s)].
+    """
+    carpeta = carpeta or os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=carpeta, capture_output=True, text=True,
+        env={**os.environ, "MPLBACKEND": "Agg"},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    total = 0.0
+    paquetes: dict[str, float] = {}
+    for linea in proc.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        seg = int(acumulado) / 1e6
+        nombre = nombre.strip()
+        if nombre == modulo:
+            total = seg
+        elif "." not in nombre:
+            # Cada paquete aparece una vez: donde se importó por primera vez
+            paquetes[nombre] = seg
+    return total, sorted(paquetes.items(), key=lambda kv: -kv[1])[:TOP_REPORTE]
+
+
+def main(argv=None):
+    modulos = (argv if argv is not None else sys.argv[1:]) or PUNTOS_DE_ENTRADA
+    print("--- ⏱️ ARRANQUE EN FRÍO (python -X importtime) ---")
+    for modulo in modulos:
+        try:
+            total, paquetes = medir_arranque(modulo)
+        except RuntimeError as e:
+            print(f"❌ {modulo}: {e}")
+            continue
+        print(f"\n▶ {modulo}: {total * 1000:.0f} ms")
+        for nombre, seg in paquetes:
+            print(f"   {nombre:<28} {seg * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
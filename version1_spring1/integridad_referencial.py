@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Verificación de integridad referencial entre las tablas limpias.
+
+Los índices de claves y la verificación por chunks están en
+aurelion.integridad; acá quedan los mensajes y el script:
+
+    python integridad_referencial.py   # código de salida 1 si hay huérfanas
+"""
+
+from aurelion.integridad import RELACIONES, ResultadoRelacion, verificar_integridad
+
+
+def imprimir_integridad(resultados: list[ResultadoRelacion]):
+    for res in resultados:
+        if res.ok:
+            print(f"✅ {res.relacion}: {res.filas} filas, sin huérfanas")
+            continue
+        print(
+            f"⚠️ {res.relacion}: {res.huerfanas} huérfanas y {res.nulos} nulas "
+            f"de {res.filas} filas (ej.: {res.ejemplos()})"
+        )
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main():
+    from modelo_datos import rutas_tabla
+
+    print("\n--- 🔗 INTEGRIDAD REFERENCIAL ---")
+    tablas = {r.hija for r in RELACIONES} | {r.padre for r in RELACIONES}
+    fuentes = {t: rutas_tabla(t) for t in sorted(tablas)}
+    resultados = verificar_integridad(fuentes)
+    imprimir_integridad(resultados)
+    return 0 if all(res.ok for res in resultados) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Intercambio de dataframes entre etapas del pipeline, sin parsear CSV.
+
+La etapa que produce un dataframe (crear_dataframe, aumentar_dataframe) lo
+deja además en cache/intercambio/<nombre>/ en formato columnar binario:
+
+- con pyarrow instalado: un archivo Arrow IPC (Feather v2) sin comprimir;
+- sin pyarrow: un .npy por columna (los textos como códigos de diccionario,
+  igual que modelo_datos) y un manifiesto JSON.
+
+La etapa siguiente lo abre con memory-map: no hay parseo de texto, las
+columnas numéricas no se copian a RAM y varios procesos que abran el mismo
+archivo comparten las páginas del sistema operativo.
+
+El CSV sigue siendo la salida de referencia (lo hashea el pipeline y se puede
+abrir a mano). El manifiesto guarda su huella: si el CSV se regeneró por otro
+lado, el intercambio se descarta y se vuelve a leer el CSV.
+"""
+
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cache_features import CARPETA_CACHE, huella_archivo
+
+try:
+    from pyarrow import feather
+except ImportError:
+    feather = None
+
+CARPETA_INTERCAMBIO = CARPETA_CACHE / "intercambio"
+ARCHIVO_MANIFIESTO = "manifiesto.json"
+ARCHIVO_ARROW = "tabla.arrow"
+
+# Subir este número si cambia la forma de guardar las columnas
+VERSION_INTERCAMBIO = 1
+
+
+# ==========================================================
+# COLUMNAS <-> ARRAYS (formato sin pyarrow)
+# ==========================================================
+def _codificar(serie: pd.Series) -> tuple[np.ndarray, dict]:
+    """Serie -> (array de dtype fijo, metadatos para reconstruirla)."""
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.to_numpy(dtype="datetime64[ns]"), {"tipo": "fecha"}
+    if pd.api.types.is_bool_dtype(serie) or (
+        pd.api.types.is_numeric_dtype(serie) and not isinstance(serie.dtype, pd.CategoricalDtype)
+    ):
+        if serie.hasnans:
+            return serie.to_numpy(dtype="float64", na_value=np.nan), {"tipo": "numero"}
+        return serie.to_numpy(), {"tipo": "numero"}
+
+    # Texto / categorías: códigos enteros + diccionario (-1 = faltante).
+    # Ordenado, para que get_dummies arme las mismas columnas que desde el CSV.
+    codigos, categorias = pd.factorize(serie, sort=True, use_na_sentinel=True)
+    return codigos.astype(np.int32), {"tipo": "diccionario", "categorias": [str(c) for c in categorias]}
+
+
+def _decodificar(valores: np.ndarray, meta: dict):
+    if meta["tipo"] == "diccionario":
+        return pd.Categorical.from_codes(valores, categories=meta["categorias"])
+    return valores
+
+
+# ==========================================================
+# GUARDAR / ABRIR
+# ==========================================================
+def guardar_tabla(df: pd.DataFrame, nombre: str, csv: str | Path | None = None,
+                  carpeta: Path = CARPETA_INTERCAMBIO) -> Path:
+    """
+    Deja `df` listo para que lo abra la etapa siguiente. `csv` es el CSV
+    que se escribió con el mismo contenido (su huella valida el intercambio).
+    """
+    destino = carpeta / nombre
+    if destino.exists():
+        shutil.rmtree(destino)
+    destino.mkdir(parents=True)
+
+    manifiesto = {
+        "version": VERSION_INTERCAMBIO,
+        "filas": int(len(df)),
+        "csv": huella_archivo(csv) if csv is not None else None,
+    }
+    if feather is not None:
+        feather.write_feather(df.reset_index(drop=True), str(destino / ARCHIVO_ARROW),
+                              compression="uncompressed")
+        manifiesto["formato"] = "arrow"
+    else:
+        columnas = []
+        for i, col in enumerate(df.columns):
+            valores, meta = _codificar(df[col])
+            archivo = f"{i:03d}.npy"
+            np.save(destino / archivo, np.ascontiguousarray(valores))
+            columnas.append({"nombre": str(col), "archivo": archivo, **meta})
+        manifiesto["formato"] = "npy"
+        manifiesto["columnas"] = columnas
+
+    # El manifiesto va último: si falta, el intercambio está incompleto
+    (destino / ARCHIVO_MANIFIESTO).write_text(
+        json.dumps(manifiesto, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    return destino
+
+
+def abrir_tabla(nombre: str, csv: str | Path | None = None,
+                carpeta: Path = CARPETA_INTERCAMBIO) -> pd.DataFrame | None:
+    """
+    DataFrame memory-mapped (solo lectura) o None si no hay intercambio
+    vigente: falta, es de otra versión o el CSV de referencia cambió.
+    """
+    destino = carpeta / nombre
+    try:
+        manifiesto = json.loads((destino / ARCHIVO_MANIFIESTO).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifiesto.get("version") != VERSION_INTERCAMBIO:
+        return None
+    if csv is not None and (not Path(csv).is_file() or manifiesto.get("csv") != huella_archivo(csv)):
+        return None
+
+    if manifiesto.get("formato") == "arrow":
+        if feather is None:
+            return None
+        return feather.read_table(str(destino / ARCHIVO_ARROW), memory_map=True).to_pandas()
+
+    datos = {
+        c["nombre"]: _decodificar(np.load(destino / c["archivo"], mmap_mode="r"), c)
+        for c in manifiesto["columnas"]
+    }
+    # copy=False: cada columna queda como vista del memmap (sin consolidar bloques)
+    return pd.DataFrame(datos, index=pd.RangeIndex(manifiesto["filas"]), copy=False)
+
+
+def leer_tabla_o_csv(csv: str | Path, nombre: str | None = None,
+                     carpeta: Path = CARPETA_INTERCAMBIO) -> pd.DataFrame:
+    """Abre el intercambio de `csv` si está vigente; si no, lee el CSV."""
+    csv = Path(csv)
+    df = abrir_tabla(nombre or csv.stem, csv, carpeta)
+    if df is not None:
+        print(f"⚡ {csv.name} desde intercambio (memory-map, sin parsear)")
+        return df
+    return pd.read_csv(csv)
+
+
+def guardar_csv_e_intercambio(df: pd.DataFrame, csv: str | Path,
+                              nombre: str | None = None,
+                              carpeta: Path = CARPETA_INTERCAMBIO) -> Path:
+    """Escribe el CSV de referencia y, con su huella, el intercambio binario."""
+    csv = Path(csv)
+    df.to_csv(csv, index=False)
+    return guardar_tabla(df, nombre or csv.stem, csv=csv, carpeta=carpeta)
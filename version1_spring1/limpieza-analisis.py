@@ -9,17 +9,8 @@
 import pandas as pd
 from pathlib import Path
 
-# Función para detectar la carpeta 'datos'
-def find_data_dir(start: Path | None = None, names=('datos', 'data')) -> Path | None:
-    if start is None:
-        start = Path.cwd()
-    start = Path(start).resolve()
-    for parent in [start] + list(start.parents):
-        for n in names:
-            candidate = parent / n
-            if candidate.is_dir():
-                return candidate
-    return None
+# Carpeta 'datos' resuelta por el catálogo de datos (una sola vez)
+from catalogo_datos import data_dir as find_data_dir
 
 # Función para cargar un archivo desde la carpeta 'datos'
 def get_dataset(filename: str, base_dir: str | Path | None = None) -> pd.DataFrame:
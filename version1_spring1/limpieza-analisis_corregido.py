@@ -4,34 +4,31 @@
 """
 Script de limpieza y análisis inicial de datasets de ventas.
 Versión corregida: incluye exportación funcional y detección automática de formato.
+La limpieza aplica las reglas de reglas_limpieza (deduplicación, tipos, emails,
+fechas, integridad referencial e importe) y exporta un reporte de rechazos.
+Las tablas se guardan normalizadas (ver modelo_datos).
+La lógica de limpieza está en aurelion.limpieza; acá queda la lectura, los
+mensajes y la exportación.
 """
 
+import sys
+
 import pandas as pd
 from pathlib import Path
 
+from aurelion.limpieza import ARCHIVOS_ORIGEN, limpiar, perfil, tablas_limpias
+from aurelion.reglas_limpieza import reporte_rechazos
+from catalogo_datos import data_dir, leer_dataset
+from modelo_datos import ARCHIVO_DICCIONARIOS, guardar_normalizado
+
 # =============================================================
 # FUNCIONES AUXILIARES
 # =============================================================
 
-def find_data_dir(start: Path | None = None, names=('datos', 'data')) -> Path | None:
-    """Busca una carpeta llamada 'datos' o 'data' en el árbol de directorios."""
-    if start is None:
-        start = Path.cwd()
-    start = Path(start).resolve()
-    for parent in [start] + list(start.parents):
-        for n in names:
-            candidate = parent / n
-            if candidate.is_dir():
-                return candidate
-    return None
-
-
 def get_dataset(filename: str, base_dir: str | Path | None = None) -> pd.DataFrame:
-    """Carga automáticamente un archivo Excel o CSV desde la carpeta 'datos'."""
+    """Carga un archivo Excel o CSV: por nombre desde el catálogo, o desde `base_dir`."""
     if base_dir is None:
-        base_dir = find_data_dir()
-        if base_dir is None:
-            raise FileNotFoundError("No se pudo localizar la carpeta 'datos'.")
+        return leer_dataset(Path(filename).stem)
     filepath = Path(base_dir) / filename
     if not filepath.exists():
         raise FileNotFoundError(f"Archivo no encontrado: {filepath}")
@@ -45,54 +42,96 @@ def get_dataset(filename: str, base_dir: str | Path | None = None) -> pd.DataFra
 # 1️⃣ IMPORTAR DATASETS
 # =============================================================
 
-archivos_info = {
-    'clientes': 'clientes.xlsx',
-    'productos': 'productos.xlsx',
-    'ventas': 'ventas.xlsx',
-    'detalle_ventas': 'detalle_ventas.xlsx'
-}
-
-dataframes = {}
-
-print("--- 1️⃣ CARGANDO DATASETS ---")
-for nombre, archivo in archivos_info.items():
-    try:
-        df_temp = get_dataset(archivo)
-        dataframes[nombre] = df_temp
-        print(f"✅ Cargado: {nombre} ({df_temp.shape[0]} filas, {df_temp.shape[1]} columnas)")
-    except Exception as e:
-        print(f"❌ ERROR al cargar {archivo}: {e}")
+def cargar_origen() -> dict[str, pd.DataFrame]:
+    print("--- 1️⃣ CARGANDO DATASETS ---")
+    dataframes = {}
+    for nombre, archivo in ARCHIVOS_ORIGEN.items():
+        try:
+            df_temp = get_dataset(archivo)
+            dataframes[nombre] = df_temp
+            print(f"✅ Cargado: {nombre} ({df_temp.shape[0]} filas, {df_temp.shape[1]} columnas)")
+        except Exception as e:
+            print(f"❌ ERROR al cargar {archivo}: {e}")
+    return dataframes
 
 
 # =============================================================
 # 2️⃣ ANÁLISIS BÁSICO DE CADA DATASET
 # =============================================================
 
-for nombre, df in dataframes.items():
-    print(f"\n{'='*60}\n📊 ANALISIS — {nombre.upper()}\n{'='*60}")
-    print(df.info())
-    print(df.describe(include='all').transpose())
-    duplicados = df.duplicated().sum()
-    print(f"🔁 Filas duplicadas: {duplicados}")
-    id_cols = [c for c in df.columns if 'id' in c.lower()]
-    for c in id_cols:
-        print(f"🧩 {c}: {df[c].nunique()} únicos")
+def analisis_basico(dataframes: dict[str, pd.DataFrame]):
+    for nombre, df in dataframes.items():
+        print(f"\n{'='*60}\n📊 ANALISIS — {nombre.upper()}\n{'='*60}")
+        print(df.info())
+        print(df.describe(include='all').transpose())
+        datos = perfil(df)
+        print(f"🔁 Filas duplicadas: {datos['duplicados']}")
+        for c, n in datos['unicos_id'].items():
+            print(f"🧩 {c}: {n} únicos")
 
 
 # =============================================================
-# 3️⃣ EXPORTACIÓN DE DATASETS LIMPIOS
+# 3️⃣ LIMPIEZA Y VALIDACIÓN
 # =============================================================
 
-print("\n--- 3️⃣ EXPORTANDO ARCHIVOS LIMPIOS ---")
-salida_base = find_data_dir()
-if salida_base is None:
-    raise FileNotFoundError("No se pudo localizar la carpeta 'datos' para exportar los archivos limpios.")
-SALIDA = salida_base / 'limpios'
-SALIDA.mkdir(parents=True, exist_ok=True)
+def aplicar_reglas(dataframes: dict[str, pd.DataFrame]):
+    print("\n--- 3️⃣ APLICANDO REGLAS DE LIMPIEZA ---")
+    resultados = limpiar(dataframes)
+    for nombre, res in resultados.items():
+        rechazadas = len(res.rechazadas)
+        print(f"{'✅' if rechazadas == 0 else '⚠️'} {nombre}: {len(res.limpio)} filas aceptadas, "
+              f"{rechazadas} rechazadas de {res.filas_entrada}")
+        for regla, n in res.conteos.items():
+            if n:
+                print(f"   ❌ {regla}: {n} filas")
+    return resultados
+
 
-for nombre, df in dataframes.items():
-    archivo = SALIDA / f"{nombre}_limpio.csv"
-    df.to_csv(archivo, index=False, encoding='utf-8-sig')
-    print(f"✅ Exportado: {archivo}")
+# =============================================================
+# 4️⃣ EXPORTACIÓN DE DATASETS LIMPIOS
+# =============================================================
 
-print("\n🎉 Proceso completado correctamente.")
+def exportar(resultados):
+    print("\n--- 4️⃣ EXPORTANDO ARCHIVOS LIMPIOS ---")
+    salida_base = data_dir()
+    if salida_base is None:
+        raise FileNotFoundError("No se pudo localizar la carpeta 'datos' para exportar los archivos limpios.")
+    salida = salida_base / 'limpios'
+    salida.mkdir(parents=True, exist_ok=True)
+    carpeta_rechazos = salida / 'rechazos'
+
+    # Formato normalizado (claves enteras + diccionarios); se lee con modelo_datos
+    rutas = guardar_normalizado(tablas_limpias(resultados), salida)
+
+    for nombre, res in resultados.items():
+        print(f"✅ Exportado: {rutas[nombre]}")
+        if not res.rechazadas.empty:
+            carpeta_rechazos.mkdir(parents=True, exist_ok=True)
+            archivo_rechazos = carpeta_rechazos / f"{nombre}_rechazadas.csv"
+            res.rechazadas.to_csv(archivo_rechazos, index=False, encoding='utf-8-sig')
+            print(f"   🗑️ Filas rechazadas: {archivo_rechazos}")
+
+    archivo_reporte = carpeta_rechazos / 'reporte_rechazos.csv'
+    carpeta_rechazos.mkdir(parents=True, exist_ok=True)
+    reporte_rechazos(resultados).to_csv(archivo_reporte, index=False, encoding='utf-8-sig')
+    print(f"📋 Reporte de rechazos por regla: {archivo_reporte}")
+    print(f"📖 Diccionarios de texto: {salida / ARCHIVO_DICCIONARIOS}")
+
+
+def main() -> bool:
+    """Devuelve False si no se pudo cargar algún dataset de origen."""
+    dataframes = cargar_origen()
+    analisis_basico(dataframes)
+    exportar(aplicar_reglas(dataframes))
+    faltantes = sorted(set(ARCHIVOS_ORIGEN) - set(dataframes))
+    if faltantes:
+        print(f"\n⚠️ Proceso completado sin: {', '.join(faltantes)}")
+        return False
+    print("\n🎉 Proceso completado correctamente.")
+    return True
+
+
+if __name__ == "__main__":
+    # Código de salida != 0: pipeline.py no marca la etapa como hecha
+    if not main():
+        sys.exit(1)
@@ -0,0 +1,314 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Almacenamiento normalizado de las tablas limpias y capa de joins perezosos.
+
+- ventas ya no repite nombre_cliente / email, y detalle_ventas no repite
+  nombre_producto / precio_unitario: se guardan solo las claves enteras.
+- Los textos con pocos valores distintos (ciudad, categoria, medio_pago) se
+  guardan como códigos enteros; el diccionario código -> texto va en
+  diccionarios.json, junto a los CSV.
+
+Al leer, leer_tabla() decodifica los diccionarios (como 'category') y, solo
+si se piden columnas que ya no están guardadas, las trae de la tabla padre.
+adjuntar() pega esas columnas a un resultado ya agregado (p.ej. un top 10),
+así el join se hace sobre 10 filas y no sobre toda la tabla.
+
+ventas y detalle_ventas se guardan particionadas por mes
+(df_ventas_limpio/2024-06.csv, ...; el detalle toma la fecha de su venta).
+Los lectores aceptan desde / hasta ('AAAA-MM' o fecha) y abren solo las
+particiones de ese rango. Una partición se reescribe solo si su contenido
+cambió, así su fecha de modificación sirve para cachés incrementales.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from catalogo_datos import (MARCADOR_PARTICIONES, archivos_particiones,
+                            es_particionado, registrar_archivo, ruta_dataset)
+
+ARCHIVO_DICCIONARIOS = "diccionarios.json"
+TAMANIO_CHUNK = 50_000
+
+# tabla -> (tabla padre, clave, columnas que se obtienen de la tabla padre)
+DERIVADAS = {
+    "ventas": ("clientes", "id_cliente", ["nombre_cliente", "email"]),
+    "detalle_ventas": ("productos", "id_producto", ["nombre_producto", "precio_unitario"]),
+}
+
+# tabla -> columnas de texto guardadas como códigos de diccionario
+DICCIONARIOS = {
+    "clientes": ["ciudad"],
+    "productos": ["categoria"],
+    "ventas": ["medio_pago"],
+}
+
+
+# tabla -> (columna de fecha, (tabla, clave) de donde se toma si no es propia)
+PARTICIONADAS = {
+    "ventas": ("fecha", None),
+    "detalle_ventas": ("fecha", ("ventas", "id_venta")),
+}
+SIN_FECHA = "sin_fecha"
+
+
+def nombre_archivo(tabla: str) -> str:
+    return f"df_{tabla}_limpio"
+
+
+def ruta_tabla(tabla: str) -> Path:
+    return ruta_dataset(nombre_archivo(tabla))
+
+
+# ==========================================================
+# ESCRITURA
+# ==========================================================
+def _redundantes(tabla: str, df: pd.DataFrame, tablas: dict[str, pd.DataFrame]) -> list[str]:
+    """Columnas derivadas que coinciden con la tabla padre (se pueden quitar)."""
+    if tabla not in DERIVADAS:
+        return []
+    padre, clave, columnas = DERIVADAS[tabla]
+    if padre not in tablas:
+        return []
+    columnas = [c for c in columnas if c in df.columns and c in tablas[padre].columns]
+    if not columnas:
+        return []
+    referencia = tablas[padre].drop_duplicates(clave).set_index(clave)
+    redundantes = []
+    for col in columnas:
+        esperado = referencia[col].reindex(df[clave]).to_numpy()
+        actual = df[col].to_numpy()
+        iguales = (actual == esperado) | (pd.isna(actual) & pd.isna(esperado))
+        if iguales.all():
+            redundantes.append(col)
+        else:
+            print(f"⚠️ {tabla}.{col}: {int((~iguales).sum())} filas no coinciden con "
+                  f"{padre}; se conserva la columna.")
+    return redundantes
+
+
+def normalizar(tablas: dict[str, pd.DataFrame]) -> tuple[dict[str, pd.DataFrame], dict]:
+    """
+    Quita columnas derivadas y codifica los textos de DICCIONARIOS.
+    Devuelve las tablas normalizadas y los diccionarios {tabla: {col: valores}}.
+    """
+    normalizadas, diccionarios = {}, {}
+    for tabla, df in tablas.items():
+        df = df.drop(columns=_redundantes(tabla, df, tablas))
+        for col in DICCIONARIOS.get(tabla, []):
+            if col not in df.columns:
+                continue
+            codigos, valores = pd.factorize(df[col], sort=True)
+            df[col] = pd.array(np.where(codigos < 0, pd.NA, codigos), dtype="Int32")
+            diccionarios.setdefault(tabla, {})[col] = [str(v) for v in valores]
+        normalizadas[tabla] = df
+    return normalizadas, diccionarios
+
+
+def periodos(tabla: str, df: pd.DataFrame, tablas: dict[str, pd.DataFrame]) -> np.ndarray:
+    """'AAAA-MM' de cada fila (SIN_FECHA si no tiene)."""
+    columna, origen = PARTICIONADAS[tabla]
+    if origen is None:
+        fechas = df[columna]
+    else:
+        padre, clave = origen
+        referencia = tablas[padre].drop_duplicates(clave).set_index(clave)[columna]
+        fechas = pd.Series(referencia.reindex(df[clave]).to_numpy(), index=df.index)
+    fechas = pd.to_datetime(fechas, errors="coerce")
+    return fechas.dt.strftime("%Y-%m").fillna(SIN_FECHA).to_numpy()
+
+
+def _escribir_si_cambio(df: pd.DataFrame, ruta: Path) -> bool:
+    contenido = df.to_csv(index=False).encode("utf-8-sig")
+    if ruta.is_file() and ruta.read_bytes() == contenido:
+        return False
+    ruta.write_bytes(contenido)
+    return True
+
+
+def guardar_particionado(df: pd.DataFrame, periodos_filas: np.ndarray, carpeta: Path) -> dict[str, int]:
+    """Un CSV por mes + el marcador _particiones.json. Borra meses que ya no existen."""
+    carpeta.mkdir(parents=True, exist_ok=True)
+    particiones, reescritas = {}, 0
+    for periodo, parte in df.groupby(periodos_filas, sort=True):
+        reescritas += _escribir_si_cambio(parte, carpeta / f"{periodo}.csv")
+        particiones[str(periodo)] = len(parte)
+    for vieja in archivos_particiones(carpeta):
+        if vieja.stem not in particiones:
+            vieja.unlink()
+    marcador = {"columnas": list(df.columns), "particiones": particiones}
+    (carpeta / MARCADOR_PARTICIONES).write_text(json.dumps(marcador, indent=2), encoding="utf-8")
+    print(f"🗂️ {carpeta.name}: {len(particiones)} particiones ({reescritas} reescritas)")
+    return particiones
+
+
+def guardar_normalizado(tablas: dict[str, pd.DataFrame], carpeta: Path) -> dict[str, Path]:
+    """
+    Escribe df_<tabla>_limpio.csv (o la carpeta particionada) + diccionarios.json
+    y los registra en el catálogo.
+    """
+    normalizadas, diccionarios = normalizar(tablas)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    (carpeta / ARCHIVO_DICCIONARIOS).write_text(
+        json.dumps(diccionarios, indent=2, ensure_ascii=False), encoding="utf-8"
+    )
+    rutas = {}
+    for tabla, df in normalizadas.items():
+        if tabla in PARTICIONADAS:
+            ruta = carpeta / nombre_archivo(tabla)
+            guardar_particionado(df, periodos(tabla, df, tablas), ruta)
+            plano = carpeta / f"{nombre_archivo(tabla)}.csv"
+            if plano.is_file():
+                plano.unlink()
+        else:
+            ruta = carpeta / f"{nombre_archivo(tabla)}.csv"
+            df.to_csv(ruta, index=False, encoding="utf-8-sig")
+        registrar_archivo(ruta)
+        rutas[tabla] = ruta
+    return rutas
+
+
+# ==========================================================
+# LECTURA
+# ==========================================================
+def diccionarios_de(ruta: Path) -> dict:
+    try:
+        return json.loads((ruta.parent / ARCHIVO_DICCIONARIOS).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def decodificar(df: pd.DataFrame, diccionario: dict[str, list], categorias: bool = True) -> pd.DataFrame:
+    """Códigos -> texto ('category' si categorias=True; si no, object como en el CSV original)."""
+    for col, valores in diccionario.items():
+        if col not in df.columns:
+            continue
+        codigos = pd.to_numeric(df[col], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+        cat = pd.Categorical.from_codes(codigos, categories=valores)
+        df[col] = cat if categorias else np.asarray(cat.astype(object))
+    return df
+
+
+def _marcador(ruta: Path) -> dict:
+    return json.loads((ruta / MARCADOR_PARTICIONES).read_text(encoding="utf-8"))
+
+
+def _periodo(valor) -> str:
+    return str(pd.Period(valor, freq="M"))
+
+
+def rutas_tabla(tabla: str, desde=None, hasta=None) -> list[Path]:
+    """
+    Archivos a leer de una tabla. En tablas particionadas se descartan los
+    meses fuera de [desde, hasta] sin abrirlos; en las demás se ignora el rango.
+    """
+    ruta = ruta_tabla(tabla)
+    if not es_particionado(ruta):
+        return [ruta]
+    todas = list(_marcador(ruta)["particiones"])
+    if desde is None and hasta is None:
+        elegidas = todas
+    else:
+        inicio = _periodo(desde) if desde is not None else ""
+        fin = _periodo(hasta) if hasta is not None else "9999-12"
+        elegidas = [p for p in todas if p != SIN_FECHA and inicio <= p <= fin]
+    return [ruta / f"{p}.csv" for p in elegidas]
+
+
+def archivo_vigilado(tabla: str) -> Path:
+    """Archivo cuya fecha cambia cada vez que la tabla se reescribe."""
+    ruta = ruta_tabla(tabla)
+    return ruta / MARCADOR_PARTICIONES if es_particionado(ruta) else ruta
+
+
+def _columnas_guardadas(ruta: Path) -> list[str]:
+    if es_particionado(ruta):
+        return _marcador(ruta)["columnas"]
+    return list(pd.read_csv(ruta, nrows=0, encoding="utf-8-sig").columns)
+
+
+def _plan(tabla: str, columnas: list[str] | None, guardadas: list[str]):
+    """Qué columnas leer del archivo y cuáles traer de la tabla padre."""
+    if columnas is None:
+        return None, []
+    faltantes = [c for c in columnas if c not in guardadas]
+    a_leer = [c for c in columnas if c in guardadas]
+    if faltantes:
+        padre, clave, derivadas = DERIVADAS.get(tabla, (None, None, []))
+        desconocidas = [c for c in faltantes if c not in derivadas]
+        if desconocidas:
+            raise KeyError(f"Columnas inexistentes en '{tabla}': {desconocidas}")
+        if clave not in a_leer:
+            a_leer.append(clave)
+    return a_leer, faltantes
+
+
+def leer_tabla(tabla: str, columnas: list[str] | None = None,
+               categorias: bool = True, desde=None, hasta=None) -> pd.DataFrame:
+    """
+    Lee una tabla limpia. Con `columnas`, lee solo esas y trae de la tabla
+    padre las que se guardan normalizadas (p.ej. nombre_producto en detalle).
+    Con desde / hasta, solo las particiones de esos meses.
+    """
+    ruta = ruta_tabla(tabla)
+    guardadas = _columnas_guardadas(ruta)
+    a_leer, faltantes = _plan(tabla, columnas, guardadas)
+    partes = [pd.read_csv(p, usecols=a_leer, encoding="utf-8-sig")
+              for p in rutas_tabla(tabla, desde, hasta)]
+    if partes:
+        df = pd.concat(partes, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=a_leer if a_leer is not None else guardadas)
+    df = decodificar(df, diccionarios_de(ruta).get(tabla, {}), categorias)
+    if faltantes:
+        df = adjuntar(df, tabla, faltantes, categorias)
+    return df[columnas] if columnas is not None else df
+
+
+def chunks_tabla(tabla: str, tamanio_chunk: int = TAMANIO_CHUNK, categorias: bool = False,
+                 desde=None, hasta=None, derivadas: bool = False):
+    """
+    Itera la tabla guardada por chunks, con los diccionarios ya decodificados.
+    Con derivadas=True cada chunk trae también las columnas normalizadas
+    (la tabla padre se lee una sola vez).
+    """
+    diccionario = diccionarios_de(ruta_tabla(tabla)).get(tabla, {})
+    referencia = None
+    if derivadas and tabla in DERIVADAS:
+        padre, clave, columnas = DERIVADAS[tabla]
+        faltantes = [c for c in columnas if c not in _columnas_guardadas(ruta_tabla(tabla))]
+        if faltantes:
+            referencia = leer_tabla(padre, [clave, *faltantes], categorias).drop_duplicates(clave)
+    for ruta in rutas_tabla(tabla, desde, hasta):
+        for chunk in pd.read_csv(ruta, chunksize=tamanio_chunk, encoding="utf-8-sig"):
+            chunk = decodificar(chunk, diccionario, categorias)
+            yield chunk if referencia is None else chunk.merge(referencia, on=clave, how="left")
+
+
+def desnormalizar(tablas: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+    """
+    Tablas ya en memoria con sus columnas derivadas de vuelta (join con la
+    tabla padre, si está en `tablas`). Lo inverso de normalizar().
+    """
+    salida = dict(tablas)
+    for tabla, (padre, clave, columnas) in DERIVADAS.items():
+        if tabla not in tablas or padre not in tablas:
+            continue
+        faltantes = [c for c in columnas
+                     if c not in tablas[tabla].columns and c in tablas[padre].columns]
+        if faltantes:
+            referencia = tablas[padre][[clave, *faltantes]].drop_duplicates(clave)
+            salida[tabla] = tablas[tabla].merge(referencia, on=clave, how="left")
+    return salida
+
+
+def adjuntar(df: pd.DataFrame, tabla: str, columnas: list[str],
+             categorias: bool = True) -> pd.DataFrame:
+    """Pega a `df` columnas derivadas de `tabla` (join por clave con la tabla padre)."""
+    padre, clave, _ = DERIVADAS[tabla]
+    referencia = leer_tabla(padre, [clave, *columnas], categorias).drop_duplicates(clave)
+    return df.merge(referencia, on=clave, how="left")
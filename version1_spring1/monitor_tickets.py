@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Monitor de tickets sospechosos (cálculos en aurelion.anomalias).
+
+Arranca reproduciendo la historia en orden de fecha (cada ticket se evalúa
+solo con los anteriores, como si llegaran en vivo) y después puntúa los
+tickets nuevos de a uno. Guarda los últimos tickets marcados para el
+dashboard. Los tickets en vivo se recuerdan: si la historia se recarga, se
+vuelven a pasar después de ella (salvo los que ya estén en los datos).
+
+    python monitor_tickets.py [--ultimos 20] [--umbral 3.5]
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from aurelion.anomalias import Z_UMBRAL, DetectorAnomalias, Resultado, Ticket
+
+MAX_MARCADOS = 500
+MAX_EN_VIVO = 50_000  # tickets en vivo que se recuerdan para reproducir
+
+
+def _dia(fecha) -> int:
+    return int(np.datetime64(pd.Timestamp(fecha).date(), "D").astype(np.int64))
+
+
+def tickets_ordenados(df_ventas: pd.DataFrame, df_detalle: pd.DataFrame,
+                      df_clientes: pd.DataFrame | None = None) -> list[Ticket]:
+    """Ventas + detalle (+ ciudad del cliente) -> Tickets por fecha e id_venta."""
+    ventas = df_ventas[["id_venta", "fecha", "id_cliente", "medio_pago"]].assign(
+        fecha=lambda d: pd.to_datetime(d["fecha"], errors="coerce")
+    ).dropna(subset=["fecha"])
+    if df_clientes is not None:
+        ventas = ventas.merge(df_clientes[["id_cliente", "ciudad"]].drop_duplicates("id_cliente"),
+                              on="id_cliente", how="left")
+    else:
+        ventas = ventas.assign(ciudad=None)
+    ventas = ventas.sort_values(["fecha", "id_venta"], kind="stable")
+
+    detalle = df_detalle[["id_venta", "id_producto", "cantidad", "importe"]].dropna(subset=["id_producto"])
+    detalle = detalle.sort_values("id_venta", kind="stable")
+    ids = detalle["id_venta"].to_numpy()
+    lineas = list(zip(detalle["id_producto"].astype(int).tolist(),
+                      pd.to_numeric(detalle["cantidad"], errors="coerce").fillna(0).tolist(),
+                      pd.to_numeric(detalle["importe"], errors="coerce").fillna(0).tolist()))
+    inicios = np.searchsorted(ids, ventas["id_venta"].to_numpy(), side="left")
+    fines = np.searchsorted(ids, ventas["id_venta"].to_numpy(), side="right")
+    dias = ventas["fecha"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+    def texto(valor):
+        return None if pd.isna(valor) else str(valor)
+
+    return [
+        Ticket(int(v), int(d), int(c) if pd.notna(c) else -1, texto(ciudad), texto(medio),
+               tuple(lineas[i:f]))
+        for v, d, c, ciudad, medio, i, f in zip(
+            ventas["id_venta"].tolist(), dias.tolist(), ventas["id_cliente"].tolist(),
+            ventas["ciudad"].tolist(), ventas["medio_pago"].tolist(), inicios.tolist(), fines.tolist())
+    ]
+
+
+class MonitorTickets:
+    """Detector al día + los últimos tickets marcados y el tiempo por ticket."""
+
+    def __init__(self, z_umbral: float = Z_UMBRAL, max_marcados: int = MAX_MARCADOS,
+                 max_en_vivo: int = MAX_EN_VIVO):
+        self.z_umbral = z_umbral
+        self.detector = DetectorAnomalias(z_umbral)
+        self.marcados: deque = deque(maxlen=max_marcados)
+        self.en_vivo: deque = deque(maxlen=max_en_vivo)
+        self.ciudades: dict = {}
+        self.segundos = 0.0
+        self._firma = None
+        self._lock = threading.Lock()
+
+    def vigente(self, firma) -> bool:
+        return firma is not None and firma == self._firma
+
+    def reproducir(self, df_ventas: pd.DataFrame, df_detalle: pd.DataFrame,
+                   df_clientes: pd.DataFrame | None = None, firma=None):
+        """
+        Detector nuevo, alimentado con toda la historia en orden y después con
+        los tickets en vivo que la historia todavía no incluye.
+        """
+        tickets = tickets_ordenados(df_ventas, df_detalle, df_clientes)
+        with self._lock:
+            self.detector = DetectorAnomalias(self.z_umbral)
+            self.marcados.clear()
+            self.segundos = 0.0
+            if df_clientes is not None:
+                self.ciudades = (df_clientes.drop_duplicates("id_cliente")
+                                 .set_index("id_cliente")["ciudad"].astype(object).to_dict())
+            for ticket in tickets:
+                self._procesar(ticket)
+            en_historia = {t.id_venta for t in tickets}
+            self.en_vivo = deque((t for t in self.en_vivo if t.id_venta not in en_historia),
+                                 maxlen=self.en_vivo.maxlen)
+            for ticket in self.en_vivo:
+                self._procesar(ticket)
+            self._firma = firma
+
+    def _procesar(self, ticket: Ticket) -> Resultado:
+        inicio = time.perf_counter()
+        resultado = self.detector.procesar(ticket)
+        self.segundos += time.perf_counter() - inicio
+        if resultado.sospechoso:
+            self.marcados.append((ticket, resultado))
+        return resultado
+
+    def procesar(self, ticket: Ticket) -> Resultado:
+        """Ticket en vivo: se puntúa, se aprende y se guarda para reproducir."""
+        with self._lock:
+            self.en_vivo.append(ticket)
+            return self._procesar(ticket)
+
+    def ticket_desde_json(self, datos: dict) -> Ticket:
+        """{"id_venta", "fecha", "id_cliente", "medio_pago", "lineas": [{"id_producto", "cantidad", "importe"}]}"""
+        id_cliente = int(datos["id_cliente"])
+        ciudad = datos.get("ciudad", self.ciudades.get(id_cliente))
+        return Ticket(
+            int(datos["id_venta"]), _dia(datos["fecha"]), id_cliente,
+            None if ciudad is None else str(ciudad), datos.get("medio_pago"),
+            tuple((int(l["id_producto"]), float(l.get("cantidad", 0)), float(l["importe"]))
+                  for l in datos["lineas"]),
+        )
+
+    @property
+    def us_por_ticket(self) -> float:
+        return self.segundos * 1e6 / max(self.detector.procesados, 1)
+
+    def tabla_marcados(self) -> pd.DataFrame:
+        filas = [{
+            "id_venta": t.id_venta,
+            "fecha": str(np.datetime64(t.dia, "D")),
+            "id_cliente": t.id_cliente,
+            "ciudad": t.ciudad,
+            "medio_pago": t.medio_pago,
+            "importe": sum(l[2] for l in t.lineas),
+            "motivos": "; ".join(r.motivos),
+        } for t, r in reversed(self.marcados)]
+        return pd.DataFrame(filas, columns=["id_venta", "fecha", "id_cliente", "ciudad",
+                                            "medio_pago", "importe", "motivos"])
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def imprimir_resumen(monitor: MonitorTickets, ultimos: int = 20):
+    marcados = monitor.tabla_marcados()
+    print(f"🚨 {monitor.detector}: {len(marcados)} tickets marcados, "
+          f"{monitor.us_por_ticket:.1f} µs por ticket")
+    if marcados.empty:
+        print("   (ningún ticket sospechoso)")
+        return
+    por_motivo = (marcados["motivos"].str.split("; ").explode()
+                  .str.replace(r" \(.*\)$| \d+$| en .*$", "", regex=True).value_counts())
+    print("\n📋 Marcados por motivo:")
+    print(por_motivo.to_string())
+    print(f"\n🔎 Últimos {min(ultimos, len(marcados))} tickets marcados:")
+    print(marcados.head(ultimos).to_string(index=False, float_format=lambda x: f"{x:,.2f}"))
+
+
+def main(ultimos=20, z_umbral=Z_UMBRAL):
+    from modelo_datos import leer_tabla
+
+    print("--- 🚨 MONITOR DE TICKETS ---")
+    monitor = MonitorTickets(z_umbral)
+    monitor.reproducir(
+        leer_tabla("ventas", ["id_venta", "fecha", "id_cliente", "medio_pago"]),
+        leer_tabla("detalle_ventas", ["id_venta", "id_producto", "cantidad", "importe"]),
+        leer_tabla("clientes", ["id_cliente", "ciudad"]),
+    )
+    imprimir_resumen(monitor, ultimos)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tickets sospechosos (detección en streaming)")
+    parser.add_argument("--ultimos", type=int, default=20, help="Marcados a listar")
+    parser.add_argument("--umbral", type=float, default=Z_UMBRAL, help="z robusto para importes atípicos")
+    args = parser.parse_args()
+    main(args.ultimos, args.umbral)
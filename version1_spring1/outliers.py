@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Detección de outliers por IQR, vectorizada sobre todas las columnas.
+
+- Los cuartiles de todas las columnas salen de UNA llamada a np.nanquantile.
+- El resultado por fila es una máscara de bits compacta (np.packbits):
+  el bit j indica que la fila tiene un outlier en la columna j.
+- outliers_tabla() recorre una tabla limpia por chunks (todas sus
+  particiones mensuales, vía modelo_datos), así escala a tablas grandes
+  como el detalle de ventas completo. outliers_csv() hace lo mismo con un
+  CSV suelto.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aurelion.motor_estadisticas import TAMANIO_CHUNK, ResumenDataset, resumir_chunks, resumir_csv
+from modelo_datos import chunks_tabla
+
+FACTOR_IQR = 1.5
+
+
+# ==========================================================
+# NÚCLEO VECTORIZADO
+# ==========================================================
+def columnas_sin_ids(df: pd.DataFrame) -> list[str]:
+    """Columnas numéricas que no son IDs (mismo criterio que Estadisticas.py)."""
+    return [
+        c for c in df.select_dtypes(include=[np.number]).columns
+        if "id" not in c.lower()
+    ]
+
+
+def limites_iqr(matriz: np.ndarray, factor: float = FACTOR_IQR):
+    """Límites inferior/superior por columna con un solo np.nanquantile."""
+    with np.errstate(all="ignore"):
+        q1, q3 = np.nanquantile(matriz, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+    return q1 - factor * iqr, q3 + factor * iqr
+
+
+def marcar_outliers(matriz: np.ndarray, lim_inf: np.ndarray, lim_sup: np.ndarray) -> np.ndarray:
+    """Matriz booleana (filas x columnas); los NaN nunca son outliers."""
+    return (matriz < lim_inf) | (matriz > lim_sup)
+
+
+def empaquetar(marcas: np.ndarray) -> np.ndarray:
+    """Máscara de bits por fila: (n_filas, ceil(n_columnas / 8)) uint8."""
+    return np.packbits(marcas, axis=1, bitorder="little")
+
+
+def desempaquetar(bits: np.ndarray, n_columnas: int) -> np.ndarray:
+    return np.unpackbits(bits, axis=1, count=n_columnas, bitorder="little").astype(bool)
+
+
+# ==========================================================
+# RESULTADO
+# ==========================================================
+class ResultadoOutliers:
+    """
+    Guarda solo las filas con al menos un outlier:
+    `indices` (índice original) y `bits` (máscara de bits por fila).
+    """
+
+    def __init__(self, columnas, lim_inf, lim_sup, conteos, indices, bits):
+        self.columnas = list(columnas)
+        self.lim_inf = np.asarray(lim_inf, dtype=np.float64)
+        self.lim_sup = np.asarray(lim_sup, dtype=np.float64)
+        self.conteos = np.asarray(conteos, dtype=np.int64)
+        self.indices = np.asarray(indices)
+        self.bits = bits
+
+    def resumen(self) -> pd.DataFrame:
+        """Tabla columna / outliers / lim_inf / lim_sup, ordenada por outliers."""
+        return pd.DataFrame(
+            {
+                "columna": self.columnas,
+                "outliers": self.conteos,
+                "lim_inf": self.lim_inf,
+                "lim_sup": self.lim_sup,
+            }
+        ).sort_values("outliers", ascending=False)
+
+    def marcas(self) -> pd.DataFrame:
+        """Filas con outliers como tabla booleana (solo para inspección)."""
+        return pd.DataFrame(
+            desempaquetar(self.bits, len(self.columnas)),
+            index=self.indices,
+            columns=self.columnas,
+        )
+
+    def columnas_de_fila(self, indice) -> list[str]:
+        pos = np.flatnonzero(self.indices == indice)
+        if pos.size == 0:
+            return []
+        marcas = desempaquetar(self.bits[pos[:1]], len(self.columnas))[0]
+        return [c for c, m in zip(self.columnas, marcas) if m]
+
+
+# ==========================================================
+# EN MEMORIA
+# ==========================================================
+def detectar_outliers(df: pd.DataFrame, columnas: list[str] | None = None,
+                      factor: float = FACTOR_IQR) -> ResultadoOutliers:
+    """Outliers IQR de todas las columnas a la vez sobre un DataFrame."""
+    if columnas is None:
+        columnas = columnas_sin_ids(df)
+    matriz = df[columnas].to_numpy(dtype=np.float64, na_value=np.nan)
+    lim_inf, lim_sup = limites_iqr(matriz, factor)
+    marcas = marcar_outliers(matriz, lim_inf, lim_sup)
+    filas = marcas.any(axis=1)
+    return ResultadoOutliers(
+        columnas,
+        lim_inf,
+        lim_sup,
+        marcas.sum(axis=0),
+        df.index.to_numpy()[filas],
+        empaquetar(marcas[filas]),
+    )
+
+
+# ==========================================================
+# POR CHUNKS
+# ==========================================================
+def _outliers_chunks(chunks, columnas: list[str], resumen: ResumenDataset,
+                     factor: float) -> ResultadoOutliers:
+    """
+    Marca las filas de `chunks` con los límites del resumen. Los índices son
+    la posición de la fila en todo el recorrido (los chunks de cada
+    partición vuelven a empezar en 0).
+    """
+    limites = np.array([resumen.limites_iqr(c, factor) for c in columnas]).reshape(-1, 2)
+    lim_inf, lim_sup = limites[:, 0], limites[:, 1]
+
+    conteos = np.zeros(len(columnas), dtype=np.int64)
+    indices, bits = [], []
+    desplazamiento = 0
+    for chunk in chunks:
+        matriz = (
+            chunk[columnas]
+            .apply(pd.to_numeric, errors="coerce")
+            .to_numpy(dtype=np.float64, na_value=np.nan)
+        )
+        marcas = marcar_outliers(matriz, lim_inf, lim_sup)
+        conteos += marcas.sum(axis=0)
+        filas = marcas.any(axis=1)
+        if filas.any():
+            indices.append(desplazamiento + np.flatnonzero(filas))
+            bits.append(empaquetar(marcas[filas]))
+        desplazamiento += len(chunk)
+
+    ancho = (len(columnas) + 7) // 8
+    return ResultadoOutliers(
+        columnas,
+        lim_inf,
+        lim_sup,
+        conteos,
+        np.concatenate(indices) if indices else np.empty(0, dtype=np.int64),
+        np.concatenate(bits) if bits else np.empty((0, ancho), dtype=np.uint8),
+    )
+
+
+def _columnas_por_defecto(resumen: ResumenDataset) -> list[str]:
+    return [c for c in resumen.columnas_numericas if "id" not in c.lower()]
+
+
+def outliers_tabla(tabla: str, columnas: list[str] | None = None,
+                   resumen: ResumenDataset | None = None,
+                   factor: float = FACTOR_IQR, tamanio_chunk: int = TAMANIO_CHUNK,
+                   desde=None, hasta=None) -> ResultadoOutliers:
+    """
+    Outliers IQR sobre una tabla limpia (p.ej. "detalle_ventas"), leída por
+    chunks a través de modelo_datos: sirve igual para tablas particionadas
+    por mes. Con desde / hasta, solo esas particiones.
+
+    Los límites salen de los sketches de cuantiles del ResumenDataset
+    (motor_estadisticas); si ya se calculó en otra parte se puede pasar por
+    `resumen` y la tabla se recorre una sola vez más para marcar filas.
+    """
+    def chunks():
+        return chunks_tabla(tabla, tamanio_chunk, desde=desde, hasta=hasta)
+
+    if resumen is None:
+        resumen = resumir_chunks(chunks(), nombre=tabla)
+    if columnas is None:
+        columnas = _columnas_por_defecto(resumen)
+    return _outliers_chunks(chunks(), columnas, resumen, factor)
+
+
+def outliers_csv(ruta: str | Path, columnas: list[str] | None = None,
+                 resumen: ResumenDataset | None = None,
+                 factor: float = FACTOR_IQR,
+                 tamanio_chunk: int = TAMANIO_CHUNK, **kwargs) -> ResultadoOutliers:
+    """Como outliers_tabla(), para un CSV suelto (no una tabla del modelo de datos)."""
+    ruta = Path(ruta)
+    if resumen is None:
+        resumen = resumir_csv(ruta, tamanio_chunk=tamanio_chunk, **kwargs)
+    if columnas is None:
+        columnas = _columnas_por_defecto(resumen)
+    return _outliers_chunks(pd.read_csv(ruta, chunksize=tamanio_chunk, **kwargs),
+                            columnas, resumen, factor)
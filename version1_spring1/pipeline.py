@@ -0,0 +1,371 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Pipeline de la Tienda Aurelion como DAG declarativo.
+
+Cada etapa declara su script, sus archivos de entrada y sus salidas; los
+módulos del proyecto que importa el script (leídos con ast) son entradas
+también, así un cambio en un helper invalida la etapa. Las dependencias
+salen solas (una etapa depende de quien produce sus entradas), las etapas
+independientes corren en paralelo, y una etapa se saltea si el contenido de
+sus entradas y de su script no cambió desde la última corrida (hash SHA-1,
+al estilo make pero por contenido y no por fecha).
+
+Uso:
+    python pipeline.py                 # corre lo que haga falta
+    python pipeline.py --forzar        # corre todo
+    python pipeline.py --etapas modelo_original --workers 2
+    python pipeline.py --plan          # muestra qué correría, sin ejecutar
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from catalogo_datos import find_data_dir
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+DATA_DIR = find_data_dir(SCRIPT_DIR) or SCRIPT_DIR / "datos"
+LIMPIOS = DATA_DIR / "limpios"
+FIGURAS = SCRIPT_DIR / "static" / "figuras"
+RUTA_ESTADO = SCRIPT_DIR / "cache" / "pipeline_estado.json"
+
+TABLAS = ("clientes", "productos", "ventas", "detalle_ventas")
+
+
+# ==========================================================
+# DECLARACIÓN DE ETAPAS
+# ==========================================================
+def _modulo_local(nombre: str) -> Path | None:
+    """Archivo de un módulo del proyecto ('aurelion.features' -> aurelion/features.py)."""
+    base = SCRIPT_DIR.joinpath(*nombre.split("."))
+    for ruta in (base.with_suffix(".py"), base / "__init__.py"):
+        if ruta.is_file():
+            return ruta
+    return None
+
+
+def _importados(ruta: Path) -> set[str]:
+    """Módulos que importa un archivo (también los diferidos y los de dentro de funciones)."""
+    paquete = list(ruta.parent.relative_to(SCRIPT_DIR).parts)
+    nombres = set()
+    for nodo in ast.walk(ast.parse(ruta.read_text(encoding="utf-8"), str(ruta))):
+        if isinstance(nodo, ast.Import):
+            nombres.update(a.name for a in nodo.names)
+        elif isinstance(nodo, ast.ImportFrom):
+            base = paquete[:len(paquete) - nodo.level + 1] if nodo.level else []
+            modulo = ".".join(base + ([nodo.module] if nodo.module else []))
+            if modulo:
+                nombres.add(modulo)
+            # `from paquete import submodulo`
+            nombres.update(f"{modulo}.{a.name}" if modulo else a.name for a in nodo.names)
+        elif (isinstance(nodo, ast.Call) and getattr(nodo.func, "id", None) == "diferido"
+              and nodo.args and isinstance(nodo.args[0], ast.Constant)):
+            nombres.add(nodo.args[0].value)
+    # Importar 'a.b' ejecuta también a/__init__.py
+    return {".".join(n.split(".")[:i]) for n in nombres for i in range(1, n.count(".") + 2)}
+
+
+def modulos_locales(script: Path) -> list[Path]:
+    """Los archivos del proyecto que importa `script`, directa o indirectamente."""
+    vistos, pendientes = set(), [script]
+    while pendientes:
+        for nombre in _importados(pendientes.pop()):
+            ruta = _modulo_local(nombre)
+            if ruta is not None and ruta not in vistos and ruta != script:
+                vistos.add(ruta)
+                pendientes.append(ruta)
+    return sorted(vistos)
+
+
+class Etapa:
+    """
+    Un script con sus entradas y salidas (rutas o patrones glob). Los módulos
+    del proyecto que importa el script se suman solos a las entradas.
+    """
+
+    def __init__(self, nombre: str, script: str, entradas: list, salidas: list):
+        self.nombre = nombre
+        self.script = SCRIPT_DIR / script
+        self.entradas = [Path(p) for p in entradas]
+        self.entradas += [p for p in modulos_locales(self.script) if p not in self.entradas]
+        self.salidas = [Path(p) for p in salidas]
+
+    def __repr__(self):
+        return f"Etapa({self.nombre})"
+
+
+ETAPAS = [
+    Etapa(
+        "limpieza",
+        "limpieza-analisis_corregido.py",
+        entradas=[DATA_DIR / f"{t}.xlsx" for t in TABLAS],
+        # ventas y detalle se guardan particionadas por mes (carpetas)
+        salidas=[LIMPIOS / "df_clientes_limpio.csv", LIMPIOS / "df_productos_limpio.csv",
+                 LIMPIOS / "df_ventas_limpio", LIMPIOS / "df_detalle_ventas_limpio"],
+    ),
+    Etapa(
+        "crear_dataframe",
+        "crear_dataframe.py",
+        entradas=[LIMPIOS / "df_clientes_limpio.csv", LIMPIOS / "df_ventas_limpio",
+                  LIMPIOS / "df_detalle_ventas_limpio"],
+        salidas=[SCRIPT_DIR / "df_modelo_ticket_alto.csv"],
+    ),
+    Etapa(
+        "aumentar_dataframe",
+        "aumentar_dataframe.py",
+        entradas=[SCRIPT_DIR / "df_modelo_ticket_alto.csv"],
+        salidas=[SCRIPT_DIR / "df_modelo_ticket_alto_aumentado.csv"],
+    ),
+    Etapa(
+        "modelo_original",
+        "ModeloML.py",
+        entradas=[SCRIPT_DIR / "df_modelo_ticket_alto.csv"],
+        salidas=[FIGURAS / "modelo_original_*.png"],
+    ),
+    Etapa(
+        "modelo_aumentado",
+        "ModeloMLAumentado.py",
+        entradas=[SCRIPT_DIR / "df_modelo_ticket_alto_aumentado.csv"],
+        salidas=[FIGURAS / "modelo_aumentado_*.png"],
+    ),
+    Etapa(
+        "estadisticas",
+        "Estadisticas_corregido.py",
+        entradas=[LIMPIOS / "df_clientes_limpio.csv", LIMPIOS / "df_productos_limpio.csv",
+                  LIMPIOS / "df_ventas_limpio", LIMPIOS / "df_detalle_ventas_limpio"],
+        salidas=[FIGURAS / "estadisticas_*.png"],
+    ),
+]
+
+
+# ==========================================================
+# GRAFO
+# ==========================================================
+def dependencias(etapas: list[Etapa]) -> dict[str, set[str]]:
+    """nombre -> etapas que producen alguna de sus entradas."""
+    productor = {}
+    for e in etapas:
+        for s in e.salidas:
+            productor[s] = e.nombre
+    return {
+        e.nombre: {productor[p] for p in e.entradas if p in productor and productor[p] != e.nombre}
+        for e in etapas
+    }
+
+
+def orden_topologico(etapas: list[Etapa]) -> list[str]:
+    deps = dependencias(etapas)
+    orden, visitadas, en_curso = [], set(), set()
+
+    def visitar(n):
+        if n in visitadas:
+            return
+        if n in en_curso:
+            raise ValueError(f"Ciclo en el pipeline alrededor de la etapa '{n}'.")
+        en_curso.add(n)
+        for d in sorted(deps[n]):
+            visitar(d)
+        en_curso.discard(n)
+        visitadas.add(n)
+        orden.append(n)
+
+    for e in etapas:
+        visitar(e.nombre)
+    return orden
+
+
+def con_ancestros(etapas: list[Etapa], nombres: list[str]) -> list[Etapa]:
+    """Las etapas pedidas más todas las que necesitan antes."""
+    deps = dependencias(etapas)
+    elegidas, pendientes = set(), list(nombres)
+    while pendientes:
+        n = pendientes.pop()
+        if n not in deps:
+            raise ValueError(f"Etapa desconocida: '{n}'. Disponibles: {', '.join(deps)}")
+        if n not in elegidas:
+            elegidas.add(n)
+            pendientes.extend(deps[n])
+    return [e for e in etapas if e.nombre in elegidas]
+
+
+# ==========================================================
+# HASHES Y ESTADO
+# ==========================================================
+def _sha1_archivo(ruta: Path) -> str:
+    h = hashlib.sha1()
+    with open(ruta, "rb") as f:
+        for parte in iter(lambda: f.read(1 << 20), b""):
+            h.update(parte)
+    return h.hexdigest()
+
+
+def _sha1_ruta(ruta: Path) -> str:
+    """Hash de un archivo, o de todos los archivos de una carpeta (particiones)."""
+    if ruta.is_file():
+        return _sha1_archivo(ruta)
+    h = hashlib.sha1()
+    for p in sorted(q for q in ruta.rglob("*") if q.is_file()):
+        h.update(p.relative_to(ruta).as_posix().encode())
+        h.update(_sha1_archivo(p).encode())
+    return h.hexdigest()
+
+
+def huella_etapa(etapa: Etapa) -> str | None:
+    """Hash del script + entradas. None si falta alguna entrada."""
+    h = hashlib.sha1(_sha1_archivo(etapa.script).encode())
+    for p in etapa.entradas:
+        if not p.exists():
+            return None
+        h.update(str(p).encode())
+        h.update(_sha1_ruta(p).encode())
+    return h.hexdigest()
+
+
+def salidas_presentes(etapa: Etapa) -> bool:
+    for s in etapa.salidas:
+        if any(c in s.name for c in "*?["):
+            if not any(s.parent.glob(s.name)):
+                return False
+        elif not s.exists():
+            return False
+    return True
+
+
+def cargar_estado(ruta: Path = RUTA_ESTADO) -> dict:
+    try:
+        return json.loads(ruta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_estado(estado: dict, ruta: Path = RUTA_ESTADO):
+    """Escribe aparte y reemplaza: una corrida cortada no deja el JSON a medias."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.tmp")
+    temporal.write_text(json.dumps(estado, indent=2), encoding="utf-8")
+    os.replace(temporal, ruta)
+
+
+# ==========================================================
+# EJECUCIÓN
+# ==========================================================
+def ejecutar_etapa(etapa: Etapa) -> tuple[int, str, float]:
+    env = os.environ.copy()
+    env["PYTHONIOENCODING"] = "utf-8"
+    env.setdefault("MPLBACKEND", "Agg")
+    inicio = time.perf_counter()
+    resultado = subprocess.run(
+        [sys.executable, str(etapa.script)],
+        cwd=SCRIPT_DIR,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        env=env,
+    )
+    salida = resultado.stdout
+    if resultado.stderr:
+        salida += "\n[STDERR]\n" + resultado.stderr
+    return resultado.returncode, salida, time.perf_counter() - inicio
+
+
+def correr_pipeline(etapas: list[Etapa] | None = None, forzar: bool = False,
+                    workers: int | None = None, solo_plan: bool = False,
+                    verbose: bool = True) -> dict[str, str]:
+    """
+    Corre el DAG. Devuelve nombre -> 'ok' | 'salteada' | 'error' | 'bloqueada'.
+    Una etapa se decide recién cuando terminaron sus dependencias, así la
+    huella de sus entradas ya refleja lo que produjo la etapa anterior.
+    """
+    etapas = etapas or ETAPAS
+    por_nombre = {e.nombre: e for e in etapas}
+    deps = dependencias(etapas)
+    orden_topologico(etapas)  # valida que no haya ciclos
+    estado = cargar_estado()
+    resultado: dict[str, str] = {}
+
+    if solo_plan:
+        for n in orden_topologico(etapas):
+            e = por_nombre[n]
+            huella = huella_etapa(e)
+            al_dia = (not forzar and huella is not None and estado.get(n) == huella
+                      and salidas_presentes(e))
+            aguas_arriba = [d for d in deps[n] if resultado.get(d) == "correría"]
+            resultado[n] = "correría" if (not al_dia or aguas_arriba) else "salteada"
+            print(f"  {'▶' if resultado[n] == 'correría' else '⏭'} {n}  "
+                  f"(depende de: {', '.join(sorted(deps[n])) or '-'})")
+        return resultado
+
+    pendientes = set(por_nombre)
+    en_curso = {}
+    with ThreadPoolExecutor(max_workers=workers) as ejecutor:
+        while pendientes or en_curso:
+            for n in sorted(pendientes):
+                if not deps[n] <= resultado.keys():
+                    continue
+                pendientes.discard(n)
+                if any(resultado[d] in ("error", "bloqueada") for d in deps[n]):
+                    resultado[n] = "bloqueada"
+                    print(f"⛔ {n}: bloqueada (falló una etapa anterior)")
+                    continue
+                e = por_nombre[n]
+                huella = huella_etapa(e)
+                if not forzar and huella is not None and estado.get(n) == huella and salidas_presentes(e):
+                    resultado[n] = "salteada"
+                    print(f"⏭  {n}: sin cambios en entradas, se saltea")
+                    continue
+                print(f"▶  {n}: ejecutando {e.script.name}")
+                en_curso[ejecutor.submit(ejecutar_etapa, e)] = n
+
+            if not en_curso:
+                continue
+            hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for fut in hechos:
+                n = en_curso.pop(fut)
+                codigo, salida, segundos = fut.result()
+                if verbose:
+                    print(f"\n{'='*60}\n📄 Salida de {n}\n{'='*60}\n{salida}")
+                if codigo == 0:
+                    resultado[n] = "ok"
+                    estado[n] = huella_etapa(por_nombre[n])
+                    guardar_estado(estado)
+                    print(f"✅ {n}: terminada en {segundos:.1f}s")
+                else:
+                    resultado[n] = "error"
+                    estado.pop(n, None)
+                    guardar_estado(estado)
+                    print(f"❌ {n}: terminó con código {codigo}")
+    return resultado
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pipeline de la Tienda Aurelion")
+    parser.add_argument("--etapas", nargs="*", help="Etapas objetivo (incluye sus dependencias)")
+    parser.add_argument("--forzar", action="store_true", help="Ignorar la caché y correr todo")
+    parser.add_argument("--workers", type=int, default=None, help="Etapas en paralelo")
+    parser.add_argument("--plan", action="store_true", help="Mostrar el plan sin ejecutar")
+    args = parser.parse_args(argv)
+
+    etapas = con_ancestros(ETAPAS, args.etapas) if args.etapas else ETAPAS
+    print("\n--- 🔧 PIPELINE TIENDA AURELION ---")
+    resultado = correr_pipeline(etapas, forzar=args.forzar, workers=args.workers,
+                                solo_plan=args.plan)
+    print("\nResumen:")
+    for n in orden_topologico(etapas):
+        print(f"  - {n}: {resultado.get(n, '-')}")
+    return 0 if "error" not in resultado.values() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
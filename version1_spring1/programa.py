@@ -11,14 +11,19 @@
 #   5. Estadísticas descriptivas (Sprint 2)
 #   6. Entrenar modelos (dataset original)
 #   7. Entrenar modelos (dataset aumentado)
-#   8. Salir
+#   8. Pipeline completo (solo recalcula lo que cambió)
+#   9. Salir
 # ===============================================
 
 import os
-import numpy as np
 import subprocess
 import sys
 
+from importacion_diferida import diferido
+
+# numpy solo lo usa la sección 3: se importa al entrar ahí, no al abrir el menú
+np = diferido("numpy")
+
 # Carpeta donde está este archivo programa.py
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -79,19 +84,17 @@ def seccion_2():
 
     print("3) VENTAS")
     print("   - id_venta")
-    print("   - id_cliente")
     print("   - fecha")
-    print("   - nombre_cliente (redundante, para análisis)")
-    print("   - email (redundante, para análisis)")
-    print("   - medio_pago\n")
+    print("   - id_cliente")
+    print("   - medio_pago")
+    print("   (nombre_cliente y email se traen de CLIENTES por id_cliente)\n")
 
     print("4) DETALLE_VENTAS")
     print("   - id_venta")
     print("   - id_producto")
-    print("   - nombre_producto")
     print("   - cantidad")
-    print("   - precio_unitario")
-    print("   - importe\n")
+    print("   - importe")
+    print("   (nombre_producto y precio_unitario se traen de PRODUCTOS por id_producto)\n")
 
     print("A partir de estas tablas se construye un dataframe a nivel ticket,")
     print("que permite estudiar el importe total por venta y definir si un ticket")
@@ -142,19 +145,20 @@ def mostrar_menu():
     print("5. Estadísticas Descriptivas (Sprint2)")
     print("6. Entrenar modelos (dataset original)")
     print("7. Entrenar modelos (dataset aumentado)")
-    print("8. Salir")
+    print("8. Pipeline completo (solo lo que cambió)")
+    print("9. Salir")
     print("==============================")
 
 
 def main():
     opcion = 0
 
-    while opcion != 8:
+    while opcion != 9:
         mostrar_menu()
         try:
-            opcion = int(input("Seleccione una opción (1-8): "))
+            opcion = int(input("Seleccione una opción (1-9): "))
         except ValueError:
-            print("Por favor ingrese un número del 1 al 8.")
+            print("Por favor ingrese un número del 1 al 9.")
             continue
 
         if opcion == 1:
@@ -180,6 +184,10 @@ def main():
             ruta_script = os.path.join(SCRIPT_DIR, "ModeloMLAumentado.py")
             subprocess.run([sys.executable, ruta_script])
         elif opcion == 8:
+            # Limpieza -> dataframe -> aumento -> modelos / estadísticas
+            ruta_script = os.path.join(SCRIPT_DIR, "pipeline.py")
+            subprocess.run([sys.executable, ruta_script])
+        elif opcion == 9:
             print("\nGracias por usar el programa Tienda Aurelion. ¡Hasta pronto!")
         else:
             print("Opción no válida. Intente nuevamente.")
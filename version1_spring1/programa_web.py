@@ -1,14 +1,67 @@
+import functools
+import io
 import os
-import sys
 import subprocess
-import numpy as np
-from flask import Flask, render_template_string
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+
+# El servidor no abre ventanas. Por variable de entorno (y no matplotlib.use)
+# para no importar matplotlib al arrancar: se carga recién al graficar
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+from flask import Flask, jsonify, request
+
+from almacen_datasets import AlmacenDatasets
+from cache_estatico import CacheEstatico
+from figuras import asegurar_miniatura, tamanio_imagen
+from importacion_diferida import diferido
+
+# Se cargan en el primer uso (arranque del servidor en ~0,2 s en vez de ~0,8 s)
+asyncio = diferido("asyncio")
+np = diferido("numpy")
 
 app = Flask(__name__)
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 CARPETA_FIGURAS = os.path.join(SCRIPT_DIR, "static", "figuras")
 
+# Datasets limpios cargados una sola vez por proceso (se recargan si cambian)
+ALMACEN = AlmacenDatasets()
+
+# Páginas informativas y figuras servidas desde memoria, comprimidas y con ETag
+CACHE = CacheEstatico()
+
+# pyplot guarda la figura actual en un estado global: los análisis que
+# dibujan van de a uno (los demás corren en paralelo)
+_LOCK_FIGURAS = threading.Lock()
+
+# Trabajos pesados (scripts, modelos) simultáneos por proceso. Si el cupo está
+# lleno se responde 503 enseguida en lugar de dejar la petición colgada.
+MAX_TRABAJOS_PESADOS = int(os.environ.get("AURELION_MAX_TRABAJOS", "2"))
+EJECUTOR = ThreadPoolExecutor(max_workers=MAX_TRABAJOS_PESADOS, thread_name_prefix="pesado")
+_CUPO = threading.BoundedSemaphore(MAX_TRABAJOS_PESADOS)
+
+# Resultados de análisis en proceso: clave -> (firma de los datos, salida)
+_RESULTADOS: dict[str, tuple] = {}
+_LOCK_RESULTADOS = threading.Lock()
+# Trabajos en curso: si dos peticiones piden lo mismo, esperan el mismo trabajo
+_EN_CURSO: dict[str, Future] = {}
+_LOCK_EN_CURSO = threading.Lock()
+
+# Índice de recomendaciones y monitor de tickets (se arman en la primera consulta)
+_RECOMENDACIONES = None
+_MONITOR_TICKETS = None
+_LOCK_SERVICIOS = threading.Lock()
+TABLAS_RECOMENDACIONES = ("ventas", "detalle_ventas", "productos")
+TABLAS_MONITOR = ("ventas", "detalle_ventas", "clientes")
+
+
+class ServidorOcupado(Exception):
+    pass
+
 
 # =====================================================
 # Ejecutar scripts hijo (UTF-8)
@@ -20,21 +73,259 @@ def ejecutar_script(nombre_archivo: str) -> str:
 
     env = os.environ.copy()
     env["PYTHONIOENCODING"] = "utf-8"
+    env.setdefault("MPLBACKEND", "Agg")
 
-    resultado = subprocess.run(
+    proceso = subprocess.run(
         [sys.executable, ruta],
         capture_output=True,
-        text=True,
-        encoding="utf-8",
+        cwd=SCRIPT_DIR,
         env=env,
     )
+    salida = proceso.stdout.decode("utf-8", errors="replace")
+    if proceso.stderr:
+        salida += "\n\n[STDERR]\n" + proceso.stderr.decode("utf-8", errors="replace")
+    return salida
+
+
+# =====================================================
+# Ejecutar análisis dentro del proceso (con el almacén)
+# =====================================================
+class _SalidaPorHilo:
+    """
+    sys.stdout que escribe en el buffer del trabajo que corre en el hilo
+    actual, o en la salida original si el hilo no está capturando. Así cada
+    trabajo captura solo lo suyo aunque corran varios a la vez
+    (redirect_stdout cambia sys.stdout para todo el proceso).
+    """
+
+    def __init__(self, original):
+        self._original = original
+        self._local = threading.local()
+
+    def __getattr__(self, nombre):
+        return getattr(self._original, nombre)
+
+    def _destino(self):
+        buffer = getattr(self._local, "buffer", None)
+        return self._original if buffer is None else buffer
+
+    def write(self, texto):
+        return self._destino().write(texto)
+
+    def flush(self):
+        self._destino().flush()
+
+    @contextmanager
+    def capturar(self):
+        buffer = io.StringIO()
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+
+
+_LOCK_STDOUT = threading.Lock()
+
+
+def _salida_por_hilo() -> _SalidaPorHilo:
+    with _LOCK_STDOUT:
+        if not isinstance(sys.stdout, _SalidaPorHilo):
+            sys.stdout = _SalidaPorHilo(sys.stdout)
+        return sys.stdout
+
+
+def ejecutar_en_proceso(funcion, *args, **kwargs) -> str:
+    """Corre `funcion` capturando lo que imprime (en este hilo), igual que ejecutar_script."""
+    with _salida_por_hilo().capturar() as buffer:
+        try:
+            funcion(*args, **kwargs)
+        except Exception as e:
+            print(f"\n\n[ERROR]\n{type(e).__name__}: {e}")
+    return buffer.getvalue()
+
 
-    salida = resultado.stdout
-    if resultado.stderr:
-        salida += "\n\n[STDERR]\n" + resultado.stderr
+# =====================================================
+# Trabajos pesados: cupo, ejecutor y caché
+# =====================================================
+async def trabajo_pesado(clave: str, funcion, *args):
+    """
+    Corre `funcion(*args)` en un hilo del ejecutor respetando el cupo de
+    trabajos pesados; la petición espera sin ocupar su event loop.
+    Peticiones simultáneas con la misma clave comparten el mismo resultado.
+    """
+    with _LOCK_EN_CURSO:
+        futuro = _EN_CURSO.get(clave)
+        if futuro is None:
+            if not _CUPO.acquire(blocking=False):
+                raise ServidorOcupado(clave)
+            futuro = EJECUTOR.submit(_correr_trabajo, clave, funcion, *args)
+            _EN_CURSO[clave] = futuro
+    return await asyncio.wrap_future(futuro)
+
+
+def _correr_trabajo(clave: str, funcion, *args):
+    try:
+        return funcion(*args)
+    finally:
+        with _LOCK_EN_CURSO:
+            _EN_CURSO.pop(clave, None)
+        _CUPO.release()
+
+
+def _analizar(clave: str, funcion, figuras: bool) -> str:
+    # La firma se toma antes, con todo cargado: la salida es de estos datos
+    _, firma = ALMACEN.instantanea()
+    with _LOCK_FIGURAS if figuras else nullcontext():
+        salida = ejecutar_en_proceso(funcion)
+    # Si algo se recargó mientras corría, la salida pudo mezclar versiones
+    if ALMACEN.firma() == firma:
+        with _LOCK_RESULTADOS:
+            _RESULTADOS[clave] = (firma, salida)
     return salida
 
 
+async def analisis_cacheado(clave: str, funcion, figuras: bool = False) -> str:
+    """
+    Salida de un análisis en proceso, reutilizada mientras los datos no
+    cambien. figuras=True para los análisis que dibujan con pyplot.
+    """
+    firma = ALMACEN.firma()
+    with _LOCK_RESULTADOS:
+        cacheado = _RESULTADOS.get(clave)
+    if cacheado is not None and cacheado[0] == firma:
+        return cacheado[1]
+    return await trabajo_pesado(clave, _analizar, clave, funcion, figuras)
+
+
+def pagina_ocupado():
+    html = f"""
+    <h2>Servidor ocupado</h2>
+    <p>Ya hay {MAX_TRABAJOS_PESADOS} trabajos pesados en curso. Probá de nuevo en unos segundos.</p>
+    """
+    return render_pagina("Ocupado", html), 503, {"Retry-After": "10"}
+
+
+def _estadisticas_en_proceso():
+    import Estadisticas_corregido
+
+    Estadisticas_corregido.run_desde_dataframes(ALMACEN.vistas())
+
+
+def _modelo_original_en_proceso():
+    import ModeloML
+    from crear_dataframe import construir_df_modelo
+
+    df_modelo = construir_df_modelo(
+        ALMACEN.vista("clientes"), ALMACEN.vista("ventas"), ALMACEN.vista("detalle_ventas")
+    )
+    ModeloML.entrenar_desde_dataframe(df_modelo)
+
+
+def _modelo_aumentado_en_proceso():
+    import ModeloMLAumentado
+    from aurelion.features import aumentar
+    from crear_dataframe import construir_df_modelo
+
+    df_modelo = construir_df_modelo(
+        ALMACEN.vista("clientes"), ALMACEN.vista("ventas"), ALMACEN.vista("detalle_ventas")
+    )
+    ModeloMLAumentado.entrenar_desde_dataframe(aumentar(df_modelo))
+
+
+def _clientes_en_proceso():
+    from aurelion.clientes import FeaturesClientes
+    from aurelion.features import agregar_tickets
+    from features_clientes import imprimir_resumen
+
+    tickets = agregar_tickets(ALMACEN.vista("detalle_ventas"))
+    imprimir_resumen(FeaturesClientes.desde_tablas(ALMACEN.vista("ventas"), tickets))
+
+
+def _servicio_recomendaciones():
+    global _RECOMENDACIONES
+    if _RECOMENDACIONES is None:
+        with _LOCK_SERVICIOS:
+            if _RECOMENDACIONES is None:
+                from recomendaciones import ServicioRecomendaciones
+
+                _RECOMENDACIONES = ServicioRecomendaciones()
+    return _RECOMENDACIONES
+
+
+def _refrescar_recomendaciones():
+    vistas, firma = ALMACEN.instantanea(TABLAS_RECOMENDACIONES)
+    _servicio_recomendaciones().refrescar(*vistas.values(), firma=firma)
+
+
+async def servicio_recomendaciones():
+    """
+    Servicio de recomendaciones al día con el almacén. El armado (o el
+    refresco incremental) corre en el ejecutor, con el cupo de trabajos pesados.
+    """
+    servicio = _servicio_recomendaciones()
+    # Solo las tablas que lee: que otra ruta cargue otro dataset no lo refresca
+    if not servicio.vigente(ALMACEN.firma(TABLAS_RECOMENDACIONES)):
+        await trabajo_pesado("recomendaciones", _refrescar_recomendaciones)
+    return servicio
+
+
+def _monitor_tickets():
+    global _MONITOR_TICKETS
+    if _MONITOR_TICKETS is None:
+        with _LOCK_SERVICIOS:
+            if _MONITOR_TICKETS is None:
+                from monitor_tickets import MonitorTickets
+
+                _MONITOR_TICKETS = MonitorTickets()
+    return _MONITOR_TICKETS
+
+
+def _reproducir_monitor():
+    vistas, firma = ALMACEN.instantanea(TABLAS_MONITOR)
+    _monitor_tickets().reproducir(*vistas.values(), firma=firma)
+
+
+async def monitor_tickets():
+    """
+    Monitor de tickets alimentado con la historia del almacén; después,
+    tickets en vivo. Reproducir la historia corre en el ejecutor.
+    """
+    monitor = _monitor_tickets()
+    if not monitor.vigente(ALMACEN.firma(TABLAS_MONITOR)):
+        await trabajo_pesado("monitor_tickets", _reproducir_monitor)
+    return monitor
+
+
+def _canasta_en_proceso():
+    import analisis_canasta
+
+    analisis_canasta.imprimir_resumen(ALMACEN.vista("detalle_ventas"), ALMACEN.vista("productos"))
+
+
+def _pronosticos_en_proceso():
+    import pronosticos
+
+    nombres = (ALMACEN.vista("productos").set_index("id_producto")["nombre_producto"]
+               .astype(str).to_dict())
+    lineas = pronosticos.unir_lineas(ALMACEN.vista("detalle_ventas"), ALMACEN.vista("ventas"),
+                                     ALMACEN.vista("clientes"))
+    pronosticos.imprimir_resumen(lineas, "producto", nombres=nombres)
+    print()
+    pronosticos.imprimir_resumen(lineas, "ciudad")
+
+
+def _segmentos_en_proceso():
+    import segmentacion
+    from aurelion.segmentos import AcumuladorClientes
+
+    acumulador = AcumuladorClientes()
+    acumulador.agregar(segmentacion.tickets_clientes(ALMACEN.vista("ventas"), ALMACEN.vista("detalle_ventas")))
+    features = acumulador.features(ALMACEN.vista("clientes"))
+    segmentador, etiquetas = segmentacion.segmentar(features)
+    segmentacion.imprimir_resumen(features, segmentador, etiquetas)
+
+
 # =====================================================
 # Plantilla base HTML
 # =====================================================
@@ -94,6 +385,15 @@ BASE_HTML = """
         border-radius: 10px;
         box-shadow: 0 0 5px rgba(0,0,0,0.2);
     }
+    .galeria {
+        display: flex;
+        flex-wrap: wrap;
+        gap: 1rem;
+    }
+    .galeria img.miniatura {
+        height: auto;
+        margin: 0;
+    }
   </style>
 </head>
 <body>
@@ -108,6 +408,11 @@ BASE_HTML = """
     <a href="{{ url_for('numpy_demo') }}">NumPy</a>
     <a href="{{ url_for('limpieza') }}">Limpieza</a>
     <a href="{{ url_for('estadisticas') }}">Estadísticas</a>
+    <a href="{{ url_for('clientes') }}">Clientes</a>
+    <a href="{{ url_for('segmentos') }}">Segmentos</a>
+    <a href="{{ url_for('canasta') }}">Canasta</a>
+    <a href="{{ url_for('anomalias') }}">Anomalías</a>
+    <a href="{{ url_for('pronosticos') }}">Pronósticos</a>
     <a href="{{ url_for('modelo_original') }}">Modelo Original</a>
     <a href="{{ url_for('modelo_aumentado') }}">Modelo Aumentado</a>
   </nav>
@@ -120,14 +425,55 @@ BASE_HTML = """
 """
 
 
+# La plantilla se compila una sola vez (render_template_string la recompila siempre)
+_PLANTILLA_BASE = app.jinja_env.from_string(BASE_HTML)
+
+
 def render_pagina(titulo: str, contenido_html: str):
-    return render_template_string(BASE_HTML, titulo=titulo, contenido=contenido_html)
+    return _PLANTILLA_BASE.render(titulo=titulo, contenido=contenido_html)
+
+
+def html_figuras(prefijo: str) -> str:
+    """
+    Galería de miniaturas (WebP, carga diferida); cada una enlaza a la figura
+    completa, que el navegador pide solo si se abre.
+    """
+    if not os.path.isdir(CARPETA_FIGURAS):
+        return ""
+    partes = []
+    for f in sorted(os.listdir(CARPETA_FIGURAS)):
+        if not (f.startswith(prefijo) and f.lower().endswith(".png")):
+            continue
+        ruta = os.path.join(CARPETA_FIGURAS, f)
+        mini = asegurar_miniatura(ruta).name
+        ancho, alto = tamanio_imagen(os.path.join(CARPETA_FIGURAS, "miniaturas", mini))
+        partes.append(
+            f'<a href="/static/figuras/{f}" target="_blank" title="{f}">'
+            f'<img class="miniatura" src="/static/figuras/miniaturas/{mini}" alt="{f}" '
+            f'width="{ancho}" height="{alto}" loading="lazy" decoding="async"></a>'
+        )
+    return f'<div class="galeria">{"".join(partes)}</div>' if partes else ""
+
+
+def pagina_estatica(vista):
+    """La vista se ejecuta una vez; después se sirve la copia comprimida de CACHE."""
+    @functools.wraps(vista)
+    def envoltura():
+        return CACHE.pagina(vista.__name__, vista)
+    return envoltura
+
+
+# Tiene prioridad sobre /static/<path> de Flask (la regla es más específica)
+@app.route("/static/figuras/<path:nombre>")
+def figura(nombre):
+    return CACHE.archivo(CARPETA_FIGURAS, nombre)
 
 
 # =====================================================
 # RUTAS “TEÓRICAS”
 # =====================================================
 @app.route("/")
+@pagina_estatica
 def index():
     html = """
     <h2>Bienvenido al Dashboard de la Tienda Aurelion</h2>
@@ -145,6 +491,7 @@ def index():
 
 
 @app.route("/historia")
+@pagina_estatica
 def historia():
     html = """
     <h2>Historia, problema y solución</h2>
@@ -173,6 +520,7 @@ def historia():
 
 
 @app.route("/estructura")
+@pagina_estatica
 def estructura():
     html = """
     <h2>Estructura de los datos</h2>
@@ -195,21 +543,20 @@ def estructura():
     <h3>3) VENTAS</h3>
     <ul>
       <li>id_venta</li>
-      <li>id_cliente</li>
       <li>fecha</li>
-      <li>nombre_cliente</li>
-      <li>email</li>
+      <li>id_cliente</li>
       <li>medio_pago</li>
     </ul>
+    <p>nombre_cliente y email no se guardan en ventas: se traen de CLIENTES por id_cliente.</p>
     <h3>4) DETALLE_VENTAS</h3>
     <ul>
       <li>id_venta</li>
       <li>id_producto</li>
-      <li>nombre_producto</li>
       <li>cantidad</li>
-      <li>precio_unitario</li>
       <li>importe</li>
     </ul>
+    <p>nombre_producto y precio_unitario no se guardan en el detalle: se traen de PRODUCTOS por id_producto.</p>
+    <p>Ventas y detalle se guardan particionados por mes; ciudad, categoria y medio_pago, como códigos de un diccionario.</p>
     """
     return render_pagina("Estructura de datos", html)
 
@@ -250,9 +597,14 @@ def numpy_demo():
 # =====================================================
 # RUTAS QUE EJECUTAN SCRIPTS
 # =====================================================
+@app.errorhandler(ServidorOcupado)
+def servidor_ocupado(_error):
+    return pagina_ocupado()
+
+
 @app.route("/limpieza")
-def limpieza():
-    salida = ejecutar_script("limpieza-analisis_corregido.py")
+async def limpieza():
+    salida = await trabajo_pesado("limpieza", ejecutar_script, "limpieza-analisis_corregido.py")
     html = f"""
     <h2>Limpieza y análisis (Sprint 2)</h2>
     <p>Salida del script <code>limpieza-analisis_corregido.py</code>:</p>
@@ -263,22 +615,14 @@ def limpieza():
 
 
 @app.route("/estadisticas")
-def estadisticas():
-    salida = ejecutar_script("Estadisticas_corregido.py")
+async def estadisticas():
+    salida = await analisis_cacheado("estadisticas", _estadisticas_en_proceso, figuras=True)
 
-    figuras = []
-    if os.path.isdir(CARPETA_FIGURAS):
-        for f in sorted(os.listdir(CARPETA_FIGURAS)):
-            if f.startswith("estadisticas_") and f.lower().endswith(".png"):
-                figuras.append(f)
-
-    html_imgs = "".join(
-        f'<img src="/static/figuras/{f}" alt="{f}">' for f in figuras
-    )
+    html_imgs = html_figuras("estadisticas_")
 
     html = f"""
     <h2>Estadísticas descriptivas (Sprint 2)</h2>
-    <p>Salida del script <code>Estadisticas_corregido.py</code>:</p>
+    <p>Salida de <code>Estadisticas_corregido.py</code> (datos del almacén en memoria):</p>
     <pre>{salida}</pre>
     <h3>Figuras generadas</h3>
     {html_imgs or "<p>No se encontraron figuras (revisá la carpeta static/figuras).</p>"}
@@ -286,19 +630,105 @@ def estadisticas():
     return render_pagina("Estadísticas", html)
 
 
-@app.route("/modelo_original")
-def modelo_original():
-    salida = ejecutar_script("ModeloML.py")
+@app.route("/clientes")
+async def clientes():
+    salida = await analisis_cacheado("clientes", _clientes_en_proceso)
+    html = f"""
+    <h2>Clientes: recencia, frecuencia y monto (RFM)</h2>
+    <p>Historia de compras por cliente (<code>features_clientes.py</code>), la misma
+    que usa el modelo de ticket alto:</p>
+    <pre>{salida}</pre>
+    """
+    return render_pagina("Clientes", html)
 
-    figuras = []
-    if os.path.isdir(CARPETA_FIGURAS):
-        for f in sorted(os.listdir(CARPETA_FIGURAS)):
-            if f.startswith("modelo_original_") and f.lower().endswith(".png"):
-                figuras.append(f)
 
-    html_imgs = "".join(
-        f'<img src="/static/figuras/{f}" alt="{f}">' for f in figuras
-    )
+@app.route("/segmentos")
+async def segmentos():
+    salida = await analisis_cacheado("segmentos", _segmentos_en_proceso)
+    html = f"""
+    <h2>Segmentos de clientes</h2>
+    <p>Clientes agrupados por gasto, frecuencia, tamaño de canasta, medio de pago
+    y ciudad con k-means por mini-lotes (<code>segmentacion.py</code>). Los
+    clientes nuevos se asignan a los segmentos ya guardados:</p>
+    <pre>{salida}</pre>
+    """
+    return render_pagina("Segmentos", html)
+
+
+@app.route("/canasta")
+async def canasta():
+    salida = await analisis_cacheado("canasta", _canasta_en_proceso)
+    html = f"""
+    <h2>Productos comprados juntos</h2>
+    <p>Pares, conjuntos frecuentes y reglas de asociación sobre el detalle de
+    ventas (<code>analisis_canasta.py</code>), para sugerir productos en la venta:</p>
+    <pre>{salida}</pre>
+    """
+    return render_pagina("Canasta", html)
+
+
+@app.route("/recomendar/<int:id_cliente>")
+async def recomendar(id_cliente):
+    """Productos sugeridos para un cliente (JSON), desde el índice en memoria."""
+    n = max(1, min(request.args.get("n", 5, type=int), 50))
+    servicio = await servicio_recomendaciones()
+    return jsonify(servicio.recomendar(id_cliente, n))
+
+
+@app.route("/tickets/puntuar", methods=["POST"])
+async def puntuar_ticket():
+    """Puntúa un ticket nuevo (JSON) y lo suma al monitor; devuelve si es sospechoso y por qué."""
+    monitor = await monitor_tickets()
+    try:
+        ticket = monitor.ticket_desde_json(request.get_json(force=True))
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"error": f"Ticket inválido: {e}"}), 400
+    inicio = time.perf_counter()
+    resultado = monitor.procesar(ticket)
+    return jsonify({
+        "id_venta": resultado.id_venta,
+        "sospechoso": resultado.sospechoso,
+        "motivos": list(resultado.motivos),
+        "z_importe": None if resultado.z_importe != resultado.z_importe else round(resultado.z_importe, 3),
+        "prob_medio": None if resultado.prob_medio != resultado.prob_medio else round(resultado.prob_medio, 4),
+        "repetido_de": resultado.repetido_de,
+        "us": round((time.perf_counter() - inicio) * 1e6, 1),
+    })
+
+
+@app.route("/anomalias")
+async def anomalias():
+    from monitor_tickets import imprimir_resumen
+
+    salida = ejecutar_en_proceso(imprimir_resumen, await monitor_tickets(), ultimos=50)
+    html = f"""
+    <h2>Tickets sospechosos</h2>
+    <p>Cada ticket se evalúa al llegar, con lo visto antes: importe que no cuadra
+    con sus productos, tickets idénticos repetidos y medios de pago raros en la
+    ciudad (<code>monitor_tickets.py</code>). Los tickets nuevos llegan por
+    <code>POST /tickets/puntuar</code>:</p>
+    <pre>{salida}</pre>
+    """
+    return render_pagina("Anomalías", html)
+
+
+@app.route("/pronosticos")
+async def pronosticos():
+    salida = await analisis_cacheado("pronosticos", _pronosticos_en_proceso)
+    html = f"""
+    <h2>Pronóstico de ventas</h2>
+    <p>Ventas diarias por producto y por ciudad: backtest de origen móvil de cada
+    modelo y pronóstico de la próxima semana (<code>pronosticos.py</code>):</p>
+    <pre>{salida}</pre>
+    """
+    return render_pagina("Pronósticos", html)
+
+
+@app.route("/modelo_original")
+async def modelo_original():
+    salida = await analisis_cacheado("modelo_original", _modelo_original_en_proceso, figuras=True)
+
+    html_imgs = html_figuras("modelo_original_")
 
     html = f"""
     <h2>Modelo de Machine Learning (dataset original)</h2>
@@ -310,18 +740,11 @@ def modelo_original():
 
 
 @app.route("/modelo_aumentado")
-def modelo_aumentado():
-    salida = ejecutar_script("ModeloMLAumentado.py")
+async def modelo_aumentado():
+    salida = await analisis_cacheado("modelo_aumentado", _modelo_aumentado_en_proceso,
+                                     figuras=True)
 
-    figuras = []
-    if os.path.isdir(CARPETA_FIGURAS):
-        for f in sorted(os.listdir(CARPETA_FIGURAS)):
-            if f.startswith("modelo_aumentado_") and f.lower().endswith(".png"):
-                figuras.append(f)
-
-    html_imgs = "".join(
-        f'<img src="/static/figuras/{f}" alt="{f}">' for f in figuras
-    )
+    html_imgs = html_figuras("modelo_aumentado_")
 
     html = f"""
     <h2>Modelo de Machine Learning (dataset aumentado)</h2>
@@ -336,6 +759,8 @@ def modelo_aumentado():
 # MAIN
 # =====================================================
 if __name__ == "__main__":
+    # Modo desarrollo. En producción: python servidor_asgi.py --workers 4
     # Aseguramos que exista la carpeta de figuras
     os.makedirs(CARPETA_FIGURAS, exist_ok=True)
+    ALMACEN.vigilar()
     app.run(debug=True)
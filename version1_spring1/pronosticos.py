@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Pronóstico de ventas diarias por producto, por ciudad o total, con backtest
+de origen móvil para comparar los modelos (cálculos en aurelion.pronostico).
+
+    python pronosticos.py [--nivel producto|ciudad|total] [--valor importe|cantidad]
+                          [--h 7] [--origenes 4] [--modelo suavizado_exponencial]
+"""
+
+import time
+
+import pandas as pd
+
+from aurelion.pronostico import HORIZONTE, MODELOS, backtest, pronosticar, series_diarias
+from modelo_datos import leer_tabla
+
+NIVELES = {"producto": "id_producto", "ciudad": "ciudad", "total": None}
+TOP = 5
+
+
+def unir_lineas(df_detalle: pd.DataFrame, df_ventas: pd.DataFrame,
+                df_clientes: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Detalle con la fecha de su venta (y la ciudad del cliente si se pasa clientes)."""
+    df = df_detalle.merge(df_ventas[["id_venta", "fecha", "id_cliente"]], on="id_venta", how="inner")
+    if df_clientes is not None:
+        df = df.merge(df_clientes[["id_cliente", "ciudad"]], on="id_cliente", how="left")
+    return df
+
+
+def lineas_de_venta(nivel: str = "producto", desde=None, hasta=None) -> pd.DataFrame:
+    return unir_lineas(
+        leer_tabla("detalle_ventas", ["id_venta", "id_producto", "cantidad", "importe"],
+                   desde=desde, hasta=hasta),
+        leer_tabla("ventas", ["id_venta", "fecha", "id_cliente"], desde=desde, hasta=hasta),
+        leer_tabla("clientes", ["id_cliente", "ciudad"]) if nivel == "ciudad" else None,
+    )
+
+
+def imprimir_resumen(lineas: pd.DataFrame, nivel: str = "producto", valor: str = "importe",
+                     h: int = HORIZONTE, n_origenes: int = 4,
+                     modelo: str = "suavizado_exponencial", top: int = TOP,
+                     nombres: dict | None = None):
+    inicio = time.perf_counter()
+    series = series_diarias(lineas, NIVELES[nivel], valor)
+    print(f"📈 {series} ({valor} por {nivel}) en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+    if not len(series.claves):
+        print("   (sin ventas)")
+        return
+
+    # --- Backtest ---
+    detalle, resumen = backtest(series, h=h, n_origenes=n_origenes)
+    if resumen.empty:
+        print("   (historia insuficiente para el backtest)")
+    else:
+        print(f"\n🧪 Backtest: {resumen['origenes'].iloc[0]} orígenes de {h} días "
+              f"(desde {detalle['origen'].min()}):")
+        print(resumen.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+        print(f"   Mejor por WAPE: {resumen['modelo'].iloc[0]}")
+
+    # --- Pronóstico ---
+    futuro = pronosticar(series, modelo, h)
+    principales = futuro.sum().sort_values(ascending=False).head(top).index
+    print(f"\n🔮 Próximos {h} días ({modelo}), {len(principales)} series con más {valor} esperado:")
+    tabla = futuro[principales].T
+    if nombres:
+        tabla.index = [nombres.get(c, c) for c in tabla.index]
+    tabla.columns = [d.strftime("%m-%d") for d in tabla.columns]
+    tabla["total"] = tabla.sum(axis=1)
+    print(tabla.to_string(float_format=lambda x: f"{x:,.0f}"))
+
+
+def main(nivel="producto", valor="importe", h=HORIZONTE, n_origenes=4,
+         modelo="suavizado_exponencial", desde=None, hasta=None):
+    print("--- 📈 PRONÓSTICO DE VENTAS ---")
+    nombres = None
+    if nivel == "producto":
+        nombres = (leer_tabla("productos", ["id_producto", "nombre_producto"])
+                   .set_index("id_producto")["nombre_producto"].astype(str).to_dict())
+    imprimir_resumen(lineas_de_venta(nivel, desde, hasta), nivel, valor, h, n_origenes, modelo,
+                     nombres=nombres)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pronóstico de ventas diarias con backtest")
+    parser.add_argument("--nivel", choices=list(NIVELES), default="producto", help="Una serie por...")
+    parser.add_argument("--valor", choices=["importe", "cantidad"], default="importe")
+    parser.add_argument("--h", type=int, default=HORIZONTE, help="Días a pronosticar")
+    parser.add_argument("--origenes", type=int, default=4, help="Orígenes del backtest")
+    parser.add_argument("--modelo", choices=list(MODELOS), default="suavizado_exponencial",
+                        help="Modelo para el pronóstico final")
+    parser.add_argument("--desde", help="Primer mes a incluir (AAAA-MM)")
+    parser.add_argument("--hasta", help="Último mes a incluir (AAAA-MM)")
+    args = parser.parse_args()
+    main(args.nivel, args.valor, args.h, args.origenes, args.modelo, args.desde, args.hasta)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Servicio de recomendaciones: mantiene en memoria el índice de
+aurelion.recomendador y lo refresca cuando cambian las ventas.
+
+Al refrescar, solo las ventas nuevas (id_venta que el índice no vio) se
+suman al índice, que recalcula los vecinos afectados. Si desaparecieron o
+cambiaron ventas ya vistas (otro cliente, otros productos), se rearma desde
+cero: para notarlo se guarda una huella del contenido de las filas vistas.
+
+    python recomendaciones.py 12 27 --n 5    # recomendaciones para esos clientes
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from aurelion.recomendador import IndiceRecomendaciones, interacciones
+
+
+def huella_filas(df: pd.DataFrame, columnas: list[str]) -> int:
+    """Suma (mod 2^64) del hash de cada fila: no depende del orden de las filas."""
+    if df.empty:
+        return 0
+    hashes = pd.util.hash_pandas_object(df[columnas].astype("int64"), index=False)
+    return int(hashes.to_numpy().sum(dtype=np.uint64))
+
+
+class ServicioRecomendaciones:
+    """Índice de recomendaciones listo para consultar, con refresco incremental."""
+
+    def __init__(self):
+        self.indice: IndiceRecomendaciones | None = None
+        self.nombres: dict = {}
+        self._ventas_vistas = np.empty(0, dtype=np.int64)
+        self._huella_vistas = (0, 0)
+        self._firma = None
+        self._lock = threading.Lock()
+
+    def vigente(self, firma) -> bool:
+        return self.indice is not None and firma is not None and firma == self._firma
+
+    def refrescar(self, df_ventas: pd.DataFrame, df_detalle: pd.DataFrame,
+                  df_productos: pd.DataFrame | None = None, firma=None) -> str:
+        """
+        Pone el índice al día con estas tablas. `firma` (p.ej. la del
+        almacén) evita revisar las tablas si no cambiaron. Devuelve qué se hizo.
+        """
+        if firma is not None and firma == self._firma:
+            return "sin cambios"
+        with self._lock:
+            if firma is not None and firma == self._firma:
+                return "sin cambios"
+            ids_venta = df_ventas["id_venta"].to_numpy(dtype=np.int64)
+            vistas = np.isin(ids_venta, self._ventas_vistas)
+            huella_vistas = self._huella(df_ventas[vistas],
+                                         df_detalle[df_detalle["id_venta"].isin(self._ventas_vistas)])
+
+            if (self.indice is None or vistas.sum() != len(self._ventas_vistas)
+                    or huella_vistas != self._huella_vistas):
+                self.indice = IndiceRecomendaciones(interacciones(df_ventas, df_detalle))
+                accion = f"índice armado: {self.indice}"
+            else:
+                nuevas = df_ventas[~vistas]
+                detalle_nuevo = df_detalle[df_detalle["id_venta"].isin(nuevas["id_venta"])]
+                recalculados = self.indice.actualizar(interacciones(nuevas, detalle_nuevo))
+                accion = f"{len(nuevas)} ventas nuevas, {recalculados} productos recalculados"
+
+            self._ventas_vistas = np.unique(ids_venta)
+            self._huella_vistas = self._huella(df_ventas, df_detalle)
+            if df_productos is not None:
+                self.nombres = (df_productos.set_index("id_producto")["nombre_producto"]
+                                .astype(str).to_dict())
+            self._firma = firma
+            return accion
+
+    @staticmethod
+    def _huella(df_ventas: pd.DataFrame, df_detalle: pd.DataFrame) -> tuple[int, int]:
+        return (huella_filas(df_ventas, ["id_venta", "id_cliente"]),
+                huella_filas(df_detalle, ["id_venta", "id_producto"]))
+
+    def recomendar(self, id_cliente, n: int = 5) -> dict:
+        """Respuesta lista para JSON: productos sugeridos, origen y tiempo."""
+        inicio = time.perf_counter()
+        productos, origen = self.indice.recomendar(id_cliente, n)
+        return {
+            "id_cliente": id_cliente,
+            "origen": origen,
+            "recomendaciones": [
+                {"id_producto": p, "nombre_producto": self.nombres.get(p), "puntaje": round(s, 4)}
+                for p, s in productos
+            ],
+            "ms": round((time.perf_counter() - inicio) * 1000, 3),
+        }
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main(clientes: list[int], n: int = 5):
+    from modelo_datos import leer_tabla
+
+    servicio = ServicioRecomendaciones()
+    print("🧠", servicio.refrescar(
+        leer_tabla("ventas", ["id_venta", "id_cliente"]),
+        leer_tabla("detalle_ventas", ["id_venta", "id_producto"]),
+        leer_tabla("productos", ["id_producto", "nombre_producto"]),
+    ))
+    for id_cliente in clientes:
+        respuesta = servicio.recomendar(id_cliente, n)
+        print(f"\n🛒 Cliente {id_cliente} ({respuesta['origen']}, {respuesta['ms']} ms):")
+        for r in respuesta["recomendaciones"]:
+            print(f"   - {r['nombre_producto']} (#{r['id_producto']}) puntaje={r['puntaje']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recomendaciones de productos por cliente")
+    parser.add_argument("clientes", type=int, nargs="+", help="ids de cliente")
+    parser.add_argument("--n", type=int, default=5, help="Productos a sugerir")
+    args = parser.parse_args()
+    main(args.clientes, args.n)
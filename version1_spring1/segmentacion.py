@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Segmentos de clientes por comportamiento de compra (cálculos en
+aurelion.segmentos).
+
+Las ventas se recorren de a un mes por vez y solo se guarda el acumulado por
+cliente. El modelo (centroides + estandarización) queda en cache/segmentos:
+las corridas siguientes lo reusan, asignan los clientes que no había visto y
+mueven los centroides con ellos, sin reajustar. --reajustar lo rehace.
+
+    python segmentacion.py [--k 4] [--hasta AAAA-MM] [--reajustar]
+"""
+
+import numpy as np
+import pandas as pd
+
+from aurelion.features import agregar_tickets
+from aurelion.segmentos import K_SEGMENTOS, AcumuladorClientes, Segmentador
+from cache_features import CARPETA_CACHE
+from catalogo_datos import es_particionado
+from modelo_datos import SIN_FECHA, leer_tabla, ruta_tabla, rutas_tabla
+
+CARPETA_SEGMENTOS = CARPETA_CACHE / "segmentos"
+RUTA_MODELO = CARPETA_SEGMENTOS / "modelo.npz"
+
+
+def tickets_clientes(df_ventas: pd.DataFrame, df_detalle: pd.DataFrame) -> pd.DataFrame:
+    """Un ticket por fila: id_cliente, medio_pago, ticket_total, num_items."""
+    return df_ventas[["id_venta", "id_cliente", "medio_pago"]].merge(
+        agregar_tickets(df_detalle), on="id_venta", how="left"
+    )
+
+
+def acumular_clientes(hasta=None) -> AcumuladorClientes:
+    """Acumulado por cliente, leyendo ventas y detalle de a un mes."""
+    acumulador = AcumuladorClientes()
+    columnas_ventas = ["id_venta", "id_cliente", "medio_pago"]
+    columnas_detalle = ["id_venta", "id_producto", "cantidad", "importe"]
+    if not (es_particionado(ruta_tabla("ventas")) and es_particionado(ruta_tabla("detalle_ventas"))):
+        acumulador.agregar(tickets_clientes(leer_tabla("ventas", columnas_ventas, hasta=hasta),
+                                            leer_tabla("detalle_ventas", columnas_detalle)))
+        return acumulador
+    for ruta in rutas_tabla("ventas", hasta=hasta):
+        mes = ruta.stem
+        if mes == SIN_FECHA:
+            continue
+        acumulador.agregar(tickets_clientes(leer_tabla("ventas", columnas_ventas, desde=mes, hasta=mes),
+                                            leer_tabla("detalle_ventas", columnas_detalle, desde=mes, hasta=mes)))
+    return acumulador
+
+
+def segmentar(features: pd.DataFrame, k: int = K_SEGMENTOS, reajustar: bool = False,
+              ruta_modelo=RUTA_MODELO) -> tuple[Segmentador, np.ndarray]:
+    """
+    Segmento de cada cliente. Con un modelo guardado (y mismo k), los
+    clientes nuevos se asignan y actualizan los centroides; si no, se ajusta.
+    """
+    ids = features.index.to_numpy(dtype=np.int64)
+    if not reajustar and ruta_modelo.is_file():
+        segmentador, extra = Segmentador.cargar(ruta_modelo)
+        if segmentador.k == k:
+            nuevos = ~np.isin(ids, extra["ids_vistos"])
+            print(f"🧭 Modelo en caché: {int(nuevos.sum())} clientes nuevos asignados")
+            # Sin clientes nuevos los centroides no se mueven: no hay nada que reescribir
+            if nuevos.any():
+                segmentador.actualizar(features[nuevos])
+                segmentador.guardar(ruta_modelo, ids_vistos=np.union1d(extra["ids_vistos"], ids))
+            return segmentador, segmentador.asignar(features)
+
+    segmentador = Segmentador.ajustar(features, k)
+    print(f"🧭 Modelo ajustado: {segmentador}")
+    ruta_modelo.parent.mkdir(parents=True, exist_ok=True)
+    segmentador.guardar(ruta_modelo, ids_vistos=ids)
+    return segmentador, segmentador.asignar(features)
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def imprimir_resumen(features: pd.DataFrame, segmentador: Segmentador, etiquetas: np.ndarray):
+    """Tamaño y perfil de cada segmento, en unidades legibles."""
+    perfil = pd.DataFrame({
+        "clientes": np.bincount(etiquetas, minlength=segmentador.k),
+        "gasto": features.groupby(etiquetas)["gasto_log"].apply(lambda s: np.expm1(s).mean()),
+        "compras": features.groupby(etiquetas)["frecuencia_log"].apply(lambda s: np.expm1(s).mean()),
+        "ticket_promedio": features.groupby(etiquetas)["ticket_promedio_log"].apply(lambda s: np.expm1(s).mean()),
+        "unidades_por_ticket": features.groupby(etiquetas)["unidades_por_ticket"].mean(),
+    })
+    perfil.index.name = "segmento"
+    print(f"\n👥 {len(features)} clientes en {segmentador.k} segmentos (0 = más gasto):")
+    print(perfil.to_string(float_format=lambda x: f"{x:,.2f}"))
+
+    def dominante(prefijo):
+        columnas = [c for c in features.columns if c.startswith(prefijo)]
+        if not columnas:
+            return pd.Series(dtype=object)
+        medias = features[columnas].groupby(etiquetas).mean()
+        return medias.apply(lambda f: f"{f.idxmax().removeprefix(prefijo)} ({f.max():.0%})", axis=1)
+
+    print("\n💳 Medio de pago y ciudad predominantes:")
+    print(pd.DataFrame({"medio_pago": dominante("pago_"), "ciudad": dominante("ciudad_")})
+          .rename_axis("segmento").to_string())
+
+
+def main(k=K_SEGMENTOS, hasta=None, reajustar=False):
+    print("--- 🧭 SEGMENTACIÓN DE CLIENTES ---")
+    acumulador = acumular_clientes(hasta)
+    print(f"📥 {acumulador}")
+    features = acumulador.features(leer_tabla("clientes", ["id_cliente", "ciudad"]))
+    segmentador, etiquetas = segmentar(features, k, reajustar)
+    imprimir_resumen(features, segmentador, etiquetas)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Segmentación de clientes (k-means por mini-lotes)")
+    parser.add_argument("--k", type=int, default=K_SEGMENTOS, help="Cantidad de segmentos")
+    parser.add_argument("--hasta", help="Último mes a incluir (AAAA-MM)")
+    parser.add_argument("--reajustar", action="store_true", help="Ignorar el modelo en caché")
+    args = parser.parse_args()
+    main(args.k, args.hasta, args.reajustar)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+"""
+Modo producción del dashboard: la app Flask de programa_web servida por
+uvicorn (ASGI), con varios procesos worker y límite de concurrencia.
+
+- Cada petición corre en un hilo del adaptador (AURELION_HILOS_WSGI por
+  worker). Las rutas pesadas mandan su trabajo (script o análisis) a un
+  ejecutor acotado (AURELION_MAX_TRABAJOS por worker), así las páginas
+  estáticas y los resultados cacheados siguen respondiendo mientras se
+  entrena un modelo.
+- --limite-concurrencia es el máximo de conexiones simultáneas por worker;
+  por encima, uvicorn responde 503.
+
+Uso:
+    python servidor_asgi.py --workers 4 --limite-concurrencia 100 --trabajos 2 --hilos 16
+    uvicorn servidor_asgi:crear_app --factory --workers 4   # equivalente
+
+Requiere: pip install uvicorn asgiref
+"""
+
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+# Hilos que atienden peticiones por worker. Tienen que sobrar respecto de
+# AURELION_MAX_TRABAJOS: una petición pesada ocupa su hilo mientras espera.
+HILOS_WSGI = int(os.environ.get("AURELION_HILOS_WSGI", "16"))
+
+
+# ==========================================================
+# ADAPTADOR WSGI -> ASGI CONCURRENTE
+# ==========================================================
+class _InstanciaConcurrente(WsgiToAsgiInstance):
+    """
+    asgiref corre todas las peticiones WSGI en UN hilo compartido
+    (thread_sensitive=True); acá cada petición usa un hilo del ejecutor
+    del adaptador. Solo se usan build_environ / start_response / sync_send.
+    """
+
+    def __init__(self, wsgi_application, duplicate_header_limit, ejecutor):
+        super().__init__(wsgi_application, duplicate_header_limit)
+        self._ejecutor = ejecutor
+
+    async def run_wsgi_app(self, body):
+        await sync_to_async(self._responder, thread_sensitive=False, executor=self._ejecutor)(body)
+
+    def _responder(self, body):
+        try:
+            environ = self.build_environ(self.scope, body)
+        except ValueError:
+            # Demasiados encabezados repetidos
+            self.sync_send({"type": "http.response.start", "status": 400,
+                            "headers": [(b"content-type", b"text/plain")]})
+            self.sync_send({"type": "http.response.body", "body": b"Bad Request"})
+            return
+        enviados = 0
+        respuesta = self.wsgi_application(environ, self.start_response)
+        try:
+            for parte in respuesta:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                # No mandar más de lo que anuncia Content-Length
+                if self.response_content_length is not None:
+                    parte = parte[:self.response_content_length - enviados]
+                self.sync_send({"type": "http.response.body", "body": parte, "more_body": True})
+                enviados += len(parte)
+                if enviados == self.response_content_length:
+                    break
+        finally:
+            if hasattr(respuesta, "close"):
+                respuesta.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({"type": "http.response.body"})
+
+
+class WsgiConcurrente(WsgiToAsgi):
+    def __init__(self, wsgi_application, hilos: int = HILOS_WSGI):
+        super().__init__(wsgi_application)
+        self.ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope, receive, send):
+        instancia = _InstanciaConcurrente(
+            self.wsgi_application, self.duplicate_header_limit, self.ejecutor
+        )
+        await instancia(scope, receive, send)
+
+
+def crear_app():
+    """
+    Fábrica que llama cada worker: importa la app recién acá, así toma el
+    cupo de AURELION_MAX_TRABAJOS, y arranca la vigilancia de datasets.
+    """
+    from programa_web import ALMACEN, CARPETA_FIGURAS, app
+
+    os.makedirs(CARPETA_FIGURAS, exist_ok=True)
+    ALMACEN.vigilar()
+    return WsgiConcurrente(app)
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard Tienda Aurelion (ASGI)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Procesos worker")
+    parser.add_argument("--limite-concurrencia", type=int, default=None,
+                        help="Conexiones simultáneas por worker (excedente: 503)")
+    parser.add_argument("--trabajos", type=int, default=None,
+                        help="Trabajos pesados simultáneos por worker")
+    parser.add_argument("--hilos", type=int, default=None,
+                        help="Hilos que atienden peticiones por worker")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("❌ Falta uvicorn: pip install uvicorn asgiref")
+
+    if args.trabajos is not None:
+        # Los workers leen el cupo al importar programa_web
+        os.environ["AURELION_MAX_TRABAJOS"] = str(args.trabajos)
+    if args.hilos is not None:
+        os.environ["AURELION_HILOS_WSGI"] = str(args.hilos)
+
+    print(f"🚀 Dashboard en http://{args.host}:{args.port} "
+          f"({args.workers} workers, límite {args.limite_concurrencia or 'sin límite'})")
+    uvicorn.run(
+        "servidor_asgi:crear_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_concurrency=args.limite_concurrencia,
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Los scripts y el paquete aurelion se importan desde la carpeta del proyecto
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
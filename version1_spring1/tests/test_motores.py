@@ -0,0 +1,180 @@
+"""
+Cada motor contra una referencia directa (pandas o fuerza bruta) sobre
+datos al azar chicos: los atajos (orden global, bloques, índices) tienen
+que dar lo mismo que la cuenta obvia.
+"""
+
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion.asof import unir_asof
+from aurelion.canasta import itemsets_frecuentes, matriz_canastas, pares_frecuentes
+from aurelion.integridad import IndiceClaves
+from aurelion.motor_correlaciones import correlacion_chunks
+from aurelion.recomendador import IndiceRecomendaciones
+
+
+def _en_chunks(df, tamanio):
+    return lambda: (df.iloc[i:i + tamanio] for i in range(0, len(df), tamanio))
+
+
+# ==========================================================
+# AS-OF
+# ==========================================================
+@pytest.mark.parametrize("estricto", [False, True])
+def test_unir_asof_igual_a_merge_asof(estricto):
+    rng = np.random.default_rng(0)
+    dias = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 60, 400), unit="D")
+    der = pd.DataFrame({"id_cliente": rng.integers(0, 20, 400), "fecha": dias,
+                        "valor": rng.normal(size=400)}).drop_duplicates(["id_cliente", "fecha"])
+    izq = pd.DataFrame({"id_cliente": rng.integers(0, 25, 300),
+                        "fecha": pd.Timestamp("2024-01-01")
+                        + pd.to_timedelta(rng.integers(-5, 70, 300), unit="D")})
+
+    obtenido = unir_asof(izq, der, por="id_cliente", en_izq="fecha", estricto=estricto)
+
+    esperado = pd.merge_asof(
+        izq.reset_index().sort_values("fecha"), der.sort_values("fecha"),
+        on="fecha", by="id_cliente", allow_exact_matches=not estricto,
+    ).set_index("index").sort_index()
+    assert 0 < esperado["valor"].isna().sum() < len(izq)
+    np.testing.assert_array_equal(obtenido["valor"].to_numpy(), esperado["valor"].to_numpy())
+
+
+# ==========================================================
+# CORRELACIONES
+# ==========================================================
+def _datos_correlacion(con_nulos: bool) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    base = rng.normal(size=(500, 1))
+    df = pd.DataFrame(base + rng.normal(scale=[0.1, 1.0, 3.0, 0.5], size=(500, 4)),
+                      columns=list("abcd"))
+    if con_nulos:
+        df = df.mask(rng.random(df.shape) < 0.1)
+    return df
+
+
+@pytest.mark.parametrize("con_nulos", [False, True])
+def test_pearson_por_chunks_igual_a_pandas(con_nulos):
+    df = _datos_correlacion(con_nulos)
+    acumulador = correlacion_chunks(_en_chunks(df, 64))
+    pd.testing.assert_frame_equal(acumulador.correlacion(), df.corr(), check_exact=False, atol=1e-10)
+
+
+def test_spearman_por_chunks_igual_a_pandas():
+    # Sin nulos: con nulos los rangos son por columna y no por par (ver docstring)
+    df = _datos_correlacion(con_nulos=False).round(1)  # con empates
+    acumulador = correlacion_chunks(_en_chunks(df, 64), metodo="spearman")
+    pd.testing.assert_frame_equal(acumulador.correlacion(), df.corr("spearman"),
+                                  check_exact=False, atol=1e-10)
+
+
+# ==========================================================
+# CANASTA
+# ==========================================================
+def _detalle_canastas() -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    filas = [(v, p) for v in range(150) for p in rng.choice(12, rng.integers(1, 6), replace=False)]
+    detalle = pd.DataFrame(filas, columns=["id_venta", "id_producto"])
+    # Un producto repetido en el mismo ticket cuenta una vez
+    return pd.concat([detalle, detalle.iloc[:20]], ignore_index=True)
+
+
+def _tickets(detalle):
+    return [frozenset(g) for _, g in detalle.groupby("id_venta")["id_producto"]]
+
+
+def test_pares_frecuentes_igual_a_fuerza_bruta():
+    detalle = _detalle_canastas()
+    pares = pares_frecuentes(matriz_canastas(detalle), soporte_min=5)
+
+    conteo = Counter(par for t in _tickets(detalle) for par in combinations(sorted(t), 2))
+    esperado = {par: n for par, n in conteo.items() if n >= 5}
+    assert esperado
+    obtenido = {(a, b): n for a, b, n in pares[["producto_a", "producto_b", "soporte"]].itertuples(index=False)}
+    assert obtenido == esperado
+
+
+def test_itemsets_frecuentes_igual_a_fuerza_bruta():
+    detalle = _detalle_canastas()
+    itemsets = itemsets_frecuentes(matriz_canastas(detalle), soporte_min=4, max_tamanio=3)
+
+    tickets = _tickets(detalle)
+    productos = sorted(set().union(*tickets))
+    esperado = {}
+    for tamanio in (1, 2, 3):
+        for conjunto in combinations(productos, tamanio):
+            soporte = sum(set(conjunto) <= t for t in tickets)
+            if soporte >= 4:
+                esperado[conjunto] = soporte
+    assert any(len(c) == 3 for c in esperado)
+    assert itemsets == esperado
+
+
+# ==========================================================
+# RECOMENDADOR
+# ==========================================================
+def _interacciones(rng, n, clientes, productos) -> pd.DataFrame:
+    tabla = pd.DataFrame({"id_cliente": rng.integers(0, clientes, n),
+                          "id_producto": rng.integers(0, productos, n), "tickets": 1})
+    return tabla.groupby(["id_cliente", "id_producto"], as_index=False)["tickets"].sum()
+
+
+@pytest.mark.parametrize("clientes_nuevos", [False, True])
+def test_actualizar_igual_a_rearmar(clientes_nuevos):
+    rng = np.random.default_rng(3)
+    inicial = _interacciones(rng, 600, 80, 40)
+    nuevas = _interacciones(rng, 60, 90 if clientes_nuevos else 80, 40)
+    if not clientes_nuevos:
+        nuevas = nuevas[nuevas["id_producto"].isin(inicial["id_producto"])]
+
+    indice = IndiceRecomendaciones(inicial, k=5)
+    indice.actualizar(nuevas)
+    completo = IndiceRecomendaciones(
+        pd.concat([inicial, nuevas]).groupby(["id_cliente", "id_producto"], as_index=False)["tickets"].sum(),
+        k=5,
+    )
+
+    assert (indice.matriz != completo.matriz).nnz == 0
+    np.testing.assert_array_equal(indice.vecinos, completo.vecinos)
+    np.testing.assert_allclose(indice.sims, completo.sims, rtol=1e-6)
+    for cliente in completo.ids_cliente.tolist() + [10_000]:
+        assert indice.recomendar(cliente, 5) == completo.recomendar(cliente, 5)
+
+
+def test_recomendar_rechaza_n_no_positivo():
+    indice = IndiceRecomendaciones(_interacciones(np.random.default_rng(4), 50, 10, 10), k=3)
+    with pytest.raises(ValueError):
+        indice.recomendar(0, 0)
+
+
+# ==========================================================
+# ÍNDICE DE CLAVES
+# ==========================================================
+CONSULTAS = [1, 2, 7, 50, 51, -3, 10**6, 2.5, np.nan, 49.0]
+
+
+@pytest.mark.parametrize("claves", [
+    np.arange(1, 51),                              # enteros densos: mapa de presencia
+    np.array([1, 7, 10**6, 10**9]),                # enteros dispersos: ordenadas
+    np.array([1.0, 2.5, np.nan, 49.0, 7.0]),       # flotantes con nulos
+])
+def test_contiene_igual_a_isin(claves):
+    indice = IndiceClaves(claves)
+    consultas = np.array(CONSULTAS, dtype=np.float64)
+    esperado = pd.Series(consultas).isin(pd.Series(claves).dropna()).to_numpy()
+    np.testing.assert_array_equal(indice.contiene(consultas), esperado)
+    enteras = np.array([c for c in CONSULTAS if c == c and c % 1 == 0], dtype=np.int64)
+    np.testing.assert_array_equal(indice.contiene(enteras),
+                                  pd.Series(enteras).isin(pd.Series(claves).dropna()).to_numpy())
+
+
+def test_contiene_texto_igual_a_isin():
+    claves = np.array(["ana@x.com", "bo@y.com", None], dtype=object)
+    consultas = ["bo@y.com", "zz@z.com", None, "ana@x.com"]
+    esperado = pd.Series(consultas).isin(pd.Series(claves).dropna()).to_numpy()
+    np.testing.assert_array_equal(IndiceClaves(claves).contiene(consultas), esperado)
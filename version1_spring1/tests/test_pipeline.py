@@ -0,0 +1,40 @@
+"""Grafo del pipeline: dependencias deducidas de entradas / salidas y su orden."""
+
+import pytest
+
+import pipeline
+from pipeline import ETAPAS, Etapa, con_ancestros, dependencias, orden_topologico
+
+
+def test_etapas_en_orden_de_dependencias():
+    orden = orden_topologico(ETAPAS)
+    assert sorted(orden) == sorted(e.nombre for e in ETAPAS)
+    for etapa, previas in dependencias(ETAPAS).items():
+        assert all(orden.index(p) < orden.index(etapa) for p in previas)
+
+
+def test_dependencias_de_las_etapas():
+    deps = dependencias(ETAPAS)
+    assert deps["limpieza"] == set()
+    assert deps["crear_dataframe"] == {"limpieza"}
+    assert deps["modelo_aumentado"] == {"aumentar_dataframe"}
+
+
+def test_con_ancestros_suma_lo_necesario():
+    nombres = [e.nombre for e in con_ancestros(ETAPAS, ["modelo_aumentado"])]
+    assert nombres == ["limpieza", "crear_dataframe", "aumentar_dataframe", "modelo_aumentado"]
+    with pytest.raises(ValueError):
+        con_ancestros(ETAPAS, ["no_existe"])
+
+
+def test_entradas_incluyen_modulos_importados():
+    limpieza = next(e for e in ETAPAS if e.nombre == "limpieza")
+    assert pipeline.SCRIPT_DIR / "aurelion" / "reglas_limpieza.py" in limpieza.entradas
+
+
+def test_ciclo_se_detecta(tmp_path):
+    a, b = tmp_path / "a.csv", tmp_path / "b.csv"
+    etapas = [Etapa("uno", "crear_dataframe.py", entradas=[a], salidas=[b]),
+              Etapa("dos", "aumentar_dataframe.py", entradas=[b], salidas=[a])]
+    with pytest.raises(ValueError, match="Ciclo"):
+        orden_topologico(etapas)
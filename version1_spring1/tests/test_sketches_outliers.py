@@ -0,0 +1,78 @@
+"""Sketches de cuantiles y outliers IQR contra pandas."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aurelion.sketches import SketchCuantiles
+from outliers import desempaquetar, detectar_outliers, empaquetar, outliers_csv
+
+
+def _datos() -> pd.DataFrame:
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        "id_venta": np.arange(400),
+        "importe": rng.lognormal(3, 1, 400),
+        "peso": rng.integers(1, 10, 400).astype(float),
+        "precio": rng.normal(100, 15, 400),
+    })
+    return df.mask(rng.random(df.shape) < 0.05).assign(id_venta=np.arange(400))
+
+
+def test_cuantiles_exactos_igual_a_pandas():
+    valores = _datos()["importe"]
+    sketch = SketchCuantiles(capacidad=1000)
+    for inicio in range(0, len(valores), 37):
+        sketch.agregar(valores.iloc[inicio:inicio + 37].to_numpy())
+    assert sketch.exacto
+    qs = [0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0]
+    np.testing.assert_allclose(sketch.cuantiles(qs), valores.quantile(qs).to_numpy())
+
+
+def test_cuantiles_muestreados_acotan_memoria():
+    valores = np.random.default_rng(6).uniform(0, 1, 200_000)
+    sketch = SketchCuantiles(capacidad=5_000)
+    for bloque in np.array_split(valores, 40):
+        sketch.agregar(bloque)
+    assert not sketch.exacto and sketch.valores().size == 5_000
+    np.testing.assert_allclose(sketch.cuantiles([0.25, 0.5, 0.75]), [0.25, 0.5, 0.75], atol=0.03)
+
+
+def _marcas_pandas(df, columnas):
+    q1, q3 = df[columnas].quantile(0.25), df[columnas].quantile(0.75)
+    iqr = q3 - q1
+    return (df[columnas] < q1 - 1.5 * iqr) | (df[columnas] > q3 + 1.5 * iqr)
+
+
+def test_detectar_outliers_igual_a_pandas():
+    df = _datos()
+    resultado = detectar_outliers(df)
+    assert resultado.columnas == ["importe", "peso", "precio"]
+
+    esperado = _marcas_pandas(df, resultado.columnas)
+    np.testing.assert_array_equal(resultado.conteos, esperado.sum().to_numpy())
+    filas = esperado.any(axis=1)
+    assert filas.any()
+    pd.testing.assert_frame_equal(resultado.marcas(), esperado[filas], check_names=False)
+
+
+def test_outliers_csv_por_chunks_igual_a_en_memoria(tmp_path):
+    df = _datos()
+    ruta = tmp_path / "detalle.csv"
+    df.to_csv(ruta, index=False)
+
+    en_memoria = detectar_outliers(df)
+    por_chunks = outliers_csv(ruta, tamanio_chunk=50)
+    assert por_chunks.columnas == en_memoria.columnas
+    np.testing.assert_allclose(por_chunks.lim_inf, en_memoria.lim_inf)
+    np.testing.assert_array_equal(por_chunks.conteos, en_memoria.conteos)
+    np.testing.assert_array_equal(por_chunks.indices, en_memoria.indices)
+    np.testing.assert_array_equal(por_chunks.bits, en_memoria.bits)
+
+
+@pytest.mark.parametrize("n_columnas", [1, 8, 13])
+def test_mascara_de_bits_ida_y_vuelta(n_columnas):
+    marcas = np.random.default_rng(7).random((50, n_columnas)) < 0.3
+    bits = empaquetar(marcas)
+    assert bits.shape == (50, (n_columnas + 7) // 8)
+    np.testing.assert_array_equal(desempaquetar(bits, n_columnas), marcas)